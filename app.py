@@ -18,11 +18,13 @@ from dotenv import load_dotenv
 # Import ModernRAG components
 from modernrag.vector_store import (
     check_index_exists,
+    prewarm_indexes,
     similarity_search,
     split_and_upsert_documents
 )
 from modernrag.generation import (
     retrieve_augment_generate,
+    get_router_stats,
     rerank_documents,
     augment_documents,
     generate_response,
@@ -33,8 +35,13 @@ from modernrag.caching import (
     get_cached_result,
     cache_result,
     clear_cache,
-    clear_expired_cache
+    start_background_expiry,
+    get_memory_cache_stats,
+    get_stage_cache_stats,
+    get_cache_stats
 )
+from modernrag.llm_cache import get_llm_cache_stats
+from modernrag.warmup import start_background_warmup
 from langchain.docstore.document import Document
 
 # Configure logging
@@ -291,6 +298,32 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def prewarm_index_registry():
+    """Load index metadata once per process and start its background refresh."""
+    return asyncio.run(prewarm_indexes())
+
+
+prewarm_index_registry()
+
+
+@st.cache_resource
+def start_cache_expiry():
+    """Start background expiry of cached results once per process."""
+    start_background_expiry()
+
+
+start_cache_expiry()
+
+
+@st.cache_resource
+def start_cache_warmup():
+    """Start background warm-up of frequent queries once per process."""
+    start_background_warmup()
+
+
+start_cache_warmup()
+
 # Initialize session state
 if 'history' not in st.session_state:
     st.session_state.history = []
@@ -325,9 +358,7 @@ with st.sidebar:
         asyncio.run(clear_cache())
         st.success("Cache cleared successfully!")
     
-    if st.button("Clear Expired Cache"):
-        asyncio.run(clear_expired_cache())
-        st.success("Expired cache entries cleared!")
+    st.caption("Expired cache entries are removed automatically in the background.")
     
     # Document upload
     st.markdown("### Document Upload")
@@ -370,6 +401,30 @@ with st.sidebar:
     st.metric("Total Queries", st.session_state.metrics['total_queries'])
     st.metric("Cache Hit Rate", f"{(st.session_state.metrics['cache_hits'] / max(1, st.session_state.metrics['total_queries'])) * 100:.1f}%")
     st.metric("Avg Response Time", f"{st.session_state.metrics['avg_response_time']:.2f}s")
+    
+    router_stats = get_router_stats()
+    st.metric("Queries Routed Past Retrieval", sum(
+        count for route, count in router_stats['counts'].items() if route != 'rag'
+    ))
+    st.metric("Latency Saved by Routing", f"{router_stats['latency_saved']:.2f}s")
+    
+    memory_stats = get_memory_cache_stats()
+    st.metric("Cached Results in Memory", memory_stats['entries'])
+    st.metric("Cache Memory Used", f"{memory_stats['resident_bytes'] / 2**20:.1f} / {memory_stats['max_bytes'] / 2**20:.0f} MB")
+    st.metric("Cache Evictions", memory_stats['evictions'])
+    
+    cache_stats = get_cache_stats()
+    st.metric("Query Cache Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+    st.metric("Cache Lookup p95", f"{cache_stats['latency']['lookup']['p95_ms']:.2f} ms")
+    if cache_stats['disk_bytes'] is not None:
+        st.metric("Shared Cache Size", f"{cache_stats['disk_bytes'] / 2**20:.1f} MB")
+    
+    for stage, stats in get_stage_cache_stats().items():
+        st.metric(f"{stage.capitalize()} Stage Hit Rate", f"{stats['hit_rate'] * 100:.1f}%")
+    
+    llm_cache_stats = get_llm_cache_stats()
+    st.metric("LLM Cache Hit Rate", f"{llm_cache_stats['hit_rate'] * 100:.1f}%")
+    st.metric("Tokens Saved by LLM Cache", llm_cache_stats['tokens_saved'])
 
 # Main content
 st.markdown("<h1 class='main-header'>ModernRAG</h1>", unsafe_allow_html=True)
@@ -388,7 +443,7 @@ if query:
         start_time = time.time()
         
         try:
-            # Ensure index exists
+            # Ensure index exists (served from the index registry while fresh)
             asyncio.run(check_index_exists(index_name))
             
             # Run the RAG pipeline
@@ -407,9 +462,12 @@ if query:
             
             if result.get('cached', False):
                 st.session_state.metrics['cache_hits'] += 1
-                cache_status = "<span class='cache-hit'>Cache Hit</span>"
+                cache_status = f"<span class='cache-hit'>Cache Hit ({result.get('cache_tier')})</span>"
             else:
                 cache_status = "<span class='cache-miss'>Cache Miss</span>"
+            if result.get('stale', False):
+                reason = "refreshing" if result.get('stale_reason') == "revalidating" else "refresh failed"
+                cache_status += f" | Stale by {result.get('stale_seconds', 0):.0f}s ({reason})"
             
             # Update average response time
             total_time = st.session_state.metrics['total_response_time'] + response_time
@@ -431,7 +489,7 @@ if query:
             st.markdown("<h2 class='sub-header'>Results</h2>", unsafe_allow_html=True)
             
             # Display response time and cache status
-            st.markdown(f"<p>Response Time: {response_time:.2f}s | {cache_status}</p>", unsafe_allow_html=True)
+            st.markdown(f"<p>Response Time: {response_time:.2f}s | {cache_status} | Route: {result.get('route', 'rag')}</p>", unsafe_allow_html=True)
             
             # Display retrieved documents
             if result.get('retrieved_docs'):
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark of the disk cache serialization format.
+
+This script compares encode time, decode time and encoded size of cached
+pipeline results in the ModernRAG binary format (uncompressed, zlib and
+zstd) against pickle. No API keys or network access are needed.
+
+Usage:
+    python examples/serialization_benchmark.py --docs 10 --runs 2000
+"""
+
+import time
+import pickle
+import random
+import logging
+import argparse
+from typing import Any, Callable, Dict, List
+
+from langchain.docstore.document import Document
+
+from modernrag.serialization import ResultSerializer, zstandard
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "retrieval augmented generation grounds language model answers in documents "
+    "vector index embedding chunk rerank context prompt latency cache query"
+).split()
+
+
+def make_result(num_docs: int, seed: int = 0) -> Dict[str, Any]:
+    """Build a result dictionary shaped like the pipeline's output."""
+    rng = random.Random(seed)
+    sources = [f"docs/handbook-{i}.pdf" for i in range(3)]
+    retrieved_docs = [
+        (
+            Document(
+                page_content=" ".join(rng.choice(WORDS) for _ in range(180)),
+                metadata={"source": rng.choice(sources), "page": rng.randint(1, 300), "chunk": i}
+            ),
+            rng.random()
+        )
+        for i in range(num_docs)
+    ]
+    return {
+        "query": "How does the cache reduce latency?",
+        "retrieved_docs": retrieved_docs,
+        "augmented_context": "\n\n".join(doc.page_content for doc, _ in retrieved_docs[:3]),
+        "response": " ".join(rng.choice(WORDS) for _ in range(120)),
+        "cached": False,
+        "route": "rag",
+        "timestamp": time.time()
+    }
+
+
+def time_call(function: Callable[[], Any], runs: int) -> float:
+    """Get the mean time of a call in microseconds."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        function()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def run_benchmark(num_docs: int, runs: int) -> List[Dict[str, Any]]:
+    """Measure every format on the same result.
+
+    Args:
+        num_docs: Number of retrieved documents in the result
+        runs: Number of encode and decode calls to average over
+
+    Returns:
+        One row per format with its size and mean encode and decode times
+    """
+    result = make_result(num_docs)
+    formats = {"pickle": (lambda value: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads)}
+    codecs = ["none", "zlib"] + (["zstd"] if zstandard is not None else [])
+    for codec in codecs:
+        serializer = ResultSerializer(compression=codec)
+        formats[f"modernrag+{codec}"] = (serializer.dumps, serializer.loads)
+
+    rows = []
+    for name, (dumps, loads) in formats.items():
+        encoded = dumps(result)
+        rows.append({
+            "format": name,
+            "bytes": len(encoded),
+            "encode_us": time_call(lambda: dumps(result), runs),
+            "decode_us": time_call(lambda: loads(encoded), runs),
+        })
+    return rows
+
+
+def main():
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description="Benchmark cache serialization formats")
+    parser.add_argument("--docs", type=int, default=10, help="Retrieved documents per result")
+    parser.add_argument("--runs", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.docs, args.runs)
+    print(f"{'format':<18}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for row in rows:
+        print(f"{row['format']:<18}{row['bytes']:>10}{row['encode_us']:>12.1f}{row['decode_us']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,586 @@
+"""
+Cache Backends Module for Modern RAG Application
+
+This module defines the interface of the second cache tier, the one shared
+between processes, and two implementations besides the SQLite disk cache:
+
+- A Redis backend for processes on several hosts. It speaks the Redis
+  protocol (RESP) directly over a socket, so no client library is needed,
+  and pipelines multi-key reads into one round trip.
+- A shared-memory backend for processes on one host, using a fixed table of
+  slots in a named shared memory segment.
+
+Entries are stored as bytes: the creation time and tag versions followed by
+the value in the format of the serialization module.
+"""
+
+import os
+import json
+import time
+import socket
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, List, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from modernrag.serialization import ResultSerializer
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+Entry = Tuple[Any, float, Dict[str, int]]
+
+# Creation time and length of the tag versions JSON that follows
+_ENTRY_HEADER = struct.Struct("<dI")
+
+
+class CacheBackend(ABC):
+    """Interface of the shared cache tier.
+
+    Entries are (value, created timestamp, tag versions) tuples. Backends
+    delete entries once their expiry time passes, on their own schedule.
+    """
+
+    serializer: ResultSerializer
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[Entry]]:
+        """Load several entries at once.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            List with a (value, created, tags) tuple or None for each key, in order
+        """
+
+    def get(self, key: str) -> Optional[Entry]:
+        """Load an entry.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Tuple of (value, created timestamp, tag versions), or None if missing
+        """
+        return self.get_many([key])[0]
+
+    def get_meta(self, key: str) -> Optional[Tuple[float, Dict[str, int]]]:
+        """Load the creation time and tag versions of an entry.
+
+        Backends that cannot read them separately load the whole entry.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Tuple of (created timestamp, tag versions), or None if missing
+        """
+        entry = self.get(key)
+        return None if entry is None else (entry[1], entry[2])
+
+    @abstractmethod
+    def set(
+        self,
+        key: str,
+        value: Any,
+        created: float,
+        expires: float,
+        tags: Optional[Dict[str, int]] = None
+    ):
+        """Write an entry.
+
+        Args:
+            key: The cache key
+            value: The value to store
+            created: Timestamp when the value was produced
+            expires: Timestamp after which the entry may be deleted
+            tags: Versions of the tags the value depends on
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete an entry.
+
+        Returns:
+            True if the entry existed
+        """
+
+    def delete_expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Delete entries whose expiry time has passed.
+
+        Backends that expire entries by themselves do nothing here.
+
+        Returns:
+            Number of entries deleted
+        """
+        return 0
+
+    @abstractmethod
+    def get_tag_versions(self) -> Dict[str, int]:
+        """Load the current version of every tag that has been bumped."""
+
+    @abstractmethod
+    def set_tag_version(self, tag: str, version: int):
+        """Raise the stored version of a tag to at least `version`."""
+
+    @abstractmethod
+    def bump_tag_version(self, tag: str) -> int:
+        """Atomically increment the version of a tag and return the new version.
+
+        Concurrent bumps from any process sharing the backend each get a
+        distinct version.
+        """
+
+    def compact(self):
+        """Release space held by deleted entries, if the backend needs to."""
+
+    @abstractmethod
+    def clear(self):
+        """Delete all entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Get the number of stored entries."""
+
+    def ping(self) -> bool:
+        """Check that the backend is reachable."""
+        return True
+
+    def size_bytes(self) -> Optional[int]:
+        """Get the bytes the backend occupies, or None if it cannot be measured."""
+        return None
+
+    def close(self):
+        """Release the connection or mapping held by the backend."""
+
+    def _encode(self, value: Any, created: float, tags: Optional[Dict[str, int]]) -> bytes:
+        """Encode an entry as bytes."""
+        tag_bytes = json.dumps(tags or {}).encode()
+        return _ENTRY_HEADER.pack(created, len(tag_bytes)) + tag_bytes + self.serializer.dumps(value)
+
+    def _decode(self, key: str, payload: Optional[bytes]) -> Optional[Entry]:
+        """Decode an entry, or return None if it is missing or unreadable."""
+        if payload is None:
+            return None
+        try:
+            created, tag_length = _ENTRY_HEADER.unpack_from(payload)
+            start = _ENTRY_HEADER.size
+            tags = json.loads(payload[start:start + tag_length])
+            return self.serializer.loads(payload[start + tag_length:]), created, tags
+        except Exception as e:
+            logger.error(f"Failed to decode cache entry {key}: {str(e)}")
+            return None
+
+
+class RespError(Exception):
+    """Error reply from a Redis protocol server."""
+
+
+def parse_redis_url(url: str) -> Tuple[str, int, int, Optional[str]]:
+    """Split a redis:// URL into host, port, database number and password."""
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password
+
+
+class RespClient:
+    """Minimal thread-safe client for the Redis serialization protocol.
+
+    Commands are sent as RESP arrays of bulk strings; replies are parsed
+    into bytes, ints, lists or None. A broken connection is reopened once
+    per command.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 2.0):
+        """Initialize the client; the connection is opened on first use.
+
+        Args:
+            url: Server URL, as redis://[:password@]host:port/db
+            timeout: Socket timeout in seconds
+        """
+        self.host, self.port, self.db, self.password = parse_redis_url(url)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            self._roundtrip(setup)
+
+    def _disconnect(self):
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+    @staticmethod
+    def _encode_command(args: Tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            return RespError(body.decode(errors="replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError("Connection closed by the cache server")
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the cache server: {line[:32]!r}")
+
+    def _roundtrip(self, commands: List[Tuple]) -> List[Any]:
+        self._socket.sendall(b"".join(self._encode_command(command) for command in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def pipeline(self, commands: List[Tuple]) -> List[Any]:
+        """Send several commands in one write and read all their replies.
+
+        Args:
+            commands: Tuples of command name and arguments
+
+        Returns:
+            The reply of each command, in order
+        """
+        if not commands:
+            return []
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    return self._roundtrip(commands)
+                except (ConnectionError, OSError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def execute(self, *args) -> Any:
+        """Send one command and return its reply."""
+        return self.pipeline([args])[0]
+
+    def close(self):
+        """Close the connection."""
+        with self._lock:
+            self._disconnect()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache tier on a Redis server, shared by processes on any host.
+
+    Keys are namespaced with a prefix, entry expiry uses Redis key TTLs, and
+    tag versions are kept in one hash.
+    """
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "modernrag:",
+        serializer: Optional[ResultSerializer] = None,
+        timeout: float = 2.0
+    ):
+        """Initialize the backend.
+
+        Args:
+            url: Server URL, as redis://[:password@]host:port/db
+            prefix: Prefix of every key written by this backend
+            serializer: Encoder for stored values. Uses zstd-compressed entries if not provided.
+            timeout: Socket timeout in seconds
+        """
+        self.prefix = prefix
+        self.serializer = serializer or ResultSerializer()
+        self.client = RespClient(url, timeout=timeout)
+        self._tags_key = f"{prefix}tag-versions"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}entry:{key}"
+
+    def get_many(self, keys: List[str]) -> List[Optional[Entry]]:
+        replies = self.client.pipeline([("GET", self._key(key)) for key in keys])
+        return [self._decode(key, reply) for key, reply in zip(keys, replies)]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        created: float,
+        expires: float,
+        tags: Optional[Dict[str, int]] = None
+    ):
+        ttl_ms = max(1, int((expires - time.time()) * 1000))
+        self.client.execute("SET", self._key(key), self._encode(value, created, tags), "PX", ttl_ms)
+
+    def delete(self, key: str) -> bool:
+        return self.client.execute("DEL", self._key(key)) > 0
+
+    def get_tag_versions(self) -> Dict[str, int]:
+        reply = self.client.execute("HGETALL", self._tags_key) or []
+        return {reply[i].decode(): int(reply[i + 1]) for i in range(0, len(reply), 2)}
+
+    def set_tag_version(self, tag: str, version: int):
+        # Never lowers a version; a bump racing this check still ends above `version`
+        current = self.client.execute("HGET", self._tags_key, tag)
+        if current is None or int(current) < version:
+            self.client.execute("HSET", self._tags_key, tag, version)
+
+    def bump_tag_version(self, tag: str) -> int:
+        return int(self.client.execute("HINCRBY", self._tags_key, tag, 1))
+
+    def _scan(self):
+        """Yield batches of the entry keys under the prefix."""
+        cursor = b"0"
+        while True:
+            cursor, keys = self.client.execute("SCAN", cursor, "MATCH", f"{self.prefix}entry:*", "COUNT", 1000)
+            if keys:
+                yield keys
+            if cursor == b"0":
+                return
+
+    def clear(self):
+        for keys in self._scan():
+            self.client.execute("DEL", *keys)
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self._scan())
+
+    def ping(self) -> bool:
+        try:
+            return self.client.execute("PING") == b"PONG"
+        except Exception:
+            return False
+
+    def close(self):
+        self.client.close()
+
+
+class SharedMemoryCacheBackend(CacheBackend):
+    """Cache tier in a named shared memory segment, shared by processes on one host.
+
+    The segment holds a fixed number of equally sized slots; a key maps to
+    one slot by its hash, and a colliding write replaces the entry that was
+    there, as in a direct-mapped CPU cache. Entries larger than a slot are
+    not stored. Writers take an exclusive file lock and readers a shared
+    one, so a reader never sees a half-written slot.
+    """
+
+    _MAGIC = b"MRSM"
+    _HEADER = struct.Struct("<4sII")  # magic, slot count, slot size
+    _SLOT_HEADER = struct.Struct("<16sdI")  # key digest, expiry, payload length
+    _TAG_REGION = 64 * 1024
+
+    def __init__(
+        self,
+        name: str = "modernrag-cache",
+        slots: int = 4096,
+        slot_size: int = 32 * 1024,
+        serializer: Optional[ResultSerializer] = None
+    ):
+        """Attach to the named segment, creating it if no process has yet.
+
+        Args:
+            name: Name of the shared memory segment
+            slots: Number of slots, used when creating the segment
+            slot_size: Bytes per slot including its header, used when creating the segment
+            serializer: Encoder for stored values. Uses zstd-compressed entries if not provided.
+        """
+        self.name = name
+        self.serializer = serializer or ResultSerializer()
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a+b")
+        size = self._HEADER.size + self._TAG_REGION + slots * slot_size
+        with self._locked(exclusive=True):
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                self._HEADER.pack_into(self._shm.buf, 0, self._MAGIC, slots, slot_size)
+                logger.info(f"Created shared memory cache {name} with {slots} slots of {slot_size} bytes")
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=name)
+            self._untrack()
+        magic, self.slots, self.slot_size = self._HEADER.unpack_from(self._shm.buf, 0)
+        if magic != self._MAGIC:
+            raise ValueError(f"Shared memory segment {name} is not a cache")
+        self._slots_offset = self._HEADER.size + self._TAG_REGION
+
+    def _untrack(self):
+        """Keep the segment alive after this process exits.
+
+        The resource tracker unlinks segments that a process opened when it
+        exits, which would drop the cache under the processes still using it.
+        """
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        """Hold the segment lock of this host, shared for reads and exclusive for writes."""
+        # File locks are per process, so threads of this process also take a thread lock
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _slot(self, key: str) -> Tuple[bytes, int]:
+        """Get the digest of a key and the offset of its slot."""
+        digest = hashlib.md5(key.encode()).digest()
+        index = int.from_bytes(digest[:8], "little") % self.slots
+        return digest, self._slots_offset + index * self.slot_size
+
+    def _read(self, key: str, now: float) -> Optional[bytes]:
+        digest, offset = self._slot(key)
+        stored, expires, length = self._SLOT_HEADER.unpack_from(self._shm.buf, offset)
+        if stored != digest or expires <= now:
+            return None
+        start = offset + self._SLOT_HEADER.size
+        return bytes(self._shm.buf[start:start + length])
+
+    def get_many(self, keys: List[str]) -> List[Optional[Entry]]:
+        now = time.time()
+        with self._locked(exclusive=False):
+            payloads = [self._read(key, now) for key in keys]
+        return [self._decode(key, payload) for key, payload in zip(keys, payloads)]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        created: float,
+        expires: float,
+        tags: Optional[Dict[str, int]] = None
+    ):
+        payload = self._encode(value, created, tags)
+        if len(payload) > self.slot_size - self._SLOT_HEADER.size:
+            logger.debug(f"Entry {key} of {len(payload)} bytes does not fit a shared memory slot")
+            return
+        digest, offset = self._slot(key)
+        start = offset + self._SLOT_HEADER.size
+        with self._locked(exclusive=True):
+            self._shm.buf[start:start + len(payload)] = payload
+            self._SLOT_HEADER.pack_into(self._shm.buf, offset, digest, expires, len(payload))
+
+    def delete(self, key: str) -> bool:
+        digest, offset = self._slot(key)
+        with self._locked(exclusive=True):
+            if self._SLOT_HEADER.unpack_from(self._shm.buf, offset)[0] != digest:
+                return False
+            self._SLOT_HEADER.pack_into(self._shm.buf, offset, bytes(16), 0.0, 0)
+        return True
+
+    def _read_tags(self) -> Dict[str, int]:
+        (length,) = struct.unpack_from("<I", self._shm.buf, self._HEADER.size)
+        start = self._HEADER.size + 4
+        return json.loads(bytes(self._shm.buf[start:start + length])) if length else {}
+
+    def get_tag_versions(self) -> Dict[str, int]:
+        with self._locked(exclusive=False):
+            return self._read_tags()
+
+    def _write_tags(self, tags: Dict[str, int]):
+        data = json.dumps(tags).encode()
+        if len(data) > self._TAG_REGION - 4:
+            raise ValueError("Too many tag versions for the shared memory cache")
+        start = self._HEADER.size + 4
+        self._shm.buf[start:start + len(data)] = data
+        struct.pack_into("<I", self._shm.buf, self._HEADER.size, len(data))
+
+    def set_tag_version(self, tag: str, version: int):
+        with self._locked(exclusive=True):
+            tags = self._read_tags()
+            if version > tags.get(tag, 0):
+                tags[tag] = version
+                self._write_tags(tags)
+
+    def bump_tag_version(self, tag: str) -> int:
+        with self._locked(exclusive=True):
+            tags = self._read_tags()
+            tags[tag] = tags.get(tag, 0) + 1
+            self._write_tags(tags)
+            return tags[tag]
+
+    def clear(self):
+        with self._locked(exclusive=True):
+            for index in range(self.slots):
+                self._SLOT_HEADER.pack_into(
+                    self._shm.buf, self._slots_offset + index * self.slot_size, bytes(16), 0.0, 0
+                )
+
+    def __len__(self) -> int:
+        now = time.time()
+        empty = bytes(16)
+        count = 0
+        with self._locked(exclusive=False):
+            for index in range(self.slots):
+                digest, expires, _ = self._SLOT_HEADER.unpack_from(
+                    self._shm.buf, self._slots_offset + index * self.slot_size
+                )
+                count += digest != empty and expires > now
+        return count
+
+    def size_bytes(self) -> Optional[int]:
+        return self._shm.size
+
+    def close(self):
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Remove the segment, once no process needs the cache any more."""
+        self._shm.unlink()
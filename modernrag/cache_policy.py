@@ -0,0 +1,456 @@
+"""
+Cache Policy Module for Modern RAG Application
+
+This module provides the in-memory tier used by the query cache. Every
+operation is O(1): entries live in a W-TinyLFU structure (a small LRU
+admission window in front of a segmented LRU main area), a count-min
+frequency sketch decides whether a new entry may displace an existing one,
+and a hashed timer wheel expires entries without scanning the whole cache.
+Entries can carry a size in bytes, so the cache can be bounded by a memory
+budget as well as by an entry count.
+"""
+
+import sys
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Hashable, Callable
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Halves every byte of a counter row in one C-level pass
+_HALVE_TABLE = bytes(value >> 1 for value in range(256))
+_MAX_COUNT = 15
+_HASH_MASK = (1 << 64) - 1
+_ROW_SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+_SCALAR_TYPES = (int, float, bool, type(None))
+
+
+def estimate_size(value: Any, max_depth: int = 6) -> int:
+    """Estimate the memory held by a value, in bytes.
+    
+    Walks containers, pydantic models and objects with a __dict__ (such as
+    LangChain documents), adding sys.getsizeof of every object reached once.
+    Objects nested deeper than max_depth are not counted. The estimate is
+    meant to be cheap enough to run on every insert, not exact.
+    
+    Args:
+        value: The value to measure
+        max_depth: Maximum nesting depth to walk
+        
+    Returns:
+        Estimated size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [(value, 0)]
+    while stack:
+        obj, depth = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if depth >= max_depth or isinstance(obj, (str, bytes, bytearray) + _SCALAR_TYPES):
+            continue
+        if isinstance(obj, dict):
+            for key, item in obj.items():
+                stack.append((key, depth + 1))
+                stack.append((item, depth + 1))
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend((item, depth + 1) for item in obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append((vars(obj), depth + 1))
+    return total
+
+
+class FrequencySketch:
+    """Count-min sketch of recent access frequencies with periodic aging."""
+
+    def __init__(self, capacity: int, depth: int = 4):
+        """Initialize the sketch.
+
+        Args:
+            capacity: Expected number of cached entries; sizes the counter rows
+            depth: Number of hashed counter rows, at most 4
+        """
+        if not 1 <= depth <= len(_ROW_SEEDS):
+            raise ValueError(f"Sketch depth must be between 1 and {len(_ROW_SEEDS)}")
+        # About eight counters per entry keeps collisions between keys rare
+        width = 1 << max(4, (8 * max(1, capacity) - 1).bit_length())
+        self._shift = 64 - (width.bit_length() - 1)
+        self._rows = [bytearray(width) for _ in range(depth)]
+        self._sample_size = 10 * max(1, capacity)
+        self._additions = 0
+
+    def _indexes(self, key: Hashable) -> List[int]:
+        # Multiplicative hashing with a different odd seed per row; the top
+        # bits of the product are well mixed, unlike the low bits of hash()
+        h = hash(key) & _HASH_MASK
+        return [((h * seed) & _HASH_MASK) >> self._shift for seed in _ROW_SEEDS[:len(self._rows)]]
+
+    def increment(self, key: Hashable):
+        """Record one access to a key."""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < _MAX_COUNT:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, key: Hashable) -> int:
+        """Estimate how often a key was accessed recently."""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age(self):
+        """Halve all counters so that old popularity fades."""
+        for row in self._rows:
+            row[:] = row.translate(_HALVE_TABLE)
+        self._additions //= 2
+
+
+class TimerWheel:
+    """Hashed timing wheel that finds expired keys without a full scan."""
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        """Initialize the wheel.
+
+        Args:
+            resolution: Seconds covered by one slot
+            slots: Number of slots; expiries further out wrap around
+        """
+        self.resolution = resolution
+        self._buckets: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[Hashable, int] = {}
+        self._next_tick = int(time.time() // resolution)
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def schedule(self, key: Hashable, expires_at: float):
+        """Schedule a key to expire, replacing any earlier schedule."""
+        self.cancel(key)
+        # Keys already due go into the next slot to be swept
+        tick = max(int(expires_at // self.resolution), self._next_tick)
+        slot = tick % len(self._buckets)
+        self._buckets[slot][key] = expires_at
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable):
+        """Remove a key from the wheel."""
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._buckets[slot][key]
+
+    def advance(self, now: Optional[float] = None) -> List[Hashable]:
+        """Sweep the slots whose time has fully passed.
+
+        Args:
+            now: Current time. Uses the wall clock if not provided.
+
+        Returns:
+            Keys that expired, already removed from the wheel
+        """
+        now = time.time() if now is None else now
+        now_tick = int(now // self.resolution)
+        if now_tick <= self._next_tick:
+            return []
+
+        slots = len(self._buckets)
+        if now_tick - self._next_tick >= slots:
+            ticks = range(slots)
+        else:
+            ticks = range(self._next_tick, now_tick)
+        self._next_tick = now_tick
+
+        expired = []
+        for tick in ticks:
+            bucket = self._buckets[tick % slots]
+            # Keys scheduled a full rotation or more ahead stay in the bucket
+            due = [key for key, expires_at in bucket.items() if expires_at <= now]
+            for key in due:
+                del bucket[key]
+                del self._slot_of[key]
+            expired.extend(due)
+        return expired
+
+    def clear(self):
+        """Remove all keys."""
+        for bucket in self._buckets:
+            bucket.clear()
+        self._slot_of.clear()
+
+
+class TinyLFUCache:
+    """Bounded key-value store with W-TinyLFU eviction and TTL expiry.
+
+    New entries enter a small LRU window. Entries leaving the window compete
+    with the least recently used entry of the main area, and the one with
+    the higher sketch frequency stays. The main area is a segmented LRU
+    whose protected segment holds entries accessed more than once. With a
+    window fraction of 1.0 the cache behaves as a plain LRU.
+
+    When max_bytes is set, every entry is weighed on insert and each segment
+    is bounded by its share of the byte budget as well as of the entry count.
+    A candidate that beats the main area's victim may evict several smaller
+    entries to make room; an entry larger than the whole budget is rejected.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        window_fraction: float = 0.01,
+        protected_fraction: float = 0.8,
+        timer_resolution: float = 1.0,
+        max_bytes: Optional[int] = None,
+        weigher: Callable[[Any], int] = estimate_size
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            window_fraction: Share of the capacity used by the admission window
+            protected_fraction: Share of the main area used by the protected segment
+            timer_resolution: Seconds per timer wheel slot
+            max_bytes: Maximum total size of the entries, or None for no byte budget
+            weigher: Function estimating the size of a value in bytes
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._weigher = weigher
+        self._window_capacity = max(1, min(max_entries, round(max_entries * window_fraction)))
+        main_capacity = max_entries - self._window_capacity
+        self._protected_capacity = int(main_capacity * protected_fraction)
+        budget = float("inf") if max_bytes is None else max_bytes
+        self._window_bytes = budget if window_fraction >= 1.0 else budget * window_fraction
+        self._main_bytes = budget - self._window_bytes
+        self._protected_bytes = self._main_bytes * protected_fraction
+        self._window: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._weights: Dict[Hashable, int] = {}
+        self._segment_bytes = {"window": 0, "probation": 0, "protected": 0}
+        self._expires_at: Dict[Hashable, float] = {}
+        self._sketch = FrequencySketch(max_entries)
+        self._timers = TimerWheel(resolution=timer_resolution)
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Total estimated size of the stored entries, in bytes."""
+        return sum(self._segment_bytes.values())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+    def _segment(self, key: Hashable) -> Optional["OrderedDict[Hashable, Any]"]:
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                return segment
+        return None
+
+    def _name(self, segment: "OrderedDict[Hashable, Any]") -> str:
+        if segment is self._window:
+            return "window"
+        return "probation" if segment is self._probation else "protected"
+
+    def _put(self, segment: "OrderedDict[Hashable, Any]", key: Hashable, value: Any):
+        """Append an entry to a segment, accounting its weight."""
+        segment[key] = value
+        self._segment_bytes[self._name(segment)] += self._weights[key]
+
+    def _take(self, segment: "OrderedDict[Hashable, Any]", key: Hashable) -> Any:
+        """Remove an entry from a segment, keeping its weight record."""
+        self._segment_bytes[self._name(segment)] -= self._weights[key]
+        return segment.pop(key)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Any]:
+        """Look up a key and record the access.
+
+        Args:
+            key: Cache key
+            now: Current time. Uses the wall clock if not provided.
+
+        Returns:
+            The stored value, or None if missing or expired
+        """
+        now = time.time() if now is None else now
+        self.expire(now)
+        self._sketch.increment(key)
+
+        segment = self._segment(key)
+        if segment is None:
+            return None
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+
+        value = segment[key]
+        if segment is self._probation:
+            # A second access promotes the entry to the protected segment
+            self._put(self._protected, key, self._take(self._probation, key))
+            while len(self._protected) > 1 and (
+                len(self._protected) > self._protected_capacity
+                or self._segment_bytes["protected"] > self._protected_bytes
+            ):
+                demoted = next(iter(self._protected))
+                self._put(self._probation, demoted, self._take(self._protected, demoted))
+        else:
+            segment.move_to_end(key)
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Look up a key without recording an access or checking expiry."""
+        segment = self._segment(key)
+        return None if segment is None else segment[key]
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None):
+        """Insert or replace an entry.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Absolute expiry time, or None to keep the entry until evicted
+        """
+        self.expire()
+        self._sketch.increment(key)
+
+        weight = self._weigher(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and weight > self.max_bytes:
+            # Storing it would flush the whole cache for one entry
+            self._remove(key)
+            self.evictions += 1
+            return
+
+        segment = self._segment(key)
+        if segment is not None:
+            self._take(segment, key)
+            self._weights[key] = weight
+            self._put(segment, key, value)
+        else:
+            self._weights[key] = weight
+            self._put(self._window, key, value)
+
+        if expires_at is None:
+            self._expires_at.pop(key, None)
+            self._timers.cancel(key)
+        else:
+            self._expires_at[key] = expires_at
+            self._timers.schedule(key, expires_at)
+
+        while self._window and (
+            len(self._window) > self._window_capacity
+            or self._segment_bytes["window"] > self._window_bytes
+        ):
+            self._admit(next(iter(self._window)))
+        # Growing an entry in place can push the main area over budget
+        while self._main_over_budget() and self._main_victim_segment() is not None:
+            victim_segment = self._main_victim_segment()
+            self._evict(victim_segment, next(iter(victim_segment)))
+
+    def _main_over_budget(self, extra_entries: int = 0, extra_bytes: int = 0) -> bool:
+        """Check whether the main area plus an addition exceeds its entry or byte share."""
+        main_entries = len(self._probation) + len(self._protected) + extra_entries
+        main_bytes = self._segment_bytes["probation"] + self._segment_bytes["protected"] + extra_bytes
+        return main_entries > self.max_entries - self._window_capacity or main_bytes > self._main_bytes
+
+    def _main_victim_segment(self) -> Optional["OrderedDict[Hashable, Any]"]:
+        """Get the main area segment whose oldest entry is evicted first."""
+        if self._probation:
+            return self._probation
+        return self._protected if self._protected else None
+
+    def _evict(self, segment: "OrderedDict[Hashable, Any]", key: Hashable):
+        """Remove an entry to make room and count the eviction."""
+        self._take(segment, key)
+        self._forget(key)
+        self.evictions += 1
+
+    def _admit(self, candidate: Hashable):
+        """Move the oldest window entry into the main area if it earns a place."""
+        weight = self._weights[candidate]
+        if not self._main_over_budget(1, weight):
+            self._put(self._probation, candidate, self._take(self._window, candidate))
+            return
+
+        victim_segment = self._main_victim_segment()
+        if victim_segment is None or weight > self._main_bytes:
+            # No main area (plain LRU) or too large for it: the window victim is evicted
+            self._evict(self._window, candidate)
+            return
+
+        victim = next(iter(victim_segment))
+        if self._sketch.frequency(candidate) <= self._sketch.frequency(victim):
+            self._evict(self._window, candidate)
+            return
+
+        # The candidate is more popular; evict old entries until it fits
+        while self._main_over_budget(1, weight) and self._main_victim_segment() is not None:
+            victim_segment = self._main_victim_segment()
+            self._evict(victim_segment, next(iter(victim_segment)))
+        self._put(self._probation, candidate, self._take(self._window, candidate))
+
+    def _forget(self, key: Hashable):
+        """Drop the expiry and weight bookkeeping of a key that is no longer stored."""
+        self._expires_at.pop(key, None)
+        self._weights.pop(key, None)
+        self._timers.cancel(key)
+
+    def _remove(self, key: Hashable) -> bool:
+        segment = self._segment(key)
+        if segment is None:
+            return False
+        self._take(segment, key)
+        self._forget(key)
+        return True
+
+    def pop(self, key: Hashable) -> bool:
+        """Remove an entry.
+
+        Returns:
+            True if the key was present
+        """
+        return self._remove(key)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove entries whose expiry time has passed, using the timer wheel.
+
+        Args:
+            now: Current time. Uses the wall clock if not provided.
+
+        Returns:
+            Number of entries removed
+        """
+        expired = self._timers.advance(now)
+        for key in expired:
+            segment = self._segment(key)
+            if segment is not None:
+                self._take(segment, key)
+            self._expires_at.pop(key, None)
+            self._weights.pop(key, None)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        """Remove all entries."""
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._weights.clear()
+        self._segment_bytes = {"window": 0, "probation": 0, "protected": 0}
+        self._expires_at.clear()
+        self._timers.clear()
@@ -0,0 +1,96 @@
+"""
+Cache Stats Module for Modern RAG Application
+
+This module provides the fixed-bucket latency histogram used to report
+cache lookup and load times. Recording a sample is one bisect and one
+increment, so it can sit on every cache lookup, and percentiles are read
+from the bucket counts as the upper bound of the bucket they fall in.
+"""
+
+import bisect
+import logging
+import threading
+from typing import Dict, List, Sequence
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds in seconds, from 50 microseconds to 5 seconds
+DEFAULT_BOUNDS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class LatencyHistogram:
+    """Thread-safe histogram of latencies with fixed bucket bounds."""
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS):
+        """Initialize an empty histogram.
+
+        Args:
+            bounds: Increasing bucket upper bounds in seconds; slower samples go to an overflow bucket
+        """
+        self.bounds = list(bounds)
+        self._lock = threading.Lock()
+        self._counts: List[int] = [0] * (len(self.bounds) + 1)
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds: float):
+        """Record one latency sample."""
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def _quantile(self, counts: List[int], q: float, largest: float) -> float:
+        """Get the upper bound of the bucket holding the q-quantile sample."""
+        rank = q * sum(counts)
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.bounds[index] if index < len(self.bounds) else largest
+        return largest
+
+    def snapshot(self) -> Dict[str, object]:
+        """Get the sample count, mean, approximate percentiles and bucket counts.
+
+        Returns:
+            Dictionary with count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms and
+            the non-empty buckets keyed by their upper bound
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._total
+            largest = self._max
+        count = sum(counts)
+        if not count:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "buckets": {}}
+        buckets = {}
+        for index, bucket_count in enumerate(counts):
+            if bucket_count:
+                label = f"le_{self.bounds[index] * 1000:g}ms" if index < len(self.bounds) else "overflow"
+                buckets[label] = bucket_count
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000,
+            "p50_ms": self._quantile(counts, 0.50, largest) * 1000,
+            "p95_ms": self._quantile(counts, 0.95, largest) * 1000,
+            "p99_ms": self._quantile(counts, 0.99, largest) * 1000,
+            "max_ms": largest * 1000,
+            "buckets": buckets,
+        }
+
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._counts = [0] * (len(self.bounds) + 1)
+            self._total = 0.0
+            self._max = 0.0
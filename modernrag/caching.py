@@ -3,6 +3,24 @@ Caching Module for Modern RAG Application
 
 This module provides caching mechanisms for query results to improve performance
 by avoiding redundant processing of repeated queries.
+
+Cached results are tagged with the versions of the indexes they were
+retrieved from. A write to an index bumps its tag version in O(1), and
+entries recorded under an older version are treated as misses when next
+read, so answers never outlive the documents they came from.
+
+Results have a soft and a hard TTL. Before the soft TTL (`cache_ttl`) a
+result is fresh. Between the soft and hard TTL it is served immediately,
+labelled stale, while a background refresh replaces it. Past the hard TTL
+it is only served, again labelled stale, if recomputing the result fails.
+
+Each process has its own memory tier in front of a second tier shared by
+all processes. The shared tier is pluggable: a SQLite file for processes
+on one host by default, a Redis server for several hosts, a shared memory
+segment, or several Redis nodes sharded with a consistent-hash ring. Tag
+versions are kept in the shared tier too and reloaded every
+`tag_sync_interval` seconds, so an invalidation in one process reaches the
+others.
 """
 
 import os
@@ -10,16 +28,26 @@ import time
 import json
 import hashlib
 import logging
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Callable, Awaitable, NamedTuple
 from functools import lru_cache
 from pathlib import Path
 import asyncio
-import pickle
+import threading
+from collections import OrderedDict
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
 from langchain.docstore.document import Document
 
+from modernrag.cache_policy import TinyLFUCache
+from modernrag.cache_stats import LatencyHistogram
+from modernrag.semantic_cache import SemanticCache
+from modernrag.single_flight import SingleFlight
+from modernrag.disk_cache import SQLiteDiskCache
+from modernrag.cache_backends import CacheBackend, RedisCacheBackend, SharedMemoryCacheBackend
+from modernrag.sharded_cache import ShardedCacheBackend
+from modernrag.serialization import ResultSerializer
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,9 +60,37 @@ class CacheConfig(BaseSettings):
     """Configuration settings for caching operations."""
     cache_dir: str = Field("./cache", env="CACHE_DIR")
     cache_ttl: int = Field(3600, env="CACHE_TTL")  # Time-to-live in seconds
-    max_cache_size: int = Field(100, env="MAX_CACHE_SIZE")  # Maximum number of cached items
-    enable_disk_cache: bool = Field(True, env="ENABLE_DISK_CACHE")
+    cache_hard_ttl: int = Field(7200, env="CACHE_HARD_TTL")  # Serve stale results while refreshing until this age
+    cache_stale_if_error_ttl: int = Field(86400, env="CACHE_STALE_IF_ERROR_TTL")  # Serve stale results on errors until this age
+    max_cache_size: int = Field(10000, env="MAX_CACHE_SIZE")  # Maximum number of items in memory
+    max_cache_bytes: int = Field(128 * 1024 * 1024, env="MAX_CACHE_BYTES")  # Memory budget of the items in bytes
+    cache_eviction_policy: str = Field("tinylfu", env="CACHE_EVICTION_POLICY")  # "tinylfu" or "lru"
+    enable_semantic_cache: bool = Field(True, env="ENABLE_SEMANTIC_CACHE")
+    semantic_cache_threshold: float = Field(0.95, env="SEMANTIC_CACHE_THRESHOLD")  # Minimum cosine similarity
+    semantic_cache_size: int = Field(1024, env="SEMANTIC_CACHE_SIZE")  # Maximum number of cached queries
+    expiry_sweep_interval: float = Field(30.0, env="CACHE_EXPIRY_INTERVAL")  # Seconds between background sweeps
+    expiry_sweep_batch: int = Field(500, env="CACHE_EXPIRY_BATCH")  # Disk entries deleted per sweep step
+    enable_disk_cache: bool = Field(True, env="ENABLE_DISK_CACHE")  # Enables the shared tier, whatever its backend
+    cache_backend: str = Field("sqlite", env="CACHE_BACKEND")  # "sqlite", "redis", "shared_memory" or "sharded"
+    cache_redis_url: str = Field("redis://localhost:6379/0", env="CACHE_REDIS_URL")
+    cache_shard_urls: str = Field("", env="CACHE_SHARD_URLS")  # Comma-separated Redis URLs of the sharded nodes
+    cache_replication_factor: int = Field(1, env="CACHE_REPLICATION_FACTOR")  # Nodes each sharded entry is written to
+    cache_virtual_nodes: int = Field(160, env="CACHE_VIRTUAL_NODES")  # Hash ring points per sharded node
+    cache_health_check_interval: float = Field(5.0, env="CACHE_HEALTH_CHECK_INTERVAL")  # Seconds between node pings
+    cache_key_prefix: str = Field("modernrag:", env="CACHE_KEY_PREFIX")  # Namespace of keys on a Redis server
+    shared_memory_name: str = Field("modernrag-cache", env="SHARED_MEMORY_NAME")
+    shared_memory_slots: int = Field(4096, env="SHARED_MEMORY_SLOTS")
+    shared_memory_slot_size: int = Field(32 * 1024, env="SHARED_MEMORY_SLOT_SIZE")  # Larger entries are not shared
+    tag_sync_interval: float = Field(1.0, env="CACHE_TAG_SYNC_INTERVAL")  # Seconds between reloads of shared tag versions
+    cache_compression: str = Field("zstd", env="CACHE_COMPRESSION")  # "zstd", "zlib" or "none"
     enable_memory_cache: bool = Field(True, env="ENABLE_MEMORY_CACHE")
+    enable_stage_cache: bool = Field(True, env="ENABLE_STAGE_CACHE")
+    stage_cache_size: int = Field(4096, env="STAGE_CACHE_SIZE")  # Maximum number of cached stage outputs
+    enable_llm_cache: bool = Field(True, env="ENABLE_LLM_CACHE")
+    llm_cache_max_temperature: float = Field(0.0, env="LLM_CACHE_MAX_TEMPERATURE")  # Hotter calls are not cached
+    llm_cache_size: int = Field(1000, env="LLM_CACHE_SIZE")  # Maximum number of LLM responses in memory
+    llm_cache_bytes: int = Field(16 * 1024 * 1024, env="LLM_CACHE_BYTES")  # Memory budget of LLM responses, on top of max_cache_bytes
+    query_log_half_life: float = Field(86400.0, env="QUERY_LOG_HALF_LIFE")  # Seconds for query frequencies to halve
     
     class Config:
         env_file = ".env"
@@ -48,21 +104,126 @@ def get_cache_config() -> CacheConfig:
     return CacheConfig()
 
 
+def index_tag(index_name: str) -> str:
+    """Get the tag of cache entries that depend on an index."""
+    return f"index:{index_name}"
+
+
+# Tiers a cached result can be served from
+TIER_MEMORY = "memory"
+TIER_SHARED = "shared"
+TIER_SEMANTIC = "semantic"
+
+# Document metadata that the rerank and augment prompts include alongside the text
+PROMPT_METADATA_KEYS = ("source", "page")
+
+
+class CacheHit(NamedTuple):
+    """A cached result with the time it was cached and the tier that served it."""
+    value: Any
+    timestamp: float
+    tier: str
+
+
+def create_cache_backend(config: CacheConfig, namespace: str = "cache") -> CacheBackend:
+    """Create a shared cache tier for the configured backend.
+    
+    Each namespace gets its own SQLite file, Redis key prefix or shared
+    memory segment, so several caches can share one backend without
+    seeing or clearing each other's entries.
+    
+    Args:
+        config: Cache configuration
+        namespace: Name of the cache using the backend, such as "llm"
+        
+    Returns:
+        The backend
+    """
+    serializer = ResultSerializer(compression=config.cache_compression)
+    # Query results keep the names they had before other caches shared the backend
+    suffix = "" if namespace == "cache" else f"{namespace}:"
+    if config.cache_backend == "sqlite":
+        return SQLiteDiskCache(Path(config.cache_dir) / f"{namespace}.sqlite3", serializer)
+    if config.cache_backend == "redis":
+        return RedisCacheBackend(config.cache_redis_url, config.cache_key_prefix + suffix, serializer)
+    if config.cache_backend == "shared_memory":
+        return SharedMemoryCacheBackend(
+            config.shared_memory_name if namespace == "cache" else f"{config.shared_memory_name}-{namespace}",
+            config.shared_memory_slots,
+            config.shared_memory_slot_size,
+            serializer
+        )
+    if config.cache_backend == "sharded":
+        urls = [url.strip() for url in config.cache_shard_urls.split(",") if url.strip()]
+        return ShardedCacheBackend(
+            {url: RedisCacheBackend(url, config.cache_key_prefix + suffix, serializer) for url in urls},
+            replicas=config.cache_replication_factor,
+            virtual_nodes=config.cache_virtual_nodes,
+            health_check_interval=config.cache_health_check_interval
+        )
+    raise ValueError(f"Unknown cache backend: {config.cache_backend}")
+
+
 class QueryCache:
     """Cache for query results to improve performance."""
     
     def __init__(self):
         """Initialize the query cache."""
         self.config = get_cache_config()
-        self._memory_cache: Dict[str, Tuple[Any, float]] = {}  # {key: (value, timestamp)}
+        self._memory_cache = self._create_memory_cache()  # {key: (value, timestamp, tag versions)}
+        self._semantic_cache = SemanticCache(
+            max_entries=self.config.semantic_cache_size,
+            threshold=self.config.semantic_cache_threshold
+        )
+        self._embeddings = None
+        self._query_vectors: "OrderedDict[str, List[float]]" = OrderedDict()  # Recent query embeddings
+        self._semantic_served: "OrderedDict[str, str]" = OrderedDict()  # {asked key: served key}
+        self._semantic_lock = threading.Lock()  # Guards the two dicts above; _store also runs on the refresh thread
+        self._counters: Dict[str, int] = {}
+        self._counters_lock = threading.Lock()
+        self._lookup_latency = LatencyHistogram()  # Whole lookups, across all tiers
+        self._load_latency = LatencyHistogram()  # Shared tier reads
+        self._single_flight = SingleFlight()
+        self._memory_lock = threading.RLock()  # Background refreshes write to the memory tier from their own thread
+        self._refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refreshing: set = set()
+        self._refreshing_lock = threading.Lock()
+        self._expiry_stop = threading.Event()
+        self._expiry_thread: Optional[threading.Thread] = None
         self._ensure_cache_dir()
+        self._backend = self._create_backend() if self.config.enable_disk_cache else None
+        self._tag_versions: Dict[str, int] = {}
+        self._tags_synced_at = time.monotonic()
+        # Logs and starts from no versions if the shared tier is unreachable; later syncs catch up
+        self._sync_tag_versions()
+    
+    def _create_backend(self) -> CacheBackend:
+        """Create the shared tier for the configured backend."""
+        return create_cache_backend(self.config)
+    
+    def _create_memory_cache(self) -> TinyLFUCache:
+        """Create the memory tier for the configured eviction policy."""
+        if self.config.cache_eviction_policy not in ("tinylfu", "lru"):
+            raise ValueError(f"Unknown cache eviction policy: {self.config.cache_eviction_policy}")
+        # A window covering the whole cache turns W-TinyLFU into a plain LRU
+        window_fraction = 1.0 if self.config.cache_eviction_policy == "lru" else 0.01
+        return TinyLFUCache(
+            self.config.max_cache_size,
+            window_fraction=window_fraction,
+            max_bytes=self.config.max_cache_bytes
+        )
     
     def _ensure_cache_dir(self):
         """Ensure the cache directory exists."""
-        if self.config.enable_disk_cache:
+        if self.config.enable_disk_cache and self.config.cache_backend == "sqlite":
             os.makedirs(self.config.cache_dir, exist_ok=True)
             logger.info(f"Cache directory ensured at: {self.config.cache_dir}")
     
+    def _count(self, counter: str, amount: int = 1):
+        """Add to a lookup counter."""
+        with self._counters_lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+    
     def _generate_key(self, query: str, **kwargs) -> str:
         """Generate a cache key from the query and additional parameters.
         
@@ -93,42 +254,126 @@ class QueryCache:
         """
         return time.time() - timestamp > self.config.cache_ttl
     
+    def _retention(self) -> float:
+        """Get how long an item is kept, so that it can still be served stale."""
+        return max(self.config.cache_ttl, self.config.cache_hard_ttl, self.config.cache_stale_if_error_ttl)
+    
     def _clean_memory_cache(self):
-        """Remove expired items from the memory cache."""
+        """Remove expired items from the memory cache.
+        
+        Only the timer wheel slots that have elapsed are swept, and the size
+        bound is enforced on insert, so this never scans the whole cache.
+        """
         if not self.config.enable_memory_cache:
             return
+        with self._memory_lock:
+            self._memory_cache.expire()
+    
+    def _store_in_memory(self, key: str, value: Any, timestamp: float, tags: Dict[str, int]):
+        """Insert an item into the memory cache, scheduled to expire after the retention period."""
+        with self._memory_lock:
+            self._memory_cache.set(key, (value, timestamp, tags), expires_at=timestamp + self._retention())
+    
+    def _dependency_tags(self, **kwargs) -> List[str]:
+        """Get the tags that a result for the given parameters depends on."""
+        index_name = kwargs.get("index_name")
+        return [] if index_name is None else [index_tag(index_name)]
+    
+    def current_tags(self, **kwargs) -> Dict[str, int]:
+        """Get the current versions of the tags a result would depend on.
+        
+        Args:
+            **kwargs: Parameters that affect the result
             
-        # Remove expired items
-        expired_keys = [
-            key for key, (_, timestamp) in self._memory_cache.items()
-            if self._is_expired(timestamp)
-        ]
-        for key in expired_keys:
-            del self._memory_cache[key]
-        
-        # If still too many items, remove oldest
-        if len(self._memory_cache) > self.config.max_cache_size:
-            sorted_items = sorted(
-                self._memory_cache.items(),
-                key=lambda x: x[1][1]  # Sort by timestamp
-            )
-            # Keep only the newest items
-            to_keep = sorted_items[-self.config.max_cache_size:]
-            self._memory_cache = {k: v for k, v in to_keep}
-    
-    def _get_disk_cache_path(self, key: str) -> Path:
-        """Get the file path for a disk cache item.
+        Returns:
+            Dictionary mapping each tag to its current version
+        """
+        return {tag: self._tag_versions.get(tag, 0) for tag in self._dependency_tags(**kwargs)}
+    
+    def _is_current(self, tags: Dict[str, int]) -> bool:
+        """Check that no tag of an entry was invalidated after it was cached.
+        
+        A version newer than the one known here comes from another process
+        sharing the backend, which has seen an invalidation that this one
+        has not synced yet.
+        """
+        return all(version >= self._tag_versions.get(tag, 0) for tag, version in tags.items())
+    
+    def _sync_tag_versions(self):
+        """Pick up tag versions bumped by other processes sharing the backend."""
+        self._tags_synced_at = time.monotonic()
+        if self._backend is None:
+            return
+        try:
+            shared = self._backend.get_tag_versions()
+        except Exception as e:
+            logger.warning(f"Error loading shared cache tag versions: {str(e)}")
+            return
+        for tag, version in shared.items():
+            if version > self._tag_versions.get(tag, 0):
+                self._tag_versions[tag] = version
+    
+    async def _sync_tag_versions_if_due(self):
+        """Reload shared tag versions at most once per tag_sync_interval."""
+        if self._backend is not None and time.monotonic() - self._tags_synced_at >= self.config.tag_sync_interval:
+            await asyncio.to_thread(self._sync_tag_versions)
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """Invalidate every cached result depending on a tag.
+        
+        Only the tag version is bumped; dependent entries are dropped when
+        they are next read, so the cost does not depend on the cache size.
         
         Args:
-            key: The cache key
+            tag: The tag to invalidate
+            
+        Returns:
+            The new version of the tag
+        """
+        version = None
+        if self.config.enable_disk_cache:
+            try:
+                # Atomic in the backend, so concurrent bumps from other processes get distinct versions
+                version = self._backend.bump_tag_version(tag)
+            except Exception as e:
+                logger.error(f"Error saving cache tag version: {str(e)}")
+        if version is None:
+            version = self._tag_versions.get(tag, 0) + 1
+        self._tag_versions[tag] = max(version, self._tag_versions.get(tag, 0))
+        logger.info(f"Invalidated cached results tagged {tag} (version {version})")
+        return version
+    
+    def invalidate_index(self, index_name: str) -> int:
+        """Invalidate every cached result retrieved from an index.
+        
+        Args:
+            index_name: Name of the index that was written to
             
         Returns:
-            Path to the cache file
+            The new version of the index tag
         """
-        return Path(self.config.cache_dir) / f"{key}.pickle"
+        return self.invalidate_tag(index_tag(index_name))
+    
+    async def index_version(self, index_name: str) -> int:
+        """Get the version of an index's tag, as bumped by writes from any process.
+        
+        Versions bumped by other processes sharing the backend are seen
+        within tag_sync_interval seconds.
+        
+        Args:
+            index_name: Name of the index
+            
+        Returns:
+            The current version of the index tag
+        """
+        await self._sync_tag_versions_if_due()
+        return self._tag_versions.get(index_tag(index_name), 0)
     
     async def get(self, query: str, **kwargs) -> Optional[Any]:
-        """Get a cached result for a query.
+        """Get a fresh cached result for a query.
+        
+        Results past the soft TTL are not returned; use `get_or_compute` to
+        have them served stale while they are refreshed.
         
         Args:
             query: The query string
@@ -137,53 +382,394 @@ class QueryCache:
         Returns:
             The cached result, or None if not found or expired
         """
-        key = self._generate_key(query, **kwargs)
+        hit, _ = await self._lookup(query, self._generate_key(query, **kwargs), **kwargs)
+        return None if hit is None else hit.value
+    
+    async def _lookup(self, query: str, key: str, **kwargs) -> Tuple[Optional[CacheHit], Optional[CacheHit]]:
+        """Look up a query in the exact tiers, then the semantic tier.
         
+        Args:
+            query: The query string
+            key: The exact cache key of the query
+            **kwargs: Additional parameters that affect the result
+            
+        Returns:
+            Tuple of the fresh hit or None, and the query's own entry if it
+            is kept but past the soft TTL
+        """
+        start_time = time.perf_counter()
+        try:
+            await self._sync_tag_versions_if_due()
+            entry = await self._load_entry(key, query)
+            fresh = entry is not None and not self._is_expired(entry.timestamp)
+            # The shared tier is only read when the memory tier has no fresh entry
+            if self.config.enable_memory_cache:
+                self._count("memory_hits" if fresh and entry.tier == TIER_MEMORY else "memory_misses")
+            if self.config.enable_disk_cache and not (fresh and entry.tier == TIER_MEMORY):
+                self._count("shared_hits" if fresh else "shared_misses")
+            if fresh:
+                self._count("hits")
+                return entry, None
+            
+            if self.config.enable_semantic_cache:
+                hit = await self._get_semantic(query, key, **kwargs)
+                if hit is not None:
+                    self._count("hits")
+                    return hit, None
+            
+            self._count("misses")
+            logger.info(f"Cache miss: {query[:50]}...")
+            return None, entry
+        finally:
+            self._lookup_latency.record(time.perf_counter() - start_time)
+    
+    async def _get_by_key(self, key: str, query: str) -> Optional[CacheHit]:
+        """Look up a fresh result for an exact cache key in the memory and shared tiers.
+        
+        Args:
+            key: The cache key
+            query: The query string, for logging
+            
+        Returns:
+            The cache hit, or None if not found or expired
+        """
+        entry = await self._load_entry(key, query)
+        if entry is None or self._is_expired(entry.timestamp):
+            return None
+        return entry
+    
+    async def _load_entry(self, key: str, query: str) -> Optional[CacheHit]:
+        """Load an exact cache key from the memory or shared tier, fresh or stale.
+        
+        A stale memory entry is only used if the shared tier has nothing
+        newer, since another process may have refreshed it there.
+        
+        Args:
+            key: The cache key
+            query: The query string, for logging
+            
+        Returns:
+            The entry with its timestamp and tier, or None if not found,
+            invalidated or past the retention period
+        """
+        stale = None
         # Check memory cache first
-        if self.config.enable_memory_cache and key in self._memory_cache:
-            value, timestamp = self._memory_cache[key]
-            if not self._is_expired(timestamp):
+        if self.config.enable_memory_cache:
+            with self._memory_lock:
+                entry = self._memory_cache.get(key)
+                if entry is not None and not self._is_current(entry[2]):
+                    self._memory_cache.pop(key)
+                    entry = None
+            if entry is not None and not self._is_expired(entry[1]):
                 logger.info(f"Cache hit (memory): {query[:50]}...")
-                return value
+                return CacheHit(entry[0], entry[1], TIER_MEMORY)
+            if entry is not None:
+                stale = CacheHit(entry[0], entry[1], TIER_MEMORY)
         
-        # Check disk cache if enabled
+        # Check the shared tier if enabled
         if self.config.enable_disk_cache:
-            cache_path = self._get_disk_cache_path(key)
-            if cache_path.exists():
-                try:
-                    # Load from disk asynchronously
-                    content = await asyncio.to_thread(
-                        self._load_from_disk, cache_path
-                    )
-                    if content:
-                        value, timestamp = content
+            try:
+                # Load from the backend asynchronously
+                start_time = time.perf_counter()
+                content = await asyncio.to_thread(self._backend.get, key)
+                self._load_latency.record(time.perf_counter() - start_time)
+                if content:
+                    value, timestamp, tags = content
+                    if not self._is_current(tags):
+                        # Written before its index changed; drop it now that it was found
+                        await asyncio.to_thread(self._backend.delete, key)
+                    elif time.time() - timestamp <= self._retention() and (stale is None or timestamp > stale.timestamp):
+                        # Update memory cache
+                        if self.config.enable_memory_cache:
+                            self._store_in_memory(key, value, timestamp, tags)
                         if not self._is_expired(timestamp):
-                            # Update memory cache
-                            if self.config.enable_memory_cache:
-                                self._memory_cache[key] = (value, timestamp)
-                            logger.info(f"Cache hit (disk): {query[:50]}...")
-                            return value
-                except Exception as e:
-                    logger.error(f"Error loading cache from disk: {str(e)}")
+                            logger.info(f"Cache hit ({self.config.cache_backend}): {query[:50]}...")
+                            return CacheHit(value, timestamp, TIER_SHARED)
+                        stale = CacheHit(value, timestamp, TIER_SHARED)
+            except Exception as e:
+                logger.error(f"Error loading cache from {self.config.cache_backend}: {str(e)}")
+        
+        return stale
+    
+    async def get_many(self, queries: List[str], **kwargs) -> List[Optional[Any]]:
+        """Get fresh cached results for several queries sharing the same parameters.
+        
+        Queries missing from the memory tier are read from the shared tier
+        in one batch, a single pipelined round trip for networked backends.
+        The semantic tier is not consulted.
+        
+        Args:
+            queries: The query strings
+            **kwargs: Additional parameters that affect the results
+            
+        Returns:
+            The cached result or None for each query, in order
+        """
+        await self._sync_tag_versions_if_due()
+        keys = [self._generate_key(query, **kwargs) for query in queries]
+        results: List[Optional[Any]] = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            entry = None
+            if self.config.enable_memory_cache:
+                with self._memory_lock:
+                    entry = self._memory_cache.get(key)
+            if entry is not None and self._is_current(entry[2]) and not self._is_expired(entry[1]):
+                results[i] = entry[0]
+            else:
+                missing.append(i)
+        if self.config.enable_memory_cache:
+            self._count("memory_hits", len(keys) - len(missing))
+            self._count("memory_misses", len(missing))
+        
+        if missing and self.config.enable_disk_cache:
+            try:
+                start_time = time.perf_counter()
+                contents = await asyncio.to_thread(self._backend.get_many, [keys[i] for i in missing])
+                self._load_latency.record(time.perf_counter() - start_time)
+            except Exception as e:
+                logger.error(f"Error loading cache from {self.config.cache_backend}: {str(e)}")
+                contents = []
+            for i, content in zip(missing, contents):
+                if content is None:
+                    continue
+                value, timestamp, tags = content
+                if self._is_current(tags) and not self._is_expired(timestamp):
+                    if self.config.enable_memory_cache:
+                        self._store_in_memory(keys[i], value, timestamp, tags)
+                    results[i] = value
+            found = sum(results[i] is not None for i in missing)
+            self._count("shared_hits", found)
+            self._count("shared_misses", len(missing) - found)
+        
+        found = sum(result is not None for result in results)
+        self._count("hits", found)
+        self._count("misses", len(results) - found)
+        logger.info(f"Cache batch lookup: {found}/{len(results)} hits")
+        return results
+    
+    async def _get_semantic(self, query: str, key: str, **kwargs) -> Optional[CacheHit]:
+        """Look up the answer of a cached paraphrase of a query.
+        
+        Args:
+            query: The query string
+            key: The exact cache key of the query
+            **kwargs: Additional parameters that affect the result
+            
+        Returns:
+            The cached result of the closest paraphrase, or None
+        """
+        vector = await self._embed_query(query)
+        if vector is None:
+            return None
         
-        logger.info(f"Cache miss: {query[:50]}...")
-        return None
+        match = self._semantic_cache.lookup(vector, self._generate_key("", **kwargs))
+        hit = None
+        if match is not None:
+            hit = await self._get_by_key(match.cache_key, match.query)
+            if hit is None:
+                # The answer expired or was evicted from the exact tiers
+                self._semantic_cache.remove(match.cache_key)
+        
+        if hit is None:
+            self._count("semantic_misses")
+            return None
+        
+        self._count("semantic_hits")
+        with self._semantic_lock:
+            self._semantic_served[key] = match.cache_key
+            while len(self._semantic_served) > self.config.semantic_cache_size:
+                self._semantic_served.popitem(last=False)
+        logger.info(
+            f"Cache hit (semantic, similarity {match.similarity:.3f}): "
+            f"{query[:50]}... matched {match.query[:50]}..."
+        )
+        return hit._replace(tier=TIER_SEMANTIC)
     
-    def _load_from_disk(self, path: Path) -> Optional[Tuple[Any, float]]:
-        """Load a cached item from disk.
+    async def _embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query for the semantic tier, reusing recent embeddings.
         
         Args:
-            path: Path to the cache file
+            query: The query string
             
         Returns:
-            Tuple of (value, timestamp) or None if loading fails
+            The query embedding, or None if embedding failed
         """
+        with self._semantic_lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                return vector
+        
+        if self._embeddings is None:
+            from modernrag.vector_store import get_embeddings
+            self._embeddings = get_embeddings()
         try:
-            with open(path, 'rb') as f:
-                return pickle.load(f)
+            vector = await asyncio.to_thread(self._embeddings.embed_query, query)
         except Exception as e:
-            logger.error(f"Failed to load cache from {path}: {str(e)}")
+            logger.warning(f"Failed to embed query for the semantic cache: {str(e)}")
             return None
+        
+        with self._semantic_lock:
+            self._query_vectors[query] = vector
+            while len(self._query_vectors) > 256:
+                self._query_vectors.popitem(last=False)
+        return vector
+    
+    def expires_in(self, query: str, **kwargs) -> Optional[float]:
+        """Get the time left before the cached result of a query expires.
+        
+        Does not load the cached value or count as an access.
+        
+        Args:
+            query: The query string
+            **kwargs: Additional parameters that affect the result
+            
+        Returns:
+            Seconds until the soft TTL passes, negative if the result is
+            already stale but still kept, or None if no valid result is cached
+        """
+        key = self._generate_key(query, **kwargs)
+        created = None
+        if self.config.enable_memory_cache:
+            with self._memory_lock:
+                entry = self._memory_cache.peek(key)
+            if entry is not None and self._is_current(entry[2]):
+                created = entry[1]
+        if created is None and self.config.enable_disk_cache:
+            try:
+                meta = self._backend.get_meta(key)
+            except Exception as e:
+                logger.warning(f"Error reading shared cache metadata: {str(e)}")
+                meta = None
+            if meta is not None and self._is_current(meta[1]):
+                created = meta[0]
+        if created is None or time.time() - created > self._retention():
+            return None
+        return created + self.config.cache_ttl - time.time()
+    
+    async def get_or_compute(
+        self,
+        query: str,
+        compute: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+        **kwargs
+    ) -> Any:
+        """Get a cached result, or compute and cache it exactly once.
+        
+        Concurrent misses for the same cache key are coalesced: the first
+        caller runs `compute` and caches its result, and the others await
+        that same result. If `compute` raises, every waiting caller receives
+        the exception and nothing is cached. The result is tagged with the
+        index versions from before `compute` started, so an index write
+        during the computation invalidates it.
+        
+        A result between the soft and hard TTL is returned at once, labelled
+        stale, and refreshed in the background. A result past the hard TTL
+        is recomputed, and returned labelled stale only if `compute` raises.
+        Dictionary results are returned as copies marked with whether they
+        were `cached`, the tier that served them and their age in seconds.
+        
+        Args:
+            query: The query string
+            compute: Coroutine function producing the result on a miss
+            refresh: Recompute and replace the result even if it is cached
+            **kwargs: Additional parameters that affect the result
+            
+        Returns:
+            The cached or computed result
+        """
+        key = self._generate_key(query, **kwargs)
+        
+        async def compute_and_cache():
+            tags = self.current_tags(**kwargs)
+            result = await compute()
+            await self._store(query, result, tags, **kwargs)
+            return result
+        
+        stale = None
+        if not refresh:
+            hit, stale = await self._lookup(query, key, **kwargs)
+            if hit is not None:
+                return self._label(hit)
+        
+        if stale is not None and time.time() - stale.timestamp <= self.config.cache_hard_ttl:
+            self._refresh_in_background(key, query, compute_and_cache)
+            self._count("stale_hits")
+            return self._label(stale, "revalidating")
+        
+        try:
+            result = await self._single_flight.do(key, compute_and_cache)
+        except Exception as e:
+            if stale is None:
+                raise
+            logger.warning(f"Serving stale result after error for {query[:50]}...: {str(e)}")
+            self._count("stale_on_error")
+            return self._label(stale, "error")
+        
+        if isinstance(result, dict):
+            return {**result, "cached": False, "cache_tier": None, "cache_age": 0.0}
+        return result
+    
+    def _label(self, hit: CacheHit, stale_reason: Optional[str] = None) -> Any:
+        """Label a cached result with where it came from, its age and staleness.
+        
+        Args:
+            hit: The cache hit
+            stale_reason: "revalidating" if a refresh is running, "error" if
+                recomputing failed, or None for a fresh result
+            
+        Returns:
+            A copy of a dictionary result with cache fields, or other results unchanged
+        """
+        if not isinstance(hit.value, dict):
+            return hit.value
+        age = time.time() - hit.timestamp
+        labelled = {**hit.value, "cached": True, "cache_tier": hit.tier, "cache_age": age}
+        if stale_reason is not None:
+            labelled.update(stale=True, stale_seconds=age - self.config.cache_ttl, stale_reason=stale_reason)
+        return labelled
+    
+    def _refresh_in_background(self, key: str, query: str, compute_and_cache: Callable[[], Awaitable[Any]]):
+        """Start refreshing a stale result, unless a refresh for it is already running.
+        
+        The refresh runs on an event loop owned by a background thread, so it
+        outlives the short-lived event loops that callers such as Streamlit use.
+        
+        Args:
+            key: The cache key
+            query: The query string, for logging
+            compute_and_cache: Coroutine function computing and caching the result
+        """
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_loop is None:
+                self._refresh_loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._refresh_loop.run_forever, name="query-cache-refresh", daemon=True
+                ).start()
+        
+        def done(future):
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+            if future.exception() is not None:
+                logger.warning(f"Background refresh failed for {query[:50]}...: {str(future.exception())}")
+        
+        logger.info(f"Refreshing stale result in the background: {query[:50]}...")
+        asyncio.run_coroutine_threadsafe(
+            self._single_flight.do(key, compute_and_cache), self._refresh_loop
+        ).add_done_callback(done)
+    
+    def refreshes_in_flight(self) -> int:
+        """Get the number of stale results being refreshed in the background."""
+        with self._refreshing_lock:
+            return len(self._refreshing)
+    
+    def coalesced_requests(self) -> int:
+        """Get the number of requests that waited for an in-flight computation."""
+        return self._single_flight.coalesced
     
     async def set(self, query: str, value: Any, **kwargs):
         """Cache a result for a query.
@@ -193,55 +779,60 @@ class QueryCache:
             value: The result to cache
             **kwargs: Additional parameters that affect the result
         """
+        await self._store(query, value, self.current_tags(**kwargs), **kwargs)
+    
+    async def _store(self, query: str, value: Any, tags: Dict[str, int], **kwargs):
+        """Cache a result under the given tag versions.
+        
+        Args:
+            query: The query string
+            value: The result to cache
+            tags: Versions of the tags the result depends on
+            **kwargs: Additional parameters that affect the result
+        """
         key = self._generate_key(query, **kwargs)
         timestamp = time.time()
         
         # Update memory cache
         if self.config.enable_memory_cache:
-            self._memory_cache[key] = (value, timestamp)
-            self._clean_memory_cache()
+            self._store_in_memory(key, value, timestamp, tags)
         
-        # Update disk cache if enabled
+        # Update the shared tier if enabled
         if self.config.enable_disk_cache:
-            cache_path = self._get_disk_cache_path(key)
             try:
-                # Save to disk asynchronously
+                # Save to the backend asynchronously
                 await asyncio.to_thread(
-                    self._save_to_disk, cache_path, (value, timestamp)
+                    self._backend.set, key, value, timestamp, timestamp + self._retention(), tags
                 )
             except Exception as e:
-                logger.error(f"Error saving cache to disk: {str(e)}")
+                logger.error(f"Error saving cache to {self.config.cache_backend}: {str(e)}")
         
-        logger.info(f"Cached result for query: {query[:50]}...")
-    
-    def _save_to_disk(self, path: Path, content: Tuple[Any, float]):
-        """Save a cached item to disk.
+        # Register the query so that paraphrases can find the answer
+        if self.config.enable_semantic_cache:
+            vector = await self._embed_query(query)
+            if vector is not None:
+                self._semantic_cache.add(
+                    key, query, vector, self._generate_key("", **kwargs), kwargs.get("index_name")
+                )
         
-        Args:
-            path: Path to the cache file
-            content: Tuple of (value, timestamp) to save
-        """
-        try:
-            with open(path, 'wb') as f:
-                pickle.dump(content, f)
-        except Exception as e:
-            logger.error(f"Failed to save cache to {path}: {str(e)}")
+        logger.info(f"Cached result for query: {query[:50]}...")
     
     async def clear(self):
         """Clear all cached items."""
         # Clear memory cache
         if self.config.enable_memory_cache:
-            self._memory_cache = {}
+            with self._memory_lock:
+                self._memory_cache.clear()
+        self._semantic_cache.clear()
+        with self._semantic_lock:
+            self._semantic_served.clear()
         
-        # Clear disk cache if enabled
+        # Clear the shared tier if enabled
         if self.config.enable_disk_cache:
             try:
-                cache_dir = Path(self.config.cache_dir)
-                if cache_dir.exists():
-                    for cache_file in cache_dir.glob("*.pickle"):
-                        await asyncio.to_thread(os.remove, cache_file)
+                await asyncio.to_thread(self._backend.clear)
             except Exception as e:
-                logger.error(f"Error clearing disk cache: {str(e)}")
+                logger.error(f"Error clearing {self.config.cache_backend} cache: {str(e)}")
         
         logger.info("Cache cleared")
     
@@ -254,27 +845,310 @@ class QueryCache:
         # Clear expired items from disk cache if enabled
         if self.config.enable_disk_cache:
             try:
-                cache_dir = Path(self.config.cache_dir)
-                if cache_dir.exists():
-                    for cache_file in cache_dir.glob("*.pickle"):
-                        try:
-                            content = await asyncio.to_thread(
-                                self._load_from_disk, cache_file
-                            )
-                            if content:
-                                _, timestamp = content
-                                if self._is_expired(timestamp):
-                                    await asyncio.to_thread(os.remove, cache_file)
-                        except Exception as e:
-                            logger.error(f"Error processing cache file {cache_file}: {str(e)}")
+                # Deletes through the expiry index without loading any values
+                removed = await asyncio.to_thread(self._backend.delete_expired)
+                self._count("shared_expirations", removed)
+                await asyncio.to_thread(self._backend.compact)
+                logger.info(f"Removed {removed} expired entries from the disk cache")
             except Exception as e:
                 logger.error(f"Error clearing expired disk cache: {str(e)}")
         
         logger.info("Expired cache items cleared")
+    
+    def sweep_expired(self) -> int:
+        """Remove one batch of expired items from the disk cache.
+        
+        The memory tier is left alone: its timer wheel already expires
+        entries on every get and set, from the thread that owns it.
+        
+        Returns:
+            Number of disk entries removed; equal to the batch size if more are due
+        """
+        if not self.config.enable_disk_cache:
+            return 0
+        removed = self._backend.delete_expired(limit=self.config.expiry_sweep_batch)
+        self._count("shared_expirations", removed)
+        return removed
+    
+    def _expiry_loop(self):
+        """Sweep expired items in small batches until stopped."""
+        while not self._expiry_stop.wait(self.config.expiry_sweep_interval):
+            try:
+                # Keep sweeping while full batches come back, yielding between them
+                while self.sweep_expired() >= self.config.expiry_sweep_batch:
+                    if self._expiry_stop.wait(0.01):
+                        return
+            except Exception as e:
+                logger.warning(f"Background cache expiry failed: {str(e)}")
+    
+    def start_background_expiry(self):
+        """Start the background expiry thread if it is not already running.
+        
+        A thread is used instead of an asyncio task so that expiry keeps
+        running when callers use short-lived event loops, as Streamlit does.
+        """
+        if self._expiry_thread is not None and self._expiry_thread.is_alive():
+            return
+        self._expiry_stop.clear()
+        self._expiry_thread = threading.Thread(
+            target=self._expiry_loop, name="query-cache-expiry", daemon=True
+        )
+        self._expiry_thread.start()
+        logger.info(f"Started cache expiry every {self.config.expiry_sweep_interval}s")
+    
+    def stop_background_expiry(self):
+        """Stop the background expiry thread."""
+        self._expiry_stop.set()
+        if self._expiry_thread is not None:
+            self._expiry_thread.join(timeout=self.config.expiry_sweep_interval)
+            self._expiry_thread = None
+    
+    def report_false_hit(self, query: str, **kwargs) -> bool:
+        """Report that a semantic cache hit returned the wrong answer.
+        
+        The cached query that matched is removed from the semantic tier, so
+        the paraphrase is not served again; its exact entry is kept.
+        
+        Args:
+            query: The query that received the wrong answer
+            **kwargs: Additional parameters of that query
+            
+        Returns:
+            True if the query had been answered by a semantic hit
+        """
+        with self._semantic_lock:
+            served_key = self._semantic_served.pop(self._generate_key(query, **kwargs), None)
+        if served_key is None:
+            return False
+        self._semantic_cache.remove(served_key)
+        self._count("semantic_false_hits")
+        logger.info(f"Removed semantic cache entry after false hit for: {query[:50]}...")
+        return True
+    
+    def invalidate_semantic_index(self, index_name: Optional[str]) -> int:
+        """Stop serving paraphrase matches for answers from an index.
+        
+        Args:
+            index_name: Name of the index
+            
+        Returns:
+            Number of semantic entries removed
+        """
+        removed = self._semantic_cache.invalidate_index(index_name)
+        logger.info(f"Invalidated {removed} semantic cache entries for index {index_name}")
+        return removed
+    
+    def memory_stats(self) -> Dict[str, int]:
+        """Get memory tier gauges.
+        
+        Returns:
+            Dictionary with the number of entries, their estimated size in
+            bytes, the byte budget, and the eviction and expiration counts.
+        """
+        return {
+            "entries": len(self._memory_cache),
+            "resident_bytes": self._memory_cache.resident_bytes,
+            "max_bytes": self.config.max_cache_bytes,
+            "evictions": self._memory_cache.evictions,
+            "expirations": self._memory_cache.expirations,
+        }
+    
+    def semantic_stats(self) -> Dict[str, int]:
+        """Get semantic tier counters.
+        
+        Returns:
+            Dictionary with the number of entries, hits, misses and reported false hits.
+        """
+        with self._counters_lock:
+            counters = dict(self._counters)
+        return {
+            "entries": len(self._semantic_cache),
+            "hits": counters.get("semantic_hits", 0),
+            "misses": counters.get("semantic_misses", 0),
+            "false_hits": counters.get("semantic_false_hits", 0),
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit rates, latencies and sizes of the cache.
+        
+        Counters cover this process since it started or since
+        `reset_stats`; sizes are read from the tiers now.
+        
+        Returns:
+            Dictionary with the request, hit and miss counts, the hit rate,
+            stale serves, hits and misses per tier, lookup and shared tier load latency
+            percentiles, evictions, expirations and sizes in bytes.
+        """
+        with self._counters_lock:
+            counters = dict(self._counters)
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        requests = hits + misses
+        
+        disk_bytes = None
+        if self.config.enable_disk_cache:
+            try:
+                disk_bytes = self._backend.size_bytes()
+            except Exception as e:
+                logger.warning(f"Could not measure the {self.config.cache_backend} cache: {str(e)}")
+        
+        return {
+            "requests": requests,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / requests if requests else 0.0,
+            "stale_hits": counters.get("stale_hits", 0),
+            "stale_on_error": counters.get("stale_on_error", 0),
+            "tiers": {
+                TIER_MEMORY: {"hits": counters.get("memory_hits", 0), "misses": counters.get("memory_misses", 0)},
+                TIER_SHARED: {
+                    "hits": counters.get("shared_hits", 0),
+                    "misses": counters.get("shared_misses", 0),
+                    "backend": self.config.cache_backend if self.config.enable_disk_cache else None,
+                },
+                TIER_SEMANTIC: {"hits": counters.get("semantic_hits", 0), "misses": counters.get("semantic_misses", 0)},
+            },
+            "latency": {
+                "lookup": self._lookup_latency.snapshot(),
+                "load": self._load_latency.snapshot(),
+            },
+            "evictions": self._memory_cache.evictions,
+            "expirations": {
+                TIER_MEMORY: self._memory_cache.expirations,
+                TIER_SHARED: counters.get("shared_expirations", 0),
+            },
+            "resident_bytes": self._memory_cache.resident_bytes,
+            "disk_bytes": disk_bytes,
+            "coalesced_requests": self.coalesced_requests(),
+            "refreshes_in_flight": self.refreshes_in_flight(),
+        }
+    
+    def reset_stats(self):
+        """Reset the lookup counters and latency histograms."""
+        with self._counters_lock:
+            self._counters.clear()
+        self._lookup_latency.reset()
+        self._load_latency.reset()
+
+
+class StageCache:
+    """Cache for the outputs of individual pipeline stages, such as reranking.
+    
+    Entries are keyed by the normalized query, the ordered chunks the stage
+    saw, the model and the prompt version, so a stage output is reused by
+    any request that feeds the stage the same input, whatever its other
+    parameters. Chunks are identified by their id and a hash of their
+    content, so a re-upserted chunk never matches an old entry.
+    """
+    
+    def __init__(self):
+        """Initialize the stage cache."""
+        self.config = get_cache_config()
+        self._cache = TinyLFUCache(self.config.stage_cache_size)
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._lock = threading.Lock()  # Requests, warm-up and refreshes use the cache from their own threads
+    
+    @staticmethod
+    def chunk_id(document: Document) -> str:
+        """Get the identifier of a chunk for stage cache keys.
+        
+        Covers the text and the metadata fields that the stage prompts cite,
+        so chunks with the same text from different sources do not share
+        an output.
+        """
+        cited = {key: document.metadata.get(key) for key in PROMPT_METADATA_KEYS}
+        content = json.dumps([document.page_content, cited], sort_keys=True, default=str)
+        content_hash = hashlib.md5(content.encode()).hexdigest()
+        return f"{getattr(document, 'id', None) or ''}:{content_hash}"
+    
+    def make_key(
+        self,
+        stage: str,
+        query: str,
+        documents: List[Document],
+        model: str,
+        prompt_version: int
+    ) -> str:
+        """Build the cache key of a stage output.
+        
+        Args:
+            stage: Name of the stage
+            query: The user query
+            documents: Documents given to the stage, in order
+            model: Name of the model the stage calls
+            prompt_version: Version of the stage's prompt
+            
+        Returns:
+            A hash key for the stage input
+        """
+        from modernrag.routing import normalize_query
+        
+        key_parts = [stage, normalize_query(query), model, str(prompt_version)]
+        key_parts.extend(self.chunk_id(doc) for doc in documents)
+        return hashlib.md5("|".join(key_parts).encode()).hexdigest()
+    
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Get a cached stage output and count the hit or miss.
+        
+        Args:
+            stage: Name of the stage
+            key: Key from make_key
+            
+        Returns:
+            The cached output, or None
+        """
+        if not self.config.enable_stage_cache:
+            return None
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self._misses[stage] = self._misses.get(stage, 0) + 1
+                return None
+            self._hits[stage] = self._hits.get(stage, 0) + 1
+        logger.info(f"Stage cache hit ({stage})")
+        return value
+    
+    def set(self, stage: str, key: str, value: Any):
+        """Cache a stage output until the cache TTL passes.
+        
+        Args:
+            stage: Name of the stage
+            key: Key from make_key
+            value: The stage output
+        """
+        if not self.config.enable_stage_cache:
+            return
+        with self._lock:
+            self._cache.set(key, value, expires_at=time.time() + self.config.cache_ttl)
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-stage counters.
+        
+        Returns:
+            Dictionary mapping each stage to its hits, misses and hit rate.
+        """
+        with self._lock:
+            hits = dict(self._hits)
+            misses = dict(self._misses)
+        return {
+            stage: {
+                "hits": hits.get(stage, 0),
+                "misses": misses.get(stage, 0),
+                "hit_rate": hits.get(stage, 0) / max(1, hits.get(stage, 0) + misses.get(stage, 0)),
+            }
+            for stage in sorted(set(hits) | set(misses))
+        }
+    
+    def clear(self):
+        """Remove all cached stage outputs."""
+        with self._lock:
+            self._cache.clear()
 
 
-# Create a singleton instance
+# Create singleton instances
 query_cache = QueryCache()
+stage_cache = StageCache()
 
 
 # Async API functions
@@ -283,6 +1157,26 @@ async def get_cached_result(query: str, **kwargs) -> Optional[Any]:
     return await query_cache.get(query, **kwargs)
 
 
+async def get_or_compute_result(
+    query: str,
+    compute: Callable[[], Awaitable[Any]],
+    refresh: bool = False,
+    **kwargs
+) -> Any:
+    """Get a cached result, or compute and cache it once for concurrent callers."""
+    return await query_cache.get_or_compute(query, compute, refresh=refresh, **kwargs)
+
+
+async def get_cached_results(queries: List[str], **kwargs) -> List[Optional[Any]]:
+    """Get fresh cached results for several queries in one batch."""
+    return await query_cache.get_many(queries, **kwargs)
+
+
+def get_result_expires_in(query: str, **kwargs) -> Optional[float]:
+    """Get the seconds until the cached result of a query expires, or None."""
+    return query_cache.expires_in(query, **kwargs)
+
+
 async def cache_result(query: str, value: Any, **kwargs):
     """Cache a result for a query."""
     await query_cache.set(query, value, **kwargs)
@@ -290,9 +1184,53 @@ async def cache_result(query: str, value: Any, **kwargs):
 
 async def clear_cache():
     """Clear all cached items."""
+    from modernrag.llm_cache import clear_llm_cache
+    
     await query_cache.clear()
+    stage_cache.clear()
+    await asyncio.to_thread(clear_llm_cache)
 
 
 async def clear_expired_cache():
     """Clear expired cached items."""
     await query_cache.clear_expired()
+
+
+def start_background_expiry():
+    """Start removing expired cached items incrementally in the background."""
+    query_cache.start_background_expiry()
+
+
+def invalidate_index_cache(index_name: str) -> int:
+    """Invalidate cached results retrieved from an index after it was written to."""
+    return query_cache.invalidate_index(index_name)
+
+
+async def get_index_version(index_name: str) -> int:
+    """Get the shared write version of an index, as bumped by invalidate_index_cache."""
+    return await query_cache.index_version(index_name)
+
+
+def get_stage_cache_stats() -> Dict[str, Dict[str, float]]:
+    """Get hits, misses and hit rate of each cached pipeline stage."""
+    return stage_cache.stats()
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get hit rates, latencies and sizes of the query cache."""
+    return query_cache.stats()
+
+
+def get_memory_cache_stats() -> Dict[str, int]:
+    """Get the entry count, resident bytes and evictions of the memory tier."""
+    return query_cache.memory_stats()
+
+
+def report_false_hit(query: str, **kwargs) -> bool:
+    """Report that a semantic cache hit returned the wrong answer."""
+    return query_cache.report_false_hit(query, **kwargs)
+
+
+def invalidate_semantic_cache(index_name: Optional[str]) -> int:
+    """Stop serving paraphrase matches for answers from an index."""
+    return query_cache.invalidate_semantic_index(index_name)
@@ -0,0 +1,128 @@
+"""
+Chunking Module for Modern RAG Application
+
+This module records chunk-to-parent links at ingestion time and rebuilds
+larger passages from neighbouring chunks at retrieval time, so that small
+chunks can be searched while the LLM sees well-formed context windows.
+"""
+
+import logging
+from typing import List, Dict, Optional, Sequence, Tuple
+
+from langchain.docstore.document import Document
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Metadata keys recorded on every chunk by split_and_upsert_documents
+PARENT_ID_KEY = "parent_id"
+CHUNK_INDEX_KEY = "chunk_index"
+START_INDEX_KEY = "start_index"
+
+
+def make_chunk_id(parent_id: str, chunk_index: int) -> str:
+    """Build the deterministic ID of a chunk from its parent and position.
+
+    Args:
+        parent_id: ID of the source document
+        chunk_index: Position of the chunk within the source document
+
+    Returns:
+        The chunk ID
+    """
+    return f"{parent_id}#{chunk_index}"
+
+
+def link_chunks(parent_id: str, chunks: List[Document]) -> List[str]:
+    """Record parent links on the chunks of one source document.
+
+    Args:
+        parent_id: ID of the source document
+        chunks: Chunks of the document, in order
+
+    Returns:
+        The IDs assigned to the chunks
+    """
+    ids = []
+    for chunk_index, chunk in enumerate(chunks):
+        chunk.metadata[PARENT_ID_KEY] = parent_id
+        chunk.metadata[CHUNK_INDEX_KEY] = chunk_index
+        chunk.id = make_chunk_id(parent_id, chunk_index)
+        ids.append(chunk.id)
+    return ids
+
+
+def plan_windows(
+    hits: Sequence[Tuple[Document, float]],
+    window: int
+) -> List[Tuple[str, int, int, float]]:
+    """Expand chunk hits to windows and merge overlapping or adjacent ones.
+
+    Args:
+        hits: (chunk, score) results from a vector search
+        window: Number of neighbouring chunks to include on each side
+
+    Returns:
+        List of (parent_id, first chunk index, last chunk index, best score),
+        ordered by descending score
+    """
+    ranges: Dict[str, List[Tuple[int, int, float]]] = {}
+    for document, score in hits:
+        parent_id = document.metadata.get(PARENT_ID_KEY)
+        chunk_index = document.metadata.get(CHUNK_INDEX_KEY)
+        if parent_id is None or chunk_index is None:
+            continue
+        chunk_index = int(chunk_index)
+        ranges.setdefault(parent_id, []).append(
+            (max(0, chunk_index - window), chunk_index + window, score)
+        )
+
+    windows = []
+    for parent_id, parent_ranges in ranges.items():
+        parent_ranges.sort()
+        first, last, best = parent_ranges[0]
+        for start, end, score in parent_ranges[1:]:
+            if start <= last + 1:
+                last = max(last, end)
+                best = max(best, score)
+            else:
+                windows.append((parent_id, first, last, best))
+                first, last, best = start, end, score
+        windows.append((parent_id, first, last, best))
+
+    windows.sort(key=lambda item: item[3], reverse=True)
+    return windows
+
+
+def merge_chunks(chunks: Sequence[Document]) -> str:
+    """Join consecutive chunks of one document, removing their overlap.
+
+    Chunks that carry a start offset are stitched at the exact character
+    position; otherwise they are joined with a newline.
+
+    Args:
+        chunks: Chunks in document order
+
+    Returns:
+        The merged text
+    """
+    text = ""
+    end: Optional[int] = None
+    for position, chunk in enumerate(chunks):
+        start = chunk.metadata.get(START_INDEX_KEY)
+        content = chunk.page_content
+        if position == 0:
+            text = content
+        elif start is not None and end is not None and start <= end:
+            text += content[end - start:]
+        else:
+            text += "\n" + content
+        if start is None:
+            end = None
+        else:
+            end = max(end or 0, start + len(content))
+    return text
@@ -0,0 +1,204 @@
+"""
+Dimension Reduction Module for Modern RAG Application
+
+This module provides per-index embedding dimension reduction. Storage,
+bandwidth and scoring cost all scale with the vector dimension, so an index
+can store shortened vectors while full-dimension vectors are stored with
+them for an optional re-scoring stage.
+
+Two methods are supported:
+- "truncate": Matryoshka truncation. Models trained with Matryoshka
+  representation learning (e.g. OpenAI text-embedding-3-*) produce
+  embeddings whose leading dimensions, renormalized, are the model's own
+  shortened embedding.
+- "pca": a PCA projection fitted on a sample of the index contents before
+  the first vectors are written, and stored alongside the index so the
+  same projection is used at query time.
+"""
+
+import base64
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Embedding model families that support native shortened embeddings
+MATRYOSHKA_MODEL_PREFIXES = ("text-embedding-3",)
+
+
+def encode_vector(vector) -> str:
+    """Encode a vector as a base64 string of float32 values.
+
+    Used to keep vectors in string-valued metadata, such as full-dimension
+    vectors next to the reduced ones stored in Pinecone.
+
+    Args:
+        vector: 1-D array-like of floats
+
+    Returns:
+        The encoded vector
+    """
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_vector(encoded: str) -> np.ndarray:
+    """Decode a vector encoded by encode_vector.
+
+    Args:
+        encoded: The encoded vector
+
+    Returns:
+        1-D float32 array
+    """
+    return np.frombuffer(base64.b64decode(encoded), dtype="<f4").astype(np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class DimensionReducer(ABC):
+    """Base class for reducing embeddings to a smaller dimension."""
+
+    method = "none"
+
+    def __init__(self, dimension: int):
+        """Initialize the reducer.
+
+        Args:
+            dimension: Target dimension of the reduced vectors
+        """
+        if dimension <= 0:
+            raise ValueError("Reduced dimension must be positive")
+        self.dimension = dimension
+
+    @property
+    def is_fitted(self) -> bool:
+        """Whether the reducer can transform vectors."""
+        return True
+
+    def fit(self, vectors: np.ndarray) -> "DimensionReducer":
+        """Fit the reducer on sample vectors. A no-op for stateless reducers."""
+        return self
+
+    @abstractmethod
+    def transform(self, vectors) -> np.ndarray:
+        """Reduce vectors to the target dimension.
+
+        Args:
+            vectors: 2-D array-like of full-dimension vectors
+
+        Returns:
+            Array of unit-length reduced vectors
+        """
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Get the fitted state to store with the index. Empty for stateless reducers."""
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        """Restore state returned by `state`.
+
+        Returns:
+            True if state was loaded
+        """
+        return False
+
+
+class TruncationReducer(DimensionReducer):
+    """Matryoshka truncation to the leading dimensions."""
+
+    method = "truncate"
+
+    def transform(self, vectors) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if matrix.shape[1] < self.dimension:
+            raise ValueError(
+                f"Cannot truncate {matrix.shape[1]}-dimension vectors to {self.dimension}"
+            )
+        return _normalize(matrix[:, :self.dimension])
+
+
+class PCAReducer(DimensionReducer):
+    """Projection onto the leading principal components of sample vectors."""
+
+    method = "pca"
+
+    def __init__(self, dimension: int):
+        super().__init__(dimension)
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.components is not None
+
+    def fit(self, vectors) -> "PCAReducer":
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+        if matrix.shape[0] < self.dimension:
+            raise ValueError(
+                f"PCA to {self.dimension} dimensions needs at least {self.dimension} "
+                f"sample vectors, got {matrix.shape[0]}"
+            )
+        self.mean = matrix.mean(axis=0)
+        # Rows of vt are the principal axes, ordered by explained variance
+        _, _, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+        self.components = vt[:self.dimension].astype(np.float32)
+        self.mean = self.mean.astype(np.float32)
+        logger.info(f"Fitted PCA projection to {self.dimension} dimensions on {matrix.shape[0]} vectors")
+        return self
+
+    def transform(self, vectors) -> np.ndarray:
+        if not self.is_fitted:
+            raise ValueError("PCA projection has not been fitted")
+        matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        return _normalize((matrix - self.mean) @ self.components.T)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        if not self.is_fitted:
+            return {}
+        return {"mean": self.mean, "components": self.components}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> bool:
+        if "mean" not in state or "components" not in state:
+            return False
+        components = np.atleast_2d(np.asarray(state["components"], dtype=np.float32))
+        if components.shape[0] != self.dimension:
+            logger.warning(f"Ignoring a {components.shape[0]}-dimension projection for {self.dimension} dimensions")
+            return False
+        self.mean = np.asarray(state["mean"], dtype=np.float32).reshape(-1)
+        self.components = components
+        return True
+
+
+def create_reducer(method: str, dimension: int, embedding_model: Optional[str] = None) -> DimensionReducer:
+    """Create a dimension reducer.
+
+    Args:
+        method: "truncate" or "pca"
+        dimension: Target dimension
+        embedding_model: Name of the embedding model, used to check truncation support
+
+    Returns:
+        The reducer
+    """
+    if method == "truncate":
+        if embedding_model and not embedding_model.startswith(MATRYOSHKA_MODEL_PREFIXES):
+            logger.warning(
+                f"Embedding model {embedding_model} may not support Matryoshka truncation; "
+                f"consider the pca method"
+            )
+        return TruncationReducer(dimension)
+    if method == "pca":
+        return PCAReducer(dimension)
+    raise ValueError(f"Unknown dimension reduction method: {method}")
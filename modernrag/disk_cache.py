@@ -0,0 +1,264 @@
+"""
+Disk Cache Module for Modern RAG Application
+
+This module provides the disk tier of the query cache as a single SQLite
+database in WAL mode. Each write is one atomic transaction, a crash leaves
+either the old or the new entry, and opening the cache does not read any
+entries. Expiry times live in their own indexed column, so a sweep walks
+that index to the expired rows only, including rows written by other
+processes sharing the file, and never loads a cached value. Values are
+stored in the versioned binary format of the serialization module rather
+than as pickles, and the per-entry pickle files of the old disk cache are
+removed when a database is first created. Each entry also records the
+versions of the tags it depends on, and the current tag versions are kept
+in a table of their own. It is the default backend of the shared cache
+tier, for processes on one host.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, List, Dict, Optional, Tuple
+
+from modernrag.serialization import ResultSerializer
+from modernrag.cache_backends import CacheBackend
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Bumped when the tables change; older cache files are emptied on open
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    tags TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires);
+CREATE TABLE IF NOT EXISTS tag_versions (
+    tag TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteDiskCache(CacheBackend):
+    """Key-value store for cached results backed by one SQLite file."""
+
+    def __init__(self, path: Path, serializer: Optional[ResultSerializer] = None):
+        """Open or create the cache database.
+
+        Args:
+            path: Path of the database file
+            serializer: Encoder for stored values. Uses zstd-compressed entries if not provided.
+        """
+        self.path = Path(path)
+        self.serializer = serializer or ResultSerializer()
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared by the worker threads of asyncio.to_thread
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        # Lets compact() return freed pages to the OS; only takes effect on a new file
+        self._connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            # Entries of an older layout cannot be read; a cache can simply start over
+            self._connection.executescript("DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS tag_versions;")
+            self._connection.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+            self._remove_legacy_files()
+        self._connection.executescript(_SCHEMA)
+
+    def _remove_legacy_files(self) -> None:
+        """Delete the one-file-per-entry pickles the old disk cache left in the cache directory."""
+        for cache_file in self.path.parent.glob("*.pickle"):
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                logger.warning(f"Failed to remove legacy cache file {cache_file}: {str(e)}")
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, Dict[str, int]]]:
+        """Load an entry.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Tuple of (value, created timestamp, tag versions), or None if missing or unreadable
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, created, tags FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return self.serializer.loads(row[0]), row[1], json.loads(row[2])
+        except Exception as e:
+            logger.error(f"Failed to decode disk cache entry {key}: {str(e)}")
+            self.delete(key)
+            return None
+
+    def get_many(self, keys: List[str]) -> List[Optional[Tuple[Any, float, Dict[str, int]]]]:
+        """Load several entries with one query.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            List with a (value, created, tags) tuple or None for each key, in order
+        """
+        if not keys:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, value, created, tags FROM entries WHERE key IN ({', '.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+        found = {}
+        for key, payload, created, tags in rows:
+            try:
+                found[key] = (self.serializer.loads(payload), created, json.loads(tags))
+            except Exception as e:
+                logger.error(f"Failed to decode disk cache entry {key}: {str(e)}")
+                self.delete(key)
+        return [found.get(key) for key in keys]
+
+    def get_meta(self, key: str) -> Optional[Tuple[float, Dict[str, int]]]:
+        """Load the creation time and tag versions of an entry without its value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Tuple of (created timestamp, tag versions), or None if missing
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT created, tags FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        created: float,
+        expires: float,
+        tags: Optional[Dict[str, int]] = None
+    ):
+        """Write an entry in a single atomic transaction.
+
+        Args:
+            key: The cache key
+            value: The value to store
+            created: Timestamp when the value was produced
+            expires: Timestamp after which the entry may be deleted
+            tags: Versions of the tags the value depends on
+        """
+        payload = self.serializer.dumps(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, expires, size, tags) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, created, expires, len(payload), json.dumps(tags or {}))
+            )
+
+    def delete(self, key: str) -> bool:
+        """Delete an entry.
+
+        Returns:
+            True if the entry existed
+        """
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def delete_expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Delete entries whose expiry time has passed.
+
+        The expired rows are found through the index on the expiry column,
+        oldest first, so the cost is O(expired * log n) and no cached value
+        is read. The delete is a single statement, so a failure such as a
+        busy database leaves nothing half done and the rows are retried on
+        the next sweep.
+
+        Args:
+            now: Current time. Uses the wall clock if not provided.
+            limit: Maximum number of entries to delete, for incremental sweeps
+
+        Returns:
+            Number of entries deleted
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries WHERE expires <= ? ORDER BY expires LIMIT ?)",
+                (now, -1 if limit is None else limit)
+            )
+        return cursor.rowcount
+
+    def get_tag_versions(self) -> Dict[str, int]:
+        """Load the current version of every tag that has been bumped."""
+        with self._lock:
+            return dict(self._connection.execute("SELECT tag, version FROM tag_versions").fetchall())
+
+    def set_tag_version(self, tag: str, version: int):
+        """Raise the stored version of a tag to at least `version`."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO tag_versions (tag, version) VALUES (?, ?) "
+                "ON CONFLICT(tag) DO UPDATE SET version = MAX(version, excluded.version)",
+                (tag, version)
+            )
+
+    def bump_tag_version(self, tag: str) -> int:
+        """Atomically increment the version of a tag across processes sharing the file."""
+        with self._lock:
+            return self._connection.execute(
+                "INSERT INTO tag_versions (tag, version) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET version = version + 1 RETURNING version",
+                (tag,)
+            ).fetchone()[0]
+
+    def compact(self):
+        """Fold the write-ahead log into the database and release free pages."""
+        with self._lock:
+            self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._connection.execute("PRAGMA incremental_vacuum")
+
+    def clear(self):
+        """Delete all entries and reclaim the file space."""
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.execute("VACUUM")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def size_bytes(self) -> Optional[int]:
+        """Get the size of the database file and its write-ahead log."""
+        total = 0
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                total += os.path.getsize(f"{self.path}{suffix}")
+            except OSError:
+                pass
+        return total
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -6,6 +6,7 @@ and generating responses using LLMs with the retrieved context.
 """
 
 import os
+import time
 import logging
 import asyncio
 from typing import List, Dict, Any, Optional, Union, Tuple
@@ -23,7 +24,11 @@ from pydantic import Field
 from pydantic_settings import BaseSettings
 
 # Import our vector store module
-from modernrag.vector_store import vector_store_manager, similarity_search
+from modernrag.vector_store import vector_store_manager, similarity_search, get_embeddings
+from modernrag.routing import QueryRouter, RouteDecision, ROUTE_CANNED, ROUTE_GENERATE, ROUTE_RAG
+from modernrag.caching import invalidate_index_cache, get_index_version, stage_cache
+from modernrag.llm_cache import CachingLLM
+from modernrag.query_log import record_query
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +40,10 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Bump when a stage prompt changes, so cached outputs of the old prompt are not reused
+RERANK_PROMPT_VERSION = 1
+AUGMENT_PROMPT_VERSION = 1
+
 
 class GenerationConfig(BaseSettings):
     """Configuration settings for generation operations."""
@@ -59,14 +68,18 @@ def get_generation_config() -> GenerationConfig:
 
 
 @lru_cache()
-def get_llm() -> ChatOpenAI:
-    """Get the LLM instance."""
+def get_llm() -> CachingLLM:
+    """Get the LLM instance, wrapped in the LLM response cache.
+    
+    Whether a call is cached depends on the configured temperature; see
+    `llm_cache_max_temperature`.
+    """
     config = get_generation_config()
-    return ChatOpenAI(
+    return CachingLLM(ChatOpenAI(
         model=config.llm_model,
         temperature=config.temperature,
         max_tokens=config.max_tokens
-    )
+    ))
 
 
 class AugmentationManager:
@@ -76,6 +89,7 @@ class AugmentationManager:
         """Initialize the augmentation manager."""
         self.config = get_generation_config()
         self.llm = get_llm()
+        self.stage_cache = stage_cache
     
     async def rerank_documents(
         self, 
@@ -100,6 +114,14 @@ class AugmentationManager:
             if len(docs) <= top_k:
                 return docs
             
+            # The full ranking is cached, so a request with another top_k reuses it
+            cache_key = self.stage_cache.make_key(
+                "rerank", query, docs, self.config.llm_model, RERANK_PROMPT_VERSION
+            )
+            reranked_indices = self.stage_cache.get("rerank", cache_key)
+            if reranked_indices is not None:
+                return [docs[idx] for idx in reranked_indices][:top_k]
+            
             # Create a prompt for reranking
             rerank_prompt = PromptTemplate.from_template(
                 """You are an expert at determining relevance of documents to a query.
@@ -136,9 +158,11 @@ class AugmentationManager:
             
             # Parse the response to get the reranked order
             reranked_indices = [int(idx.strip()) - 1 for idx in response.content.split(',')]
+            reranked_indices = [idx for idx in reranked_indices if 0 <= idx < len(docs)]
+            self.stage_cache.set("rerank", cache_key, reranked_indices)
             
             # Return the reranked documents, limited to top_k
-            reranked_docs = [docs[idx] for idx in reranked_indices if idx < len(docs)][:top_k]
+            reranked_docs = [docs[idx] for idx in reranked_indices][:top_k]
             
             logger.info(f"Reranked {len(docs)} documents to {len(reranked_docs)} most relevant")
             return reranked_docs
@@ -164,6 +188,13 @@ class AugmentationManager:
             Augmented context as a string
         """
         try:
+            cache_key = self.stage_cache.make_key(
+                "augment", query, documents, self.config.llm_model, AUGMENT_PROMPT_VERSION
+            )
+            augmented_context = self.stage_cache.get("augment", cache_key)
+            if augmented_context is not None:
+                return augmented_context
+            
             # Create a prompt for augmentation
             augment_prompt = PromptTemplate.from_template(
                 """You are an expert at extracting and synthesizing relevant information from documents.
@@ -205,6 +236,7 @@ class AugmentationManager:
             )
             
             augmented_context = response.content
+            self.stage_cache.set("augment", cache_key, augmented_context)
             
             logger.info(f"Augmented {len(documents)} documents into synthesized context")
             return augmented_context
@@ -226,17 +258,20 @@ class GenerationManager:
         self.config = get_generation_config()
         self.llm = get_llm()
         self.augmentation_manager = AugmentationManager()
+        self.router = QueryRouter(get_embeddings())
     
     async def generate_response(
         self, 
         query: str, 
-        context: str
+        context: str,
+        raise_errors: bool = False
     ) -> str:
         """Generate a response to the query using the provided context.
         
         Args:
             query: The user query
             context: The context information to use for generation
+            raise_errors: Whether to raise LLM errors instead of returning an apology
             
         Returns:
             Generated response as a string
@@ -278,6 +313,8 @@ class GenerationManager:
             
         except Exception as e:
             logger.error(f"Failed to generate response: {str(e)}")
+            if raise_errors:
+                raise
             return f"I'm sorry, I encountered an error while generating a response: {str(e)}"
     
     async def retrieve_augment_generate(
@@ -287,10 +324,19 @@ class GenerationManager:
         k: int = 4,
         score_threshold: Optional[float] = 0.4,
         rerank_top_k: int = 3,
-        use_cache: bool = True
+        use_cache: bool = True,
+        use_router: bool = True,
+        refresh_cache: bool = False
     ) -> Dict[str, Any]:
         """Complete RAG pipeline: retrieve, augment, and generate.
         
+        Unless routing is disabled, greetings and similar messages get a
+        canned response and conversational messages go straight to the LLM,
+        skipping retrieval, reranking and augmentation.
+        
+        Concurrent identical queries share one pipeline run when caching is
+        enabled, and cached repeats are served without routing.
+        
         Args:
             query: The user query
             index_name: Name of the index to search in
@@ -298,52 +344,99 @@ class GenerationManager:
             score_threshold: Minimum similarity score threshold
             rerank_top_k: Number of documents to keep after reranking
             use_cache: Whether to use caching for this query
+            use_router: Whether to route queries that need no retrieval past the pipeline
+            refresh_cache: Whether to rerun the pipeline and replace a cached result
             
         Returns:
-            Dictionary containing the query, retrieved documents, augmented context, and generated response
+            Dictionary containing the query, retrieved documents, augmented context, generated response and route
         """
+        start_time = time.perf_counter()
         try:
-            # Try to get cached result if caching is enabled
+            # Routed only on a cache miss, so that cached repeats skip the router
+            async def run_pipeline():
+                return await self._run_pipeline(
+                    query, index_name, k, score_threshold, rerank_top_k, use_router, start_time
+                )
+            
             if use_cache:
-                from modernrag.caching import get_cached_result, cache_result
+                from modernrag.caching import get_or_compute_result
                 
                 # Create cache parameters
                 cache_params = {
-                    "index_name": index_name,
+                    # Resolved so that the entry is tagged with the index it depends on
+                    "index_name": index_name or vector_store_manager.config.default_index_name,
                     "k": k,
                     "score_threshold": score_threshold,
                     "rerank_top_k": rerank_top_k
                 }
                 
-                # Try to get cached result
-                cached_result = await get_cached_result(query, **cache_params)
-                if cached_result is not None:
-                    logger.info(f"Using cached result for query: {query[:50]}...")
-                    return cached_result
-            
-            # Step 1: Retrieve relevant documents
-            retrieved_docs = await similarity_search(
-                query=query,
-                index_name=index_name,
-                k=k,
-                score_threshold=score_threshold
-            )
+                # Served from the cache, or computed once for all concurrent identical queries
+                return await get_or_compute_result(query, run_pipeline, refresh=refresh_cache, **cache_params)
             
-            if not retrieved_docs:
-                result = {
-                    "query": query,
-                    "retrieved_docs": [],
-                    "augmented_context": "",
-                    "response": "I couldn't find any relevant information to answer your query."
-                }
-                
-                # Cache the result if caching is enabled
-                if use_cache:
-                    from modernrag.caching import cache_result
-                    await cache_result(query, result, **cache_params)
-                    
-                return result
+            return await run_pipeline()
+            
+        except Exception as e:
+            logger.error(f"Error in RAG pipeline: {str(e)}")
+            result = {
+                "query": query,
+                "error": str(e),
+                "response": f"I'm sorry, I encountered an error while processing your query: {str(e)}"
+            }
+            
+            return result
+    
+    async def _run_pipeline(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        rerank_top_k: int,
+        use_router: bool,
+        start_time: float
+    ) -> Dict[str, Any]:
+        """Route a cache miss and run retrieval, reranking, augmentation and generation.
+        
+        The routing decision is cached with the result, so a cached repeat
+        is served without routing the query again. Errors, including LLM
+        errors, are raised rather than turned into a result, so that they
+        are never cached and a stale cached answer can be served instead.
+        
+        Args:
+            query: The user query
+            index_name: Name of the index to search in
+            k: Number of documents to retrieve
+            score_threshold: Minimum similarity score threshold
+            rerank_top_k: Number of documents to keep after reranking
+            use_router: Whether to route queries that need no retrieval past the pipeline
+            start_time: perf_counter() value when the request started
             
+        Returns:
+            Result dictionary of the pipeline
+        """
+        decision = await self.router.route(query) if use_router else None
+        if decision is not None and decision.route in (ROUTE_CANNED, ROUTE_GENERATE):
+            result = await self._answer_without_retrieval(query, decision)
+            self.router.record(decision.route, time.perf_counter() - start_time)
+            return result
+        
+        # Step 1: Retrieve relevant documents
+        retrieved_docs = await similarity_search(
+            query=query,
+            index_name=index_name,
+            k=k,
+            score_threshold=score_threshold
+        )
+        
+        if not retrieved_docs:
+            result = {
+                "query": query,
+                "retrieved_docs": [],
+                "augmented_context": "",
+                "response": "I couldn't find any relevant information to answer your query.",
+                "route": ROUTE_RAG
+            }
+        else:
             # Step 2: Rerank documents
             reranked_docs = await self.augmentation_manager.rerank_documents(
                 query=query,
@@ -360,40 +453,66 @@ class GenerationManager:
             # Step 4: Generate response
             response = await self.generate_response(
                 query=query,
-                context=augmented_context
+                context=augmented_context,
+                raise_errors=True
             )
             
-            import time
             result = {
                 "query": query,
                 "retrieved_docs": retrieved_docs,
                 "augmented_context": augmented_context,
                 "response": response,
                 "cached": False,
+                "route": ROUTE_RAG,
                 "timestamp": time.time()
             }
+        
+        if decision is not None:
+            self.router.record(ROUTE_RAG, time.perf_counter() - start_time)
+        return result
+    
+    async def _answer_without_retrieval(self, query: str, decision: RouteDecision) -> Dict[str, Any]:
+        """Answer a query that the router sent past the retrieval pipeline.
+        
+        Args:
+            query: The user query
+            decision: The routing decision for the query
             
-            # Cache the result if caching is enabled
-            if use_cache:
-                from modernrag.caching import cache_result
-                await cache_result(query, result, **cache_params)
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error in RAG pipeline: {str(e)}")
-            result = {
-                "query": query,
-                "error": str(e),
-                "response": f"I'm sorry, I encountered an error while processing your query: {str(e)}"
-            }
-            
-            return result
+        Returns:
+            Result dictionary in the same shape as the full pipeline's
+        """
+        if decision.route == ROUTE_CANNED:
+            response = decision.response
+        else:
+            response = await self.generate_response(
+                query=query,
+                context="No documents were retrieved; this is a conversational message.",
+                raise_errors=True
+            )
+        logger.info(f"Routed query to {decision.route} ({decision.reason}): {query[:50]}...")
+        return {
+            "query": query,
+            "retrieved_docs": [],
+            "augmented_context": "",
+            "response": response,
+            "cached": False,
+            "route": decision.route,
+            "timestamp": time.time()
+        }
+    
+    def router_stats(self) -> Dict[str, Any]:
+        """Get per-route counts and the latency saved by skipping the pipeline."""
+        return self.router.stats()
 
 # Create singleton instances
 augmentation_manager = AugmentationManager()
 generation_manager = GenerationManager()
 
+# Cached answers are invalidated when the index they were retrieved from changes
+vector_store_manager.add_write_listener(invalidate_index_cache)
+# Those invalidations are shared between processes, so retrieval caches follow writes made elsewhere
+vector_store_manager.set_generation_source(get_index_version)
+
 # Async API functions
 async def rerank_documents(
     query: str, 
@@ -426,9 +545,29 @@ async def retrieve_augment_generate(
     k: int = 4,
     score_threshold: Optional[float] = 0.4,
     rerank_top_k: int = 3,
-    use_cache: bool = True
+    use_cache: bool = True,
+    use_router: bool = True
 ) -> Dict[str, Any]:
-    """Complete RAG pipeline: retrieve, augment, and generate."""
-    return await generation_manager.retrieve_augment_generate(
-        query, index_name, k, score_threshold, rerank_top_k, use_cache
+    """Complete RAG pipeline: retrieve, augment, and generate.
+    
+    Cached queries are counted in the query log, so that the most frequent
+    ones can be warmed in the background.
+    """
+    result = await generation_manager.retrieve_augment_generate(
+        query, index_name, k, score_threshold, rerank_top_k, use_cache, use_router
     )
+    if use_cache and "error" not in result and result.get("route") != ROUTE_CANNED:
+        # Logged with the same parameters the result is cached under
+        await record_query(
+            query,
+            index_name=index_name or vector_store_manager.config.default_index_name,
+            k=k,
+            score_threshold=score_threshold,
+            rerank_top_k=rerank_top_k
+        )
+    return result
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """Get per-route counts and the latency saved by skipping the pipeline."""
+    return generation_manager.router_stats()
@@ -0,0 +1,191 @@
+"""
+Index Registry Module for Modern RAG Application
+
+This module keeps a cached view of Pinecone index metadata (existence,
+dimension and stats) so that the query path does not need a control-plane
+round trip. Entries expire after a TTL, concurrent checks for the same index
+share a single request, and a background thread refreshes known indexes
+before their entries go stale.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, List, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class IndexInfo(BaseModel):
+    """Cached metadata about a single index."""
+    name: str
+    exists: bool
+    dimension: Optional[int] = None
+    stats: Dict[str, Any] = Field(default_factory=dict)
+    checked_at: float = Field(default_factory=time.time)
+
+
+class IndexRegistry:
+    """TTL cache of index metadata with deduplicated checks and background refresh."""
+
+    def __init__(self, client: Any, ttl: float = 300.0, refresh_interval: float = 60.0):
+        """Initialize the registry.
+
+        Args:
+            client: Pinecone client used for control-plane calls
+            ttl: Seconds an existence check stays valid
+            refresh_interval: Seconds between background refreshes
+        """
+        self._client = client
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[str, IndexInfo] = {}
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def get(self, index_name: str) -> Optional[IndexInfo]:
+        """Return the cached entry for an index, if any, regardless of age."""
+        return self._entries.get(index_name)
+
+    def is_fresh(self, index_name: str) -> bool:
+        """Check whether an index has a cached entry younger than the TTL."""
+        entry = self._entries.get(index_name)
+        return entry is not None and time.time() - entry.checked_at <= self.ttl
+
+    def mark(self, index_name: str, exists: bool, dimension: Optional[int] = None):
+        """Record the existence of an index after creating or deleting it."""
+        previous = self._entries.get(index_name)
+        self._entries[index_name] = IndexInfo(
+            name=index_name,
+            exists=exists,
+            dimension=dimension if dimension is not None else (previous.dimension if previous and exists else None),
+            stats=previous.stats if previous and exists else {}
+        )
+
+    def forget(self, index_name: str):
+        """Drop the cached entry for an index."""
+        self._entries.pop(index_name, None)
+
+    async def exists(self, index_name: str) -> bool:
+        """Check whether an index exists, using the cache when it is fresh.
+
+        Concurrent calls for the same index while a check is in flight share
+        the result of that single check.
+
+        Args:
+            index_name: Name of the index
+
+        Returns:
+            True if the index exists
+        """
+        if self.is_fresh(index_name):
+            return self._entries[index_name].exists
+
+        with self._lock:
+            future = self._inflight.get(index_name)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._inflight[index_name] = future
+
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            exists = await asyncio.to_thread(self._client.has_index, index_name)
+            self.mark(index_name, bool(exists))
+            future.set_result(bool(exists))
+            return bool(exists)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(index_name, None)
+
+    def refresh(self, index_name: str) -> IndexInfo:
+        """Synchronously reload existence, dimension and stats for an index.
+
+        Args:
+            index_name: Name of the index
+
+        Returns:
+            The refreshed entry
+        """
+        exists = bool(self._client.has_index(index_name))
+        dimension = None
+        stats: Dict[str, Any] = {}
+        if exists:
+            description = self._client.describe_index(index_name)
+            dimension = getattr(description, "dimension", None)
+            raw_stats = self._client.Index(index_name).describe_index_stats()
+            stats = raw_stats.to_dict() if hasattr(raw_stats, "to_dict") else dict(raw_stats)
+        entry = IndexInfo(name=index_name, exists=exists, dimension=dimension, stats=stats)
+        self._entries[index_name] = entry
+        return entry
+
+    def _refresh_loop(self):
+        """Refresh every known index until stopped."""
+        while not self._stop_event.wait(self.refresh_interval):
+            for index_name in list(self._entries):
+                try:
+                    self.refresh(index_name)
+                except Exception as e:
+                    # Keep serving the previous entry; it will be retried next round
+                    logger.warning(f"Failed to refresh index {index_name}: {str(e)}")
+
+    def start_background_refresh(self):
+        """Start the background refresh thread if it is not already running.
+
+        A thread is used instead of an asyncio task so that refreshes keep
+        running when callers use short-lived event loops, as Streamlit does.
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_loop, name="index-registry-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+        logger.info(f"Started index registry refresh every {self.refresh_interval}s")
+
+    def stop_background_refresh(self):
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=self.refresh_interval)
+            self._refresh_thread = None
+
+    async def prewarm(self, index_names: List[str]) -> Dict[str, IndexInfo]:
+        """Load full metadata for several indexes concurrently.
+
+        Args:
+            index_names: Names of the indexes to load
+
+        Returns:
+            Mapping of index name to entry for the indexes that could be loaded
+        """
+        outcomes = await asyncio.gather(*[
+            asyncio.to_thread(self.refresh, index_name) for index_name in index_names
+        ], return_exceptions=True)
+
+        entries = {}
+        for index_name, outcome in zip(index_names, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Failed to prewarm index {index_name}: {str(outcome)}")
+            else:
+                entries[index_name] = outcome
+        return entries
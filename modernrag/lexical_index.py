@@ -0,0 +1,222 @@
+"""
+Lexical Index Module for Modern RAG Application
+
+This module provides a local inverted index with BM25 scoring. Posting lists
+are stored as delta-encoded varints so that exact identifiers and rare terms
+can be matched cheaply alongside dense vector retrieval.
+"""
+
+import re
+import math
+import logging
+import threading
+from typing import Any, List, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+
+from modernrag.metadata_index import MetadataIndex
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Keeps dotted and dashed identifiers such as "gpt-4o" or "v1.2.3" as one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+(?:[.\-][a-z0-9_]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase lexical tokens.
+
+    Args:
+        text: The text to tokenize
+
+    Returns:
+        List of tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def encode_varint(value: int, buffer: bytearray):
+    """Append a non-negative integer to a buffer as a LEB128 varint."""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def decode_postings(buffer: bytes) -> Iterator[Tuple[int, int]]:
+    """Decode a delta-encoded posting list.
+
+    Args:
+        buffer: Encoded posting list of (doc gap, term frequency) varint pairs
+
+    Yields:
+        (document number, term frequency) pairs in ascending document order
+    """
+    doc_number = 0
+    value = shift = 0
+    pending_gap = None
+    for byte in buffer:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if pending_gap is None:
+            pending_gap = value
+        else:
+            doc_number += pending_gap
+            yield doc_number, value
+            pending_gap = None
+        value = shift = 0
+
+
+class _PostingList:
+    """A compressed posting list that supports appends in document order."""
+
+    __slots__ = ("data", "last_doc", "doc_freq")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.last_doc = 0
+        self.doc_freq = 0
+
+    def append(self, doc_number: int, term_freq: int):
+        encode_varint(doc_number - self.last_doc, self.data)
+        encode_varint(term_freq, self.data)
+        self.last_doc = doc_number
+        self.doc_freq += 1
+
+
+class InvertedIndex:
+    """Local inverted index with precomputed BM25 statistics."""
+
+    def __init__(self, name: str, k1: float = 1.2, b: float = 0.75):
+        """Initialize an empty inverted index.
+
+        Args:
+            name: Name of the vector store index this index mirrors
+            k1: BM25 term frequency saturation parameter
+            b: BM25 document length normalization parameter
+        """
+        self.name = name
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, _PostingList] = {}
+        self._documents: List[Optional[Document]] = []
+        self._doc_lengths: List[int] = []
+        self._number_by_id: Dict[str, int] = {}
+        self._live_docs = 0
+        self._total_length = 0
+        self._idf: Dict[str, float] = {}
+        self._length_norms: Optional[np.ndarray] = None
+        self._metadata = MetadataIndex()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._live_docs
+
+    def _remove(self, doc_id: str):
+        """Tombstone a document so that it no longer contributes to scores."""
+        doc_number = self._number_by_id.pop(doc_id)
+        document = self._documents[doc_number]
+        for term in set(tokenize(document.page_content)):
+            self._postings[term].doc_freq -= 1
+        self._documents[doc_number] = None
+        self._metadata.remove(doc_number)
+        self._live_docs -= 1
+        self._total_length -= self._doc_lengths[doc_number]
+
+    def add(self, ids: Sequence[str], documents: Sequence[Document]):
+        """Index documents, replacing any previous version with the same ID.
+
+        Args:
+            ids: Unique IDs of the documents
+            documents: Documents to index, one per ID
+        """
+        if len(ids) != len(documents):
+            raise ValueError("ids and documents must have the same length")
+
+        with self._lock:
+            for doc_id, document in zip(ids, documents):
+                if doc_id in self._number_by_id:
+                    self._remove(doc_id)
+
+                tokens = tokenize(document.page_content)
+                doc_number = len(self._documents)
+                self._documents.append(document)
+                self._doc_lengths.append(len(tokens))
+                self._number_by_id[doc_id] = doc_number
+                self._metadata.set(doc_number, document.metadata)
+                self._live_docs += 1
+                self._total_length += len(tokens)
+
+                term_freqs: Dict[str, int] = {}
+                for token in tokens:
+                    term_freqs[token] = term_freqs.get(token, 0) + 1
+                for term, freq in term_freqs.items():
+                    if term not in self._postings:
+                        self._postings[term] = _PostingList()
+                    self._postings[term].append(doc_number, freq)
+
+            # Statistics depend on the collection size, so refresh them lazily
+            self._idf = {}
+            self._length_norms = None
+
+    def _refresh_statistics(self):
+        """Precompute per-document length norms for BM25."""
+        avg_length = self._total_length / max(1, self._live_docs)
+        lengths = np.asarray(self._doc_lengths, dtype=np.float64)
+        self._length_norms = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1e-9))
+
+    def _term_idf(self, term: str) -> float:
+        """Return the cached BM25 inverse document frequency of a term."""
+        idf = self._idf.get(term)
+        if idf is None:
+            doc_freq = self._postings[term].doc_freq
+            idf = math.log(1 + (self._live_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            self._idf[term] = idf
+        return idf
+
+    def search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Score documents against a query with BM25.
+
+        Args:
+            query: The query string
+            k: Number of results to return
+            filter: Pinecone-style metadata filter restricting the candidates
+
+        Returns:
+            List of (document, BM25 score) tuples, best first
+        """
+        with self._lock:
+            if self._live_docs == 0:
+                return []
+            if self._length_norms is None:
+                self._refresh_statistics()
+            allowed = self._metadata.mask(filter, len(self._documents)) if filter else None
+
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if postings is None or postings.doc_freq == 0:
+                    continue
+                idf = self._term_idf(term)
+                for doc_number, freq in decode_postings(postings.data):
+                    if self._documents[doc_number] is None:
+                        continue
+                    if allowed is not None and not allowed[doc_number]:
+                        continue
+                    term_score = idf * freq * (self.k1 + 1) / (freq + self._length_norms[doc_number])
+                    scores[doc_number] = scores.get(doc_number, 0.0) + term_score
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._documents[doc_number], score) for doc_number, score in best]
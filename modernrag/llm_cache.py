@@ -0,0 +1,224 @@
+"""
+LLM Cache Module for Modern RAG Application
+
+This module provides a caching wrapper around chat models. Responses are
+keyed by a hash of the model, temperature, token limit and messages, and
+stored in the same kinds of tier as query results: a W-TinyLFU memory
+tier with a budget of its own, in front of the configured shared tier
+(SQLite, Redis, shared memory or sharded Redis) under a namespace of its
+own. Only calls at a deterministic temperature are cached, since sampling
+at a higher temperature is expected to vary.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from modernrag.caching import get_cache_config, create_cache_backend
+from modernrag.cache_policy import TinyLFUCache
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _total_tokens(response: Any) -> int:
+    """Get the number of tokens an LLM response used, or 0 if not reported."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(token_usage.get("total_tokens") or 0)
+
+
+class LLMResponseCache:
+    """Tiered store of LLM responses shared by every cached model."""
+
+    def __init__(self):
+        """Initialize the LLM response cache."""
+        self.config = get_cache_config()
+        self._lock = threading.Lock()
+        self._memory_cache = TinyLFUCache(self.config.llm_cache_size, max_bytes=self.config.llm_cache_bytes)
+        self._backend = create_cache_backend(self.config, "llm") if self.config.enable_disk_cache else None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.tokens_saved = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response and count the hit or miss.
+
+        Args:
+            key: Hash of the request
+
+        Returns:
+            Dictionary with the response content and token count, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory_cache.get(key, now) if self.config.enable_memory_cache else None
+        if entry is None and self._backend is not None:
+            try:
+                stored = self._backend.get(key)
+            except Exception as e:
+                logger.error(f"Error loading LLM response from {self.config.cache_backend}: {str(e)}")
+                stored = None
+            if stored is not None and now - stored[1] <= self.config.cache_ttl:
+                entry = stored[0]
+                if self.config.enable_memory_cache:
+                    with self._lock:
+                        self._memory_cache.set(key, entry, expires_at=stored[1] + self.config.cache_ttl)
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry["total_tokens"]
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        """Cache a response until the cache TTL passes.
+
+        Args:
+            key: Hash of the request
+            entry: Dictionary with the response content and token count
+        """
+        now = time.time()
+        expires = now + self.config.cache_ttl
+        if self.config.enable_memory_cache:
+            with self._lock:
+                self._memory_cache.set(key, entry, expires_at=expires)
+        if self._backend is not None:
+            try:
+                self._backend.set(key, entry, now, expires)
+                # Expire a few old responses per write instead of running a separate sweep
+                self._backend.delete_expired(now, limit=16)
+            except Exception as e:
+                logger.error(f"Error saving LLM response to {self.config.cache_backend}: {str(e)}")
+
+    def record_bypass(self):
+        """Count a call that was not cacheable."""
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Get LLM cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, bypassed calls and tokens saved.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / max(1, self.hits + self.misses),
+                "bypassed": self.bypassed,
+                "tokens_saved": self.tokens_saved,
+            }
+
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._memory_cache.clear()
+        if self._backend is not None:
+            self._backend.clear()
+
+
+class CachingLLM:
+    """Chat model wrapper that serves repeated deterministic calls from a cache.
+
+    Other attributes are forwarded to the wrapped model, so the wrapper can
+    be used wherever the model is.
+    """
+
+    def __init__(self, llm: Any, cache: Optional[LLMResponseCache] = None):
+        """Initialize the wrapper.
+
+        Args:
+            llm: The chat model to wrap
+            cache: Response store. Uses the shared module cache if not provided.
+        """
+        self.llm = llm
+        self.cache = cache or llm_response_cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    @property
+    def model(self) -> str:
+        """Name of the wrapped model."""
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "")
+
+    def make_key(self, messages: List[BaseMessage]) -> str:
+        """Hash the model parameters and messages of a call.
+
+        Args:
+            messages: Messages sent to the model
+
+        Returns:
+            A hash key for the call
+        """
+        request = {
+            "model": self.model,
+            "temperature": getattr(self.llm, "temperature", None),
+            "max_tokens": getattr(self.llm, "max_tokens", None),
+            "messages": [(message.type, message.content) for message in messages],
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_cacheable(self) -> bool:
+        """Check whether calls to the wrapped model are deterministic enough to cache."""
+        temperature = getattr(self.llm, "temperature", None)
+        return (
+            self.cache.config.enable_llm_cache
+            and temperature is not None
+            and temperature <= self.cache.config.llm_cache_max_temperature
+        )
+
+    def invoke(self, messages: List[BaseMessage], **kwargs) -> Any:
+        """Call the model, or return the cached response of an identical call.
+
+        Args:
+            messages: Messages to send to the model
+            **kwargs: Extra call options; calls with options are not cached
+
+        Returns:
+            The model response
+        """
+        if kwargs or not self.is_cacheable():
+            self.cache.record_bypass()
+            return self.llm.invoke(messages, **kwargs)
+
+        key = self.make_key(messages)
+        entry = self.cache.get(key)
+        if entry is not None:
+            logger.info(f"LLM cache hit ({self.model}), saved {entry['total_tokens']} tokens")
+            return AIMessage(content=entry["content"], response_metadata={"cached": True})
+
+        response = self.llm.invoke(messages)
+        if isinstance(response.content, str):
+            self.cache.set(key, {"content": response.content, "total_tokens": _total_tokens(response)})
+        return response
+
+
+# Create a singleton instance
+llm_response_cache = LLMResponseCache()
+
+
+def get_llm_cache_stats() -> Dict[str, float]:
+    """Get hits, hit rate and tokens saved by the LLM response cache."""
+    return llm_response_cache.stats()
+
+
+def clear_llm_cache():
+    """Remove all cached LLM responses."""
+    llm_response_cache.clear()
@@ -0,0 +1,301 @@
+"""
+Local Index Module for Modern RAG Application
+
+This module provides an in-process vector index backed by NumPy. It is used
+when the vector store backend is set to "local", and keeps all embeddings in
+a single contiguous matrix so that searches run as one matrix multiply.
+"""
+
+import logging
+import threading
+from typing import Any, List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+
+from modernrag.metadata_index import MetadataIndex
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row of a matrix to unit length.
+
+    Args:
+        vectors: 2-D array of vectors
+
+    Returns:
+        Array of the same shape with L2-normalized rows
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the column indices of the k highest scores for each row.
+
+    Args:
+        scores: 2-D array of scores, one row per query
+        k: Number of indices to return per row
+
+    Returns:
+        Array of shape (rows, min(k, columns)) sorted by descending score
+    """
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+
+    # argpartition is O(n) per row; only the k survivors need sorting
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class LocalVectorIndex:
+    """In-memory cosine similarity index for a single vector store index."""
+
+    def __init__(self, name: str, dimension: Optional[int] = None, initial_capacity: int = 1024):
+        """Initialize an empty local index.
+
+        Args:
+            name: Name of the index
+            dimension: Vector dimension. Inferred from the first upsert if not provided.
+            initial_capacity: Number of rows to preallocate once the dimension is known
+        """
+        self.name = name
+        self.dimension = dimension
+        self._initial_capacity = initial_capacity
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        self._ids: List[str] = []
+        self._documents: List[Document] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._full_vectors: List[Optional[np.ndarray]] = []
+        self._metadata = MetadataIndex()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Return a view of the populated rows of the vector matrix."""
+        if self._vectors is None:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return self._vectors[:self._size]
+
+    def _reserve(self, rows: int):
+        """Grow the vector matrix so that it can hold at least `rows` rows."""
+        if self._vectors is None:
+            capacity = max(self._initial_capacity, rows)
+            self._vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        elif rows > self._vectors.shape[0]:
+            # Double the capacity so that appends stay amortized O(1)
+            capacity = max(rows, self._vectors.shape[0] * 2)
+            grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        documents: Sequence[Document],
+        full_vectors: Optional[Sequence[Sequence[float]]] = None
+    ) -> List[int]:
+        """Insert or replace vectors and their documents.
+
+        Args:
+            ids: Unique IDs of the entries
+            vectors: Embedding vectors, one per ID
+            documents: Documents, one per ID
+            full_vectors: Optional full-dimension vectors kept for re-scoring
+                when `vectors` have been dimension-reduced
+
+        Returns:
+            The row numbers assigned to the entries, in input order
+        """
+        if not (len(ids) == len(vectors) == len(documents)):
+            raise ValueError("ids, vectors and documents must have the same length")
+        if not ids:
+            return []
+
+        matrix = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        full_matrix = (
+            normalize_rows(np.asarray(full_vectors, dtype=np.float32))
+            if full_vectors is not None else [None] * len(ids)
+        )
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = matrix.shape[1]
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}"
+                )
+
+            new_ids = [doc_id for doc_id in dict.fromkeys(ids) if doc_id not in self._row_by_id]
+            self._reserve(self._size + len(new_ids))
+
+            rows = []
+            for doc_id, vector, document, full_vector in zip(ids, matrix, documents, full_matrix):
+                row = self._row_by_id.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._row_by_id[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._documents.append(document)
+                    self._full_vectors.append(full_vector)
+                    self._size += 1
+                else:
+                    self._documents[row] = document
+                    self._full_vectors[row] = full_vector
+                self._vectors[row] = vector
+                self._metadata.set(row, document.metadata)
+                rows.append(row)
+            return rows
+
+    def get(self, ids: Sequence[str]) -> List[Optional[Document]]:
+        """Look up documents by ID.
+
+        Args:
+            ids: IDs to look up
+
+        Returns:
+            The matching documents in input order, with None for unknown IDs
+        """
+        with self._lock:
+            return [
+                self._documents[self._row_by_id[doc_id]] if doc_id in self._row_by_id else None
+                for doc_id in ids
+            ]
+
+    def search(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        full_query_vectors: Optional[Sequence[Sequence[float]]] = None,
+        rescore_factor: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """Search the index for several queries at once.
+
+        All queries are scored with a single matrix multiply against the
+        index, followed by a per-row top-k selection. A metadata filter is
+        resolved through the metadata index first, so only matching rows
+        are scored.
+
+        Args:
+            query_vectors: Query embeddings, one per query
+            k: Number of results to return per query
+            score_threshold: Minimum cosine similarity for a result to be kept
+            filter: Pinecone-style metadata filter restricting the candidates
+            full_query_vectors: Full-dimension query embeddings. When given, the
+                best k * rescore_factor candidates are re-scored against the
+                stored full-dimension vectors before the top k are kept.
+            rescore_factor: Candidate multiplier for the re-scoring stage
+
+        Returns:
+            One list of (document, score) tuples per query, in input order
+        """
+        with self._lock:
+            return [
+                [(self._documents[row], score) for row, score in hits]
+                for hits in self._search_rows(
+                    query_vectors, k, score_threshold, filter, full_query_vectors, rescore_factor
+                )
+            ]
+
+    def search_with_vectors(
+        self,
+        query_vector: Sequence[float],
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Tuple[Document, float]], np.ndarray]:
+        """Search the index for one query and also return the matched vectors.
+
+        Args:
+            query_vector: Query embedding
+            k: Number of results to return
+            score_threshold: Minimum cosine similarity for a result to be kept
+            filter: Pinecone-style metadata filter restricting the candidates
+
+        Returns:
+            Tuple of the (document, score) results and a matrix holding the
+            normalized vector of each result, row for row
+        """
+        with self._lock:
+            hits = self._search_rows([query_vector], k, score_threshold, filter)[0]
+            rows = np.asarray([row for row, _ in hits], dtype=np.int64)
+            vectors = self._vectors[rows] if len(rows) else np.empty((0, self.dimension or 0), dtype=np.float32)
+            return [(self._documents[row], score) for row, score in hits], vectors.copy()
+
+    def _search_rows(
+        self,
+        query_vectors: Sequence[Sequence[float]],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]],
+        full_query_vectors: Optional[Sequence[Sequence[float]]] = None,
+        rescore_factor: int = 1
+    ) -> List[List[Tuple[int, float]]]:
+        """Return the best (row, score) pairs for each query."""
+        queries = normalize_rows(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        if self._size == 0:
+            return [[] for _ in range(queries.shape[0])]
+
+        full_queries = None
+        if full_query_vectors is not None and any(v is not None for v in self._full_vectors):
+            full_queries = normalize_rows(np.atleast_2d(np.asarray(full_query_vectors, dtype=np.float32)))
+            candidate_k = k * max(1, rescore_factor)
+        else:
+            candidate_k = k
+
+        if filter:
+            candidate_rows = self._metadata.rows(filter)
+            candidates = self._vectors[candidate_rows]
+        else:
+            candidate_rows = None
+            candidates = self.vectors
+
+        scores = queries @ candidates.T
+        top = top_k_indices(scores, candidate_k)
+
+        results = []
+        for query_number, (row_scores, row_top) in enumerate(zip(scores, top)):
+            scored = [
+                (int(column if candidate_rows is None else candidate_rows[column]), float(row_scores[column]))
+                for column in row_top
+            ]
+            if full_queries is not None:
+                scored = self._rescore(scored, full_queries[query_number])
+            hits = []
+            for row, score in scored[:k]:
+                if score_threshold is not None and score < score_threshold:
+                    break
+                hits.append((row, score))
+            results.append(hits)
+        return results
+
+    def _rescore(self, scored: List[Tuple[int, float]], full_query: np.ndarray) -> List[Tuple[int, float]]:
+        """Replace reduced-dimension scores with full-dimension ones.
+
+        The two kinds of score are not comparable, so candidates are only
+        re-scored if every one of them has a full vector.
+        """
+        if any(self._full_vectors[row] is None for row, _ in scored):
+            return scored
+        rescored = [(row, float(self._full_vectors[row] @ full_query)) for row, score in scored]
+        rescored.sort(key=lambda item: item[1], reverse=True)
+        return rescored
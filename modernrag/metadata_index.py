@@ -0,0 +1,230 @@
+"""
+Metadata Index Module for Modern RAG Application
+
+This module provides per-field secondary indexes over document metadata for
+the local backends. Equality lookups use per-value posting sets and range
+lookups use sorted value arrays, so metadata filters can prune rows before
+any vector or lexical scoring happens. Postings hold only the rows that
+have a value, so memory grows with the number of (row, value) pairs even
+for fields that are unique per chunk; a filter is evaluated to one boolean
+mask over the rows.
+
+Filters use the Pinecone metadata filter syntax, e.g.
+{"source": "a.pdf", "page": {"$gte": 3}} or {"$or": [{...}, {...}]}.
+"""
+
+import logging
+import threading
+from typing import Any, Iterable, List, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+def _scalar_values(value: Any) -> List[Any]:
+    """Return the indexable scalar values of a metadata field."""
+    if isinstance(value, (list, tuple, set)):
+        return [item for item in value if isinstance(item, (str, int, float, bool))]
+    if isinstance(value, (str, int, float, bool)):
+        return [value]
+    return []
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class MetadataIndex:
+    """Posting-list and sorted indexes over the metadata of numbered rows."""
+
+    def __init__(self):
+        """Initialize an empty metadata index."""
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {}  # {field: {value: rows}}
+        self._field_rows: Dict[str, Set[int]] = {}  # {field: rows with any value}
+        self._row_values: List[Dict[str, List[Any]]] = []
+        self._removed: Set[int] = set()
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._row_values)
+
+    def _unset_row(self, row: int):
+        """Remove a row's current values from the postings."""
+        for field, values in self._row_values[row].items():
+            field_postings = self._postings[field]
+            for value in values:
+                field_postings[value].discard(row)
+                if not field_postings[value]:
+                    del field_postings[value]
+            self._field_rows[field].discard(row)
+
+    def set(self, row: int, metadata: Dict[str, Any]):
+        """Index or re-index the metadata of a row.
+
+        Args:
+            row: Row number, which must be at most one past the last row
+            metadata: Metadata of the row
+        """
+        with self._lock:
+            if row < len(self._row_values):
+                self._unset_row(row)
+            elif row == len(self._row_values):
+                self._row_values.append({})
+            else:
+                raise ValueError(f"Row {row} is not contiguous with existing rows")
+
+            indexed: Dict[str, List[Any]] = {}
+            for field, value in metadata.items():
+                values = _scalar_values(value)
+                if not values:
+                    continue
+                indexed[field] = values
+                field_postings = self._postings.setdefault(field, {})
+                for item in values:
+                    field_postings.setdefault(item, set()).add(row)
+                self._field_rows.setdefault(field, set()).add(row)
+            self._row_values[row] = indexed
+            self._removed.discard(row)
+            self._sorted = {}
+
+    def remove(self, row: int):
+        """Exclude a row from all future filter results."""
+        with self._lock:
+            if row < len(self._row_values):
+                self._unset_row(row)
+                self._row_values[row] = {}
+                self._removed.add(row)
+                self._sorted = {}
+
+    def _sorted_field(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (values, rows) for the numeric values of a field, sorted by value."""
+        if field not in self._sorted:
+            pairs = [
+                (value, row)
+                for value, rows in self._postings.get(field, {}).items() if _is_number(value)
+                for row in rows
+            ]
+            values = np.asarray([value for value, _ in pairs], dtype=np.float64)
+            rows = np.asarray([row for _, row in pairs], dtype=np.int64)
+            order = np.argsort(values, kind="stable")
+            self._sorted[field] = (values[order], rows[order])
+        return self._sorted[field]
+
+    def _live_mask(self) -> np.ndarray:
+        """Return a mask of the rows that have not been removed."""
+        mask = np.ones(len(self._row_values), dtype=bool)
+        if self._removed:
+            mask[list(self._removed)] = False
+        return mask
+
+    def _rows_mask(self, rows: Iterable[int]) -> np.ndarray:
+        """Convert row numbers to a mask over all rows."""
+        mask = np.zeros(len(self._row_values), dtype=bool)
+        rows = rows if isinstance(rows, np.ndarray) else np.fromiter(rows, dtype=np.int64)
+        mask[rows] = True
+        return mask
+
+    def _range_mask(self, field: str, operator: str, operand: float) -> np.ndarray:
+        """Return the mask of rows whose numeric field value satisfies a range operator."""
+        values, rows = self._sorted_field(field)
+        if operator == "$gt":
+            selected = rows[np.searchsorted(values, operand, side="right"):]
+        elif operator == "$gte":
+            selected = rows[np.searchsorted(values, operand, side="left"):]
+        elif operator == "$lt":
+            selected = rows[:np.searchsorted(values, operand, side="left")]
+        else:
+            selected = rows[:np.searchsorted(values, operand, side="right")]
+        return self._rows_mask(selected)
+
+    def _field_mask(self, field: str, condition: Any, live: np.ndarray) -> np.ndarray:
+        """Evaluate the condition on a single field to a mask."""
+        field_postings = self._postings.get(field, {})
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        result = live.copy()
+        for operator, operand in condition.items():
+            if operator == "$eq":
+                mask = self._rows_mask(field_postings.get(operand, ()))
+            elif operator == "$ne":
+                mask = live & ~self._rows_mask(field_postings.get(operand, ()))
+            elif operator in ("$in", "$nin"):
+                mask = np.zeros(len(self._row_values), dtype=bool)
+                for value in operand:
+                    mask |= self._rows_mask(field_postings.get(value, ()))
+                if operator == "$nin":
+                    mask = live & ~mask
+            elif operator == "$exists":
+                mask = self._rows_mask(self._field_rows.get(field, ()))
+                if not operand:
+                    mask = live & ~mask
+            elif operator in RANGE_OPERATORS:
+                mask = self._range_mask(field, operator, operand)
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            result &= mask
+        return result
+
+    def evaluate(self, filter: Dict[str, Any]) -> np.ndarray:
+        """Evaluate a metadata filter to a mask of matching rows.
+
+        Args:
+            filter: A Pinecone-style metadata filter
+
+        Returns:
+            Boolean array with True at row i when row i matches
+        """
+        with self._lock:
+            live = self._live_mask()
+            result = live.copy()
+            for field, condition in filter.items():
+                if field == "$and":
+                    for clause in condition:
+                        result &= self.evaluate(clause)
+                elif field == "$or":
+                    union = np.zeros(len(self._row_values), dtype=bool)
+                    for clause in condition:
+                        union |= self.evaluate(clause)
+                    result &= union
+                else:
+                    result &= self._field_mask(field, condition, live)
+            return result
+
+    def rows(self, filter: Dict[str, Any]) -> np.ndarray:
+        """Return the sorted row numbers matching a metadata filter.
+
+        Args:
+            filter: A Pinecone-style metadata filter
+
+        Returns:
+            Array of matching row numbers
+        """
+        with self._lock:
+            return np.flatnonzero(self.evaluate(filter)).astype(np.int64)
+
+    def mask(self, filter: Dict[str, Any], size: Optional[int] = None) -> np.ndarray:
+        """Return a boolean mask of the rows matching a metadata filter.
+
+        Args:
+            filter: A Pinecone-style metadata filter
+            size: Length of the mask. Defaults to the number of indexed rows.
+
+        Returns:
+            Boolean array with True for matching rows
+        """
+        with self._lock:
+            matched = self.evaluate(filter)
+            mask = np.zeros(size if size is not None else len(self._row_values), dtype=bool)
+            length = min(len(mask), len(matched))
+            mask[:length] = matched[:length]
+            return mask
@@ -0,0 +1,170 @@
+"""
+Query Log Module for Modern RAG Application
+
+This module records how often each query is asked, with its pipeline
+parameters, so that the cache warm-up can re-run the most frequent ones.
+Frequencies decay with a configurable half-life, so yesterday's hot queries
+fade. Decay is applied by weighting each new request by
+2 ** (elapsed / half_life) instead of shrinking old counts, so recording a
+query is a single upsert and the top queries come straight from an index on
+the weight column.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Dict, Optional, Tuple
+
+from modernrag.caching import get_cache_config
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    params TEXT NOT NULL,
+    weight REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS queries_weight ON queries (weight);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+# Weights are rescaled before 2 ** exponent gets near the float limit
+_MAX_EXPONENT = 512
+
+
+class QueryLog:
+    """Decayed query frequencies stored in a SQLite file."""
+
+    def __init__(self, path: Path, half_life: float = 86400.0, max_entries: int = 10000):
+        """Open or create the query log.
+
+        Args:
+            path: Path of the database file
+            half_life: Seconds after which a request counts half as much
+            max_entries: Number of distinct queries to keep; the least frequent are pruned
+        """
+        self.path = Path(path)
+        self.half_life = half_life
+        self.max_entries = max_entries
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        row = self._connection.execute("SELECT value FROM meta WHERE name = 'epoch'").fetchone()
+        self._epoch = row[0] if row else self._set_epoch(time.time())
+        self._writes = 0
+
+    def _set_epoch(self, epoch: float) -> float:
+        self._connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('epoch', ?)", (epoch,))
+        self._epoch = epoch
+        return epoch
+
+    def _exponent(self, now: float) -> float:
+        return (now - self._epoch) / self.half_life
+
+    def _rebase(self, now: float):
+        """Scale all weights so that the current time becomes the new epoch."""
+        factor = 2.0 ** -self._exponent(now)
+        self._connection.execute("BEGIN")
+        self._connection.execute("UPDATE queries SET weight = weight * ?", (factor,))
+        self._set_epoch(now)
+        self._connection.execute("COMMIT")
+
+    @staticmethod
+    def make_key(query: str, encoded_params: str) -> str:
+        """Get the log key of a query and its JSON-encoded parameters."""
+        return hashlib.md5(f"{query}|{encoded_params}".encode()).hexdigest()
+
+    def record(self, query: str, params: Dict[str, Any], now: Optional[float] = None):
+        """Count one request for a query.
+
+        Args:
+            query: The query text
+            params: Pipeline parameters the query was run with
+            now: Current time. Uses the wall clock if not provided.
+        """
+        now = time.time() if now is None else now
+        # The stored parameters are exactly what the key was computed from
+        encoded_params = json.dumps(params, sort_keys=True, default=str)
+        with self._lock:
+            if self._exponent(now) > _MAX_EXPONENT:
+                self._rebase(now)
+            self._connection.execute(
+                """
+                INSERT INTO queries (key, query, params, weight, last_seen) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET weight = weight + excluded.weight, last_seen = excluded.last_seen
+                """,
+                (self.make_key(query, encoded_params), query, encoded_params, 2.0 ** self._exponent(now), now)
+            )
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._prune()
+
+    def _prune(self):
+        """Delete all but the max_entries most frequent queries."""
+        self._connection.execute(
+            "DELETE FROM queries WHERE key NOT IN (SELECT key FROM queries ORDER BY weight DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+
+    def top(self, n: int, now: Optional[float] = None) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Get the most frequent queries.
+
+        Args:
+            n: Number of queries to return
+            now: Current time. Uses the wall clock if not provided.
+
+        Returns:
+            List of (query, parameters, decayed request count), most frequent first
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT query, params, weight FROM queries ORDER BY weight DESC LIMIT ?", (n,)
+            ).fetchall()
+            scale = 2.0 ** -self._exponent(now)
+        return [(query, json.loads(params), weight * scale) for query, params, weight in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+@lru_cache()
+def get_query_log() -> QueryLog:
+    """Get the shared query log, opening it on first use."""
+    config = get_cache_config()
+    return QueryLog(Path(config.cache_dir) / "query_log.sqlite3", half_life=config.query_log_half_life)
+
+
+async def record_query(query: str, **params):
+    """Count one request for a query; failures are logged and ignored."""
+    try:
+        await asyncio.to_thread(get_query_log().record, query, params)
+    except Exception as e:
+        logger.warning(f"Failed to record query for cache warm-up: {str(e)}")
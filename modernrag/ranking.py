@@ -0,0 +1,146 @@
+"""
+Ranking Module for Modern RAG Application
+
+This module provides helpers for combining and reordering retrieval results
+without additional model calls.
+"""
+
+import heapq
+import hashlib
+import logging
+from typing import List, Dict, Hashable, Sequence, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def document_key(document: Document) -> Hashable:
+    """Return a stable identity for a document across retrieval backends.
+
+    Args:
+        document: The document to identify
+
+    Returns:
+        The document ID if set, otherwise a hash of its content and source
+    """
+    if getattr(document, "id", None):
+        return document.id
+    source = str(document.metadata.get("source", ""))
+    return hashlib.md5(f"{source}|{document.page_content}".encode()).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Tuple[Document, float]]],
+    k: int = 4,
+    rrf_k: int = 60
+) -> List[Tuple[Document, float]]:
+    """Fuse several ranked result lists with reciprocal rank fusion.
+
+    Each document scores sum(1 / (rrf_k + rank)) over the lists it appears in,
+    so only ranks matter and scores on different scales can be combined.
+
+    Args:
+        result_lists: Ranked lists of (document, score) tuples, best first
+        k: Number of fused results to return
+        rrf_k: Rank smoothing constant
+
+    Returns:
+        List of (document, fused score) tuples, best first
+    """
+    fused: Dict[Hashable, float] = {}
+    documents: Dict[Hashable, Document] = {}
+    for results in result_lists:
+        for rank, (document, _) in enumerate(results, start=1):
+            key = document_key(document)
+            documents.setdefault(key, document)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (rrf_k + rank)
+
+    best = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [(documents[key], score) for key, score in best]
+
+
+def merge_top_k(
+    result_lists: Sequence[List[Tuple[Document, float]]],
+    k: int = 4
+) -> List[Tuple[Document, float]]:
+    """Merge result lists that are each sorted by descending score.
+
+    The lists are merged lazily through a heap, so results are only popped
+    until k distinct documents are found. A document that appears in several
+    lists is kept once, with its best score.
+
+    Args:
+        result_lists: Lists of (document, score) tuples, each best first
+        k: Number of merged results to return
+
+    Returns:
+        The k best (document, score) tuples across all lists, best first
+    """
+    merged = heapq.merge(*result_lists, key=lambda item: -item[1])
+    seen = set()
+    results = []
+    for doc, score in merged:
+        if len(results) >= k:
+            break
+        key = document_key(doc)
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append((doc, score))
+    return results
+
+
+def maximal_marginal_relevance(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int = 4,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """Select a relevant but diverse subset of candidates.
+
+    The candidate similarity matrix is computed once, and each selection step
+    updates every candidate's maximum similarity to the selected set with a
+    single vectorized operation.
+
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Candidate embeddings, one row per candidate
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    if candidates.ndim != 2 or candidates.shape[0] == 0 or k <= 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    candidates = candidates / np.where(norms == 0, 1.0, norms)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = candidates @ query
+    similarity = candidates @ candidates.T
+    max_similarity = np.zeros(len(candidates), dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+
+    selected: List[int] = []
+    for _ in range(min(k, len(candidates))):
+        if selected:
+            scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
@@ -0,0 +1,221 @@
+"""
+RESP Server Module for Modern RAG Application
+
+This module provides a small in-process server for the subset of the Redis
+protocol that the Redis cache backend uses: strings with expiry, one hash
+for tag versions, SCAN and a few housekeeping commands. It stands in for a
+Redis server in tests and local development, and can run as its own
+process to act as one node of a sharded cache:
+
+    python -m modernrag.resp_server --port 6380
+"""
+
+import time
+import fnmatch
+import logging
+import argparse
+import threading
+import socketserver
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class _Store:
+    """Keyspace of the server: strings with optional expiry and hashes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.strings: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self.commands = 0
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self.strings.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.time():
+            del self.strings[key]
+            return None
+        return entry[0]
+
+    def keys(self) -> List[bytes]:
+        return [key for key in list(self.strings) if self.get(key) is not None] + list(self.hashes)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves RESP commands on one connection until it closes."""
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, as typed into a terminal
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, reply: Any) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, Exception):
+            return b"-ERR %s\r\n" % str(reply).encode()
+        if isinstance(reply, bool):
+            return b"+OK\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, (bytes, bytearray)):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        if isinstance(reply, str):
+            return b"+%s\r\n" % reply.encode()
+        return b"*%d\r\n" % len(reply) + b"".join(self._encode(item) for item in reply)
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            try:
+                reply = self.server.execute([args[0].upper()] + args[1:])
+            except Exception as e:
+                reply = e
+            try:
+                self.wfile.write(self._encode(reply))
+            except OSError:
+                return
+
+
+class LocalRespServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server speaking the subset of RESP used by the cache."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """Bind the server; port 0 picks a free port.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on
+        """
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL that the Redis cache backend can connect to."""
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "LocalRespServer":
+        """Serve connections on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="resp-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self.shutdown()
+        self.server_close()
+
+    def execute(self, args: List[bytes]) -> Any:
+        """Run one command against the keyspace.
+
+        Args:
+            args: Upper-cased command name followed by its arguments
+
+        Returns:
+            The reply; True stands for +OK
+        """
+        command, args = args[0], args[1:]
+        store = self.store
+        with store.lock:
+            store.commands += 1
+            if command == b"PING":
+                return "PONG"
+            if command in (b"SELECT", b"AUTH"):
+                return True
+            if command == b"GET":
+                return store.get(args[0])
+            if command == b"MGET":
+                return [store.get(key) for key in args]
+            if command == b"SET":
+                expires = None
+                options = [option.upper() for option in args[2:]]
+                if b"EX" in options:
+                    expires = time.time() + int(args[2 + options.index(b"EX") + 1])
+                if b"PX" in options:
+                    expires = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+                store.strings[args[0]] = (args[1], expires)
+                return True
+            if command == b"DEL":
+                removed = 0
+                for key in args:
+                    removed += (store.strings.pop(key, None) is not None) + (store.hashes.pop(key, None) is not None)
+                return removed
+            if command == b"EXISTS":
+                return sum(store.get(key) is not None or key in store.hashes for key in args)
+            if command == b"HSET":
+                fields = store.hashes.setdefault(args[0], {})
+                added = 0
+                for i in range(1, len(args), 2):
+                    added += args[i] not in fields
+                    fields[args[i]] = args[i + 1]
+                return added
+            if command == b"HGET":
+                return store.hashes.get(args[0], {}).get(args[1])
+            if command == b"HINCRBY":
+                fields = store.hashes.setdefault(args[0], {})
+                value = int(fields.get(args[1], b"0")) + int(args[2])
+                fields[args[1]] = str(value).encode()
+                return value
+            if command == b"HGETALL":
+                return [item for pair in store.hashes.get(args[0], {}).items() for item in pair]
+            if command == b"SCAN":
+                # The whole keyspace is returned in one batch
+                options = [option.upper() for option in args[1:]]
+                pattern = args[1 + options.index(b"MATCH") + 1] if b"MATCH" in options else b"*"
+                return [b"0", [key for key in store.keys() if fnmatch.fnmatchcase(key, pattern)]]
+            if command == b"DBSIZE":
+                return len(store.keys())
+            if command == b"FLUSHDB":
+                store.strings.clear()
+                store.hashes.clear()
+                return True
+            raise ValueError(f"unknown command '{command.decode(errors='replace')}'")
+
+
+def main():
+    """Run a stand-alone server until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve the Redis protocol subset used by the cache")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=6379, help="TCP port to listen on")
+    args = parser.parse_args()
+
+    server = LocalRespServer(args.host, args.port)
+    logger.info(f"Serving {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Routing Module for Modern RAG Application
+
+This module provides a lightweight query router that decides, before any
+retrieval happens, whether a query needs the full RAG pipeline, can be
+answered by the LLM alone, or can be answered with a canned response.
+Queries are classified with cheap lexical features first; only short,
+ambiguous queries are compared against example utterances by embedding.
+"""
+
+import re
+import asyncio
+import logging
+import threading
+from typing import Any, List, Dict, Optional
+from functools import lru_cache
+
+import numpy as np
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings
+
+from modernrag.local_index import normalize_rows
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ROUTE_RAG = "rag"
+ROUTE_GENERATE = "generate"
+ROUTE_CANNED = "canned"
+ROUTES = (ROUTE_RAG, ROUTE_GENERATE, ROUTE_CANNED)
+
+# Canned intents: the phrases that trigger them and the response returned
+CANNED_INTENTS: Dict[str, Dict[str, Any]] = {
+    "greeting": {
+        "phrases": [
+            "hi", "hello", "hey", "hi there", "hello there", "hey there",
+            "good morning", "good afternoon", "good evening"
+        ],
+        "response": "Hello! Ask me a question about your documents and I'll find the answer.",
+    },
+    "thanks": {
+        "phrases": [
+            "thanks", "thank you", "thanks a lot", "thank you so much", "thx", "ty", "cheers"
+        ],
+        "response": "You're welcome! Let me know if you have any other questions.",
+    },
+    "farewell": {
+        "phrases": ["bye", "goodbye", "see you", "see you later", "bye bye"],
+        "response": "Goodbye! Come back any time you have more questions.",
+    },
+}
+
+# Conversational messages that the LLM can answer without retrieved context
+CHITCHAT_PHRASES = [
+    "how are you", "who are you", "what are you", "what can you do", "help",
+    "ok", "okay", "cool", "great", "nice", "awesome", "sounds good", "got it", "lol",
+]
+
+QUESTION_WORDS = {
+    "what", "why", "how", "when", "where", "which", "who", "whom", "whose",
+    "explain", "describe", "define", "compare", "list", "summarize",
+}
+
+
+class RouterConfig(BaseSettings):
+    """Configuration settings for query routing."""
+    enable_query_router: bool = Field(True, env="ENABLE_QUERY_ROUTER")
+    router_max_ambiguous_tokens: int = Field(4, env="ROUTER_MAX_AMBIGUOUS_TOKENS")  # Longer queries go to RAG
+    router_similarity_threshold: float = Field(0.85, env="ROUTER_SIMILARITY_THRESHOLD")
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
+@lru_cache()
+def get_router_config() -> RouterConfig:
+    """Get the router configuration."""
+    return RouterConfig()
+
+
+class RouteDecision(BaseModel):
+    """The route chosen for a query."""
+    route: str
+    reason: str
+    intent: Optional[str] = None
+    response: Optional[str] = None
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a query and strip punctuation and repeated whitespace.
+
+    Args:
+        query: The user query
+
+    Returns:
+        The normalized query
+    """
+    return " ".join(re.findall(r"[a-z0-9']+", query.lower()))
+
+
+class QueryRouter:
+    """Routes queries to full RAG, generate-only or canned responses."""
+
+    def __init__(self, embeddings: Any = None):
+        """Initialize the router.
+
+        Args:
+            embeddings: Embedding model used for ambiguous queries. Lexical
+                routing only if not provided.
+        """
+        self.config = get_router_config()
+        self._embeddings = embeddings
+        self._phrase_routes: Dict[str, RouteDecision] = {}
+        for intent, spec in CANNED_INTENTS.items():
+            for phrase in spec["phrases"]:
+                self._phrase_routes[phrase] = RouteDecision(
+                    route=ROUTE_CANNED, reason="phrase", intent=intent, response=spec["response"]
+                )
+        for phrase in CHITCHAT_PHRASES:
+            self._phrase_routes[phrase] = RouteDecision(route=ROUTE_GENERATE, reason="phrase")
+        self._exemplar_phrases: List[str] = list(self._phrase_routes)
+        self._exemplar_vectors: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {route: 0 for route in ROUTES}
+        self._rag_latency_total = 0.0
+        self._latency_saved = 0.0
+
+    async def route(self, query: str) -> RouteDecision:
+        """Choose the route for a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            The routing decision
+        """
+        if not self.config.enable_query_router:
+            return RouteDecision(route=ROUTE_RAG, reason="disabled")
+
+        normalized = normalize_query(query)
+        if not normalized:
+            # Nothing to classify, so leave the decision to the full pipeline
+            return RouteDecision(route=ROUTE_RAG, reason="empty")
+
+        decision = self._phrase_routes.get(normalized)
+        if decision is not None:
+            return decision
+
+        tokens = normalized.split()
+        if (
+            len(tokens) > self.config.router_max_ambiguous_tokens
+            or "?" in query
+            or QUESTION_WORDS.intersection(tokens)
+        ):
+            return RouteDecision(route=ROUTE_RAG, reason="lexical")
+
+        if self._embeddings is None:
+            return RouteDecision(route=ROUTE_RAG, reason="lexical")
+
+        try:
+            return await self._route_by_embedding(normalized)
+        except Exception as e:
+            logger.warning(f"Embedding routing failed, falling back to RAG: {str(e)}")
+            return RouteDecision(route=ROUTE_RAG, reason="fallback")
+
+    async def _route_by_embedding(self, normalized: str) -> RouteDecision:
+        """Match a short query against the example phrases by cosine similarity."""
+        if self._exemplar_vectors is None:
+            vectors = await asyncio.to_thread(self._embeddings.embed_documents, self._exemplar_phrases)
+            self._exemplar_vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+        query_vector = await asyncio.to_thread(self._embeddings.embed_query, normalized)
+        similarities = self._exemplar_vectors @ normalize_rows(np.asarray([query_vector], dtype=np.float32))[0]
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.config.router_similarity_threshold:
+            return RouteDecision(route=ROUTE_RAG, reason="embedding")
+
+        match = self._phrase_routes[self._exemplar_phrases[best]]
+        return match.model_copy(update={"reason": "embedding"})
+
+    def record(self, route: str, latency: float):
+        """Record a routed query and its end-to-end latency.
+
+        Latency saved by a skipped pipeline is estimated against the mean
+        latency of the queries that went through full RAG.
+
+        Args:
+            route: The route the query took
+            latency: Seconds the query took to answer
+        """
+        with self._lock:
+            self._counts[route] = self._counts.get(route, 0) + 1
+            if route == ROUTE_RAG:
+                self._rag_latency_total += latency
+            elif self._counts[ROUTE_RAG]:
+                mean_rag_latency = self._rag_latency_total / self._counts[ROUTE_RAG]
+                self._latency_saved += max(0.0, mean_rag_latency - latency)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get routing counters.
+
+        Returns:
+            Dictionary with per-route counts, the mean full-RAG latency and
+            the estimated total latency saved, in seconds
+        """
+        with self._lock:
+            rag_count = self._counts[ROUTE_RAG]
+            return {
+                "counts": dict(self._counts),
+                "mean_rag_latency": self._rag_latency_total / rag_count if rag_count else 0.0,
+                "latency_saved": self._latency_saved,
+            }
@@ -0,0 +1,190 @@
+"""
+Semantic Cache Module for Modern RAG Application
+
+This module provides the semantic tier of the query cache. It keeps the
+embedding of every cached query in a small in-memory matrix, so that a
+paraphrase of a cached query ("what's RAG" for "What is RAG?") can be
+answered from the cache. Entries only match queries with the same index and
+parameters, and each entry points at an exact cache key, so the cached
+answer itself is stored once, in the exact tiers.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from modernrag.local_index import normalize_rows
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SemanticEntry(BaseModel):
+    """A cached query that paraphrases can be matched against."""
+    cache_key: str
+    query: str
+    partition: str
+    index_name: Optional[str] = None
+
+
+class SemanticMatch(BaseModel):
+    """The closest cached query for a lookup."""
+    cache_key: str
+    query: str
+    similarity: float
+
+
+class SemanticCache:
+    """Bounded nearest-neighbour lookup from query embeddings to cache keys."""
+
+    def __init__(self, max_entries: int = 1024, threshold: float = 0.95):
+        """Initialize the semantic cache.
+
+        Args:
+            max_entries: Maximum number of cached queries; the least recently
+                used is replaced when full
+            threshold: Minimum cosine similarity for a cached query to match
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None
+        self._partitions = np.full(max_entries, -1, dtype=np.int64)
+        self._partition_ids: Dict[str, int] = {}
+        self._entries: List[Optional[SemanticEntry]] = [None] * max_entries
+        self._slot_by_key: Dict[str, int] = {}
+        self._recency: "OrderedDict[int, None]" = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slot_by_key)
+
+    def _partition_id(self, partition: str) -> int:
+        if partition not in self._partition_ids:
+            self._partition_ids[partition] = len(self._partition_ids)
+        return self._partition_ids[partition]
+
+    def add(
+        self,
+        cache_key: str,
+        query: str,
+        vector: Sequence[float],
+        partition: str,
+        index_name: Optional[str] = None
+    ):
+        """Register a cached query.
+
+        Args:
+            cache_key: Exact cache key the answer is stored under
+            query: The query text
+            vector: Embedding of the query
+            partition: Identifier of the index and parameters the answer depends on
+            index_name: Index the answer was retrieved from, for invalidation
+        """
+        normalized = normalize_rows(np.asarray([vector], dtype=np.float32))[0]
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, normalized.shape[0]), dtype=np.float32)
+            elif normalized.shape[0] != self._vectors.shape[1]:
+                raise ValueError(
+                    f"Vector dimension {normalized.shape[0]} does not match cache dimension {self._vectors.shape[1]}"
+                )
+
+            slot = self._slot_by_key.get(cache_key)
+            if slot is None:
+                slot = self._free.pop() if self._free else self._evict()
+                self._slot_by_key[cache_key] = slot
+            self._vectors[slot] = normalized
+            self._partitions[slot] = self._partition_id(partition)
+            self._entries[slot] = SemanticEntry(
+                cache_key=cache_key, query=query, partition=partition, index_name=index_name
+            )
+            self._recency[slot] = None
+            self._recency.move_to_end(slot)
+
+    def _evict(self) -> int:
+        """Free the least recently used slot and return it."""
+        slot, _ = self._recency.popitem(last=False)
+        del self._slot_by_key[self._entries[slot].cache_key]
+        self._entries[slot] = None
+        self._partitions[slot] = -1
+        return slot
+
+    def lookup(self, vector: Sequence[float], partition: str) -> Optional[SemanticMatch]:
+        """Find the most similar cached query with the same partition.
+
+        Args:
+            vector: Embedding of the new query
+            partition: Identifier of the index and parameters of the new query
+
+        Returns:
+            The best match at or above the threshold, or None
+        """
+        query_vector = normalize_rows(np.asarray([vector], dtype=np.float32))[0]
+        with self._lock:
+            partition_id = self._partition_ids.get(partition)
+            if self._vectors is None or partition_id is None:
+                return None
+
+            candidates = np.flatnonzero(self._partitions == partition_id)
+            if len(candidates) == 0:
+                return None
+
+            similarities = self._vectors[candidates] @ query_vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            slot = int(candidates[best])
+            self._recency.move_to_end(slot)
+            entry = self._entries[slot]
+        return SemanticMatch(cache_key=entry.cache_key, query=entry.query, similarity=float(similarities[best]))
+
+    def remove(self, cache_key: str) -> bool:
+        """Forget a cached query.
+
+        Returns:
+            True if the key was registered
+        """
+        with self._lock:
+            slot = self._slot_by_key.pop(cache_key, None)
+            if slot is None:
+                return False
+            self._entries[slot] = None
+            self._partitions[slot] = -1
+            self._recency.pop(slot, None)
+            self._free.append(slot)
+            return True
+
+    def invalidate_index(self, index_name: Optional[str]) -> int:
+        """Forget every cached query answered from an index.
+
+        Args:
+            index_name: Name of the index
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [
+                entry.cache_key for entry in self._entries
+                if entry is not None and entry.index_name == index_name
+            ]
+            for cache_key in keys:
+                self.remove(cache_key)
+            return len(keys)
+
+    def clear(self):
+        """Forget every cached query."""
+        with self._lock:
+            for cache_key in list(self._slot_by_key):
+                self.remove(cache_key)
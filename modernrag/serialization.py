@@ -0,0 +1,432 @@
+"""
+Serialization Module for Modern RAG Application
+
+This module provides the binary format the disk cache stores pipeline
+results in, so loading an entry never runs pickle and does not depend on
+the pickled layout of library classes. Pipeline results are written in a
+columnar schema: the scalar fields as one JSON object, the scores as packed
+doubles, the document texts as one block with their lengths, and the
+metadata as tables of distinct keys and values, so a source shared by many
+chunks is stored once. Other values fall back to a small tagged encoding of
+strings, numbers, lists, dicts and LangChain documents. Encoded entries carry
+a format version and are compressed with zstd when the zstandard package is
+installed, or with zlib otherwise.
+"""
+
+import json
+import zlib
+import struct
+import logging
+import threading
+from typing import Any, List, Dict, Optional
+
+import numpy as np
+from langchain.docstore.document import Document
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MRC"
+FORMAT_VERSION = 1
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+_CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+# Value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_STR_NEW = 6
+_STR_REF = 7
+_BYTES = 8
+_LIST = 9
+_TUPLE = 10
+_DICT = 11
+_DOCUMENT = 12
+
+# Payload kinds
+_KIND_VALUE = 0
+_KIND_RESULT = 1
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Strings up to this length are shared within an entry; longer text is written inline
+_SHARED_STRING_LENGTH = 64
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Encoder:
+    """Writes one value into a byte buffer."""
+
+    def __init__(self):
+        self.out = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def write_str(self, value: str):
+        out = self.out
+        if len(value) <= _SHARED_STRING_LENGTH:
+            index = self.strings.get(value)
+            if index is not None:
+                out.append(_STR_REF)
+                _write_varint(out, index)
+                return
+            self.strings[value] = len(self.strings)
+            out.append(_STR_NEW)
+        else:
+            out.append(_STR)
+        data = value.encode("utf-8")
+        _write_varint(out, len(data))
+        out += data
+
+    def write(self, value: Any):
+        out = self.out
+        if value is None:
+            out.append(_NONE)
+        elif value is True:
+            out.append(_TRUE)
+        elif value is False:
+            out.append(_FALSE)
+        elif isinstance(value, str):
+            self.write_str(value)
+        elif isinstance(value, int):
+            out.append(_INT)
+            # Zigzag so that small negative numbers stay short
+            _write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+        elif isinstance(value, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(value)
+        elif isinstance(value, dict):
+            out.append(_DICT)
+            _write_varint(out, len(value))
+            for key, item in value.items():
+                self.write(key)
+                self.write(item)
+        elif isinstance(value, (list, tuple)):
+            out.append(_TUPLE if isinstance(value, tuple) else _LIST)
+            _write_varint(out, len(value))
+            for item in value:
+                self.write(item)
+        elif isinstance(value, Document):
+            out.append(_DOCUMENT)
+            self.write(value.page_content)
+            self.write(value.metadata)
+            self.write(getattr(value, "id", None))
+        elif isinstance(value, (bytes, bytearray)):
+            out.append(_BYTES)
+            _write_varint(out, len(value))
+            out += value
+        elif isinstance(value, np.generic):
+            self.write(value.item())
+        else:
+            raise TypeError(f"Cannot serialize value of type {type(value).__name__}")
+
+
+class _Decoder:
+    """Reads one value from a byte buffer."""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+        self.strings: List[str] = []
+
+    def read_varint(self) -> int:
+        data = self.data
+        result = 0
+        shift = 0
+        while True:
+            byte = data[self.position]
+            self.position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_bytes(self) -> bytes:
+        length = self.read_varint()
+        start = self.position
+        self.position += length
+        if self.position > len(self.data):
+            raise ValueError("Truncated cache entry")
+        return bytes(self.data[start:self.position])
+
+    def read(self) -> Any:
+        tag = self.data[self.position]
+        self.position += 1
+        if tag == _STR_REF:
+            return self.strings[self.read_varint()]
+        if tag == _STR_NEW:
+            value = self.read_bytes().decode("utf-8")
+            self.strings.append(value)
+            return value
+        if tag == _STR:
+            return self.read_bytes().decode("utf-8")
+        if tag == _FLOAT:
+            value = _DOUBLE.unpack_from(self.data, self.position)[0]
+            self.position += _DOUBLE.size
+            return value
+        if tag == _INT:
+            value = self.read_varint()
+            return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+        if tag == _DICT:
+            length = self.read_varint()
+            result = {}
+            for _ in range(length):
+                key = self.read()
+                result[key] = self.read()
+            return result
+        if tag == _LIST:
+            return [self.read() for _ in range(self.read_varint())]
+        if tag == _TUPLE:
+            return tuple(self.read() for _ in range(self.read_varint()))
+        if tag == _DOCUMENT:
+            page_content = self.read()
+            metadata = self.read()
+            document_id = self.read()
+            return Document(page_content=page_content, metadata=metadata, id=document_id)
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _BYTES:
+            return self.read_bytes()
+        raise ValueError(f"Unknown value tag {tag} in cache entry")
+
+
+def _write_block(out: bytearray, data: bytes):
+    _write_varint(out, len(data))
+    out += data
+
+
+def _metadata_token(value: Any) -> Optional[tuple]:
+    """Get a hashable token identifying a metadata value, or None if unsupported."""
+    if type(value) in _SCALAR_TYPES:
+        # The type keeps 1, 1.0 and True apart
+        return (type(value), value)
+    if type(value) is list and all(type(item) in _SCALAR_TYPES for item in value):
+        return (list, tuple((type(item), item) for item in value))
+    return None
+
+
+def _encode_result(result: Any) -> Optional[bytes]:
+    """Encode a pipeline result in the columnar schema.
+
+    Args:
+        result: The value to encode
+
+    Returns:
+        The encoded payload, or None if the value does not fit the schema
+    """
+    if not isinstance(result, dict) or not isinstance(result.get("retrieved_docs"), list):
+        return None
+    fields = {}
+    for key, value in result.items():
+        if type(key) is not str:
+            return None
+        if key == "retrieved_docs":
+            fields[key] = None  # Keeps the key order
+        elif type(value) in _SCALAR_TYPES:
+            fields[key] = value
+        else:
+            return None
+
+    scores, texts, ids, flat_metadata = [], [], [], []
+    keys: Dict[str, int] = {}
+    values: Dict[tuple, int] = {}
+    value_list: List[Any] = []
+    for item in result["retrieved_docs"]:
+        if not (isinstance(item, tuple) and len(item) == 2 and isinstance(item[0], Document)):
+            return None
+        document, score = item
+        if isinstance(score, bool) or not isinstance(score, (int, float, np.floating)):
+            return None
+        document_id = getattr(document, "id", None)
+        if not isinstance(document.page_content, str) or not isinstance(document.metadata, dict) \
+                or not isinstance(document_id, (str, type(None))):
+            return None
+
+        pairs = []
+        for key, value in document.metadata.items():
+            token = _metadata_token(value)
+            if type(key) is not str or token is None:
+                return None
+            if key not in keys:
+                keys[key] = len(keys)
+            if token not in values:
+                values[token] = len(value_list)
+                value_list.append(value)
+            pairs.append(keys[key])
+            pairs.append(values[token])
+        scores.append(float(score))
+        texts.append(document.page_content)
+        ids.append(document_id)
+        flat_metadata.append(pairs)
+
+    out = bytearray([_KIND_RESULT])
+    _write_block(out, json.dumps(fields).encode("utf-8"))
+    _write_block(out, struct.pack(f"<{len(scores)}d", *scores))
+    _write_block(out, struct.pack(f"<{len(texts)}I", *(len(text) for text in texts)))
+    _write_block(out, "".join(texts).encode("utf-8"))
+    _write_block(out, json.dumps({
+        "keys": list(keys), "values": value_list, "docs": flat_metadata, "ids": ids
+    }).encode("utf-8"))
+    return bytes(out)
+
+
+def _decode_result(decoder: _Decoder) -> Dict[str, Any]:
+    """Decode a pipeline result written by _encode_result."""
+    result = json.loads(decoder.read_bytes())
+    score_bytes = decoder.read_bytes()
+    scores = struct.unpack(f"<{len(score_bytes) // 8}d", score_bytes)
+    length_bytes = decoder.read_bytes()
+    lengths = struct.unpack(f"<{len(length_bytes) // 4}I", length_bytes)
+    text = decoder.read_bytes().decode("utf-8")
+    metadata = json.loads(decoder.read_bytes())
+    keys, values = metadata["keys"], metadata["values"]
+
+    retrieved_docs = []
+    offset = 0
+    for score, length, pairs, document_id in zip(scores, lengths, metadata["docs"], metadata["ids"]):
+        document = Document(
+            page_content=text[offset:offset + length],
+            metadata={keys[pairs[i]]: values[pairs[i + 1]] for i in range(0, len(pairs), 2)},
+            id=document_id
+        )
+        retrieved_docs.append((document, score))
+        offset += length
+    result["retrieved_docs"] = retrieved_docs
+    return result
+
+
+def resolve_compression(compression: str) -> str:
+    """Get the compression codec that will actually be used.
+
+    Args:
+        compression: Requested codec: "zstd", "zlib" or "none"
+
+    Returns:
+        The requested codec, or "zlib" if zstd was requested but zstandard is not installed
+    """
+    if compression not in _CODECS:
+        raise ValueError(f"Unknown cache compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed; compressing cache entries with zlib")
+        return "zlib"
+    return compression
+
+
+class ResultSerializer:
+    """Encodes cached values to versioned, optionally compressed bytes."""
+
+    def __init__(self, compression: str = "zstd", min_compress_size: int = 512, level: int = 3):
+        """Initialize the serializer.
+
+        Args:
+            compression: Codec for encoded values: "zstd", "zlib" or "none"
+            min_compress_size: Encoded values smaller than this are stored uncompressed
+            level: Compression level
+        """
+        self.compression = resolve_compression(compression)
+        self.min_compress_size = min_compress_size
+        self.level = level
+        # zstd contexts must not be shared between threads
+        self._local = threading.local()
+
+    def _zstd(self) -> threading.local:
+        """Get this thread's zstd compressor and decompressor."""
+        local = self._local
+        if not hasattr(local, "compressor"):
+            local.compressor = zstandard.ZstdCompressor(level=self.level)
+            local.decompressor = zstandard.ZstdDecompressor()
+        return local
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value.
+
+        Args:
+            value: The value to encode
+
+        Returns:
+            Header (magic, format version, codec) followed by the encoded value
+        """
+        payload = _encode_result(value)
+        if payload is None:
+            encoder = _Encoder()
+            encoder.out.append(_KIND_VALUE)
+            encoder.write(value)
+            payload = bytes(encoder.out)
+
+        codec = CODEC_NONE
+        if len(payload) >= self.min_compress_size:
+            if self.compression == "zstd":
+                payload = self._zstd().compressor.compress(payload)
+                codec = CODEC_ZSTD
+            elif self.compression == "zlib":
+                payload = zlib.compress(payload, self.level)
+                codec = CODEC_ZLIB
+        return MAGIC + bytes((FORMAT_VERSION, codec)) + payload
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a value written by dumps.
+
+        Entries of any codec can be read, whatever this serializer writes.
+
+        Args:
+            data: Encoded bytes
+
+        Returns:
+            The decoded value
+
+        Raises:
+            ValueError: If the data is not a supported cache entry
+        """
+        if data[:len(MAGIC)] != MAGIC or len(data) < len(MAGIC) + 2:
+            raise ValueError("Not a serialized cache entry")
+        version, codec = data[len(MAGIC)], data[len(MAGIC) + 1]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache entry format version {version}")
+
+        payload = data[len(MAGIC) + 2:]
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise ValueError("Cache entry is zstd-compressed but zstandard is not installed")
+            payload = self._zstd().decompressor.decompress(payload)
+        elif codec == CODEC_ZLIB:
+            payload = zlib.decompress(payload)
+        elif codec != CODEC_NONE:
+            raise ValueError(f"Unknown cache entry codec {codec}")
+
+        decoder = _Decoder(payload)
+        kind = decoder.data[0]
+        decoder.position = 1
+        if kind == _KIND_RESULT:
+            value = _decode_result(decoder)
+        elif kind == _KIND_VALUE:
+            value = decoder.read()
+        else:
+            raise ValueError(f"Unknown cache entry kind {kind}")
+        if decoder.position != len(payload):
+            raise ValueError("Trailing data in cache entry")
+        return value
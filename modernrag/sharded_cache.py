@@ -0,0 +1,317 @@
+"""
+Sharded Cache Module for Modern RAG Application
+
+This module spreads the shared cache tier over several cache nodes. Keys
+are placed on a consistent-hash ring with virtual nodes, so adding or
+removing one of N nodes moves only about 1/N of the keys, and each entry
+can be written to several consecutive nodes on the ring for redundancy.
+
+Node health is tracked on the client: a node whose request fails is taken
+out of rotation and its keys fall through to the next nodes on the ring. A
+background thread pings every node and brings recovered nodes back, empty,
+since they missed the writes made while they were down.
+"""
+
+import bisect
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from modernrag.cache_backends import CacheBackend, Entry
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _ring_hash(value: str) -> int:
+    """Get the position of a value on the ring."""
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping keys to node names."""
+
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 160):
+        """Initialize the ring.
+
+        Args:
+            nodes: Names of the initial nodes
+            virtual_nodes: Points per node on the ring; more points spread keys more evenly
+        """
+        self.virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.nodes: List[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str):
+        """Place a node's virtual points on the ring."""
+        if node in self.nodes:
+            return
+        self.nodes.append(node)
+        for i in range(self.virtual_nodes):
+            point = _ring_hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove_node(self, node: str):
+        """Remove a node's virtual points from the ring."""
+        if node not in self.nodes:
+            return
+        self.nodes.remove(node)
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def preference_list(self, key: str, count: Optional[int] = None, exclude: Iterable[str] = ()) -> List[str]:
+        """Get the distinct nodes for a key, in clockwise order from its position.
+
+        Args:
+            key: The cache key
+            count: Maximum number of nodes to return. Returns all nodes if not provided.
+            exclude: Nodes to skip, such as unhealthy ones
+
+        Returns:
+            Node names, nearest first
+        """
+        excluded = set(exclude)
+        wanted = len(self.nodes) - len(excluded & set(self.nodes))
+        if count is not None:
+            wanted = min(wanted, count)
+        found: List[str] = []
+        if wanted <= 0:
+            return found
+        start = bisect.bisect(self._points, _ring_hash(key))
+        for offset in range(len(self._points)):
+            owner = self._owners[(start + offset) % len(self._points)]
+            if owner not in excluded and owner not in found:
+                found.append(owner)
+                if len(found) == wanted:
+                    break
+        return found
+
+    def node_for(self, key: str) -> Optional[str]:
+        """Get the node that owns a key, or None if the ring is empty."""
+        nodes = self.preference_list(key, count=1)
+        return nodes[0] if nodes else None
+
+
+class ShardedCacheBackend(CacheBackend):
+    """Cache backend that shards entries over several backends with a hash ring.
+
+    Reads go to the first healthy node for a key and writes to the first
+    `replicas` healthy nodes. Tag versions are written to every node, and
+    the highest version seen on any node wins.
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, CacheBackend],
+        replicas: int = 1,
+        virtual_nodes: int = 160,
+        health_check_interval: float = 5.0
+    ):
+        """Initialize the sharded backend.
+
+        Args:
+            nodes: Backends keyed by node name, such as their URLs
+            replicas: Number of nodes each entry is written to
+            virtual_nodes: Points per node on the hash ring
+            health_check_interval: Seconds between node pings; 0 disables the health check thread
+        """
+        if not nodes:
+            raise ValueError("A sharded cache needs at least one node")
+        self.nodes = dict(nodes)
+        self.replicas = max(1, replicas)
+        self.ring = HashRing(self.nodes, virtual_nodes)
+        self.serializer = next(iter(self.nodes.values())).serializer
+        self._lock = threading.Lock()
+        self._down: set = set()
+        self.health_check_interval = health_check_interval
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if health_check_interval > 0:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, name="cache-shard-health", daemon=True
+            )
+            self._health_thread.start()
+
+    def healthy_nodes(self) -> List[str]:
+        """Get the names of the nodes currently in rotation."""
+        with self._lock:
+            return [node for node in self.ring.nodes if node not in self._down]
+
+    def _mark_down(self, node: str, error: Exception):
+        with self._lock:
+            if node in self._down:
+                return
+            self._down.add(node)
+        logger.warning(f"Cache node {node} taken out of rotation: {str(error)}")
+
+    def _replica_nodes(self, key: str) -> List[str]:
+        """Get the healthy nodes an entry is written to."""
+        with self._lock:
+            return self.ring.preference_list(key, count=self.replicas, exclude=self._down)
+
+    def check_health(self):
+        """Ping every node, taking failed ones out of rotation and restoring recovered ones.
+
+        A recovered node is emptied before it serves again, since entries
+        written or invalidated while it was down would otherwise be stale.
+        """
+        for name, backend in list(self.nodes.items()):
+            healthy = backend.ping()
+            with self._lock:
+                was_down = name in self._down
+            if not healthy:
+                self._mark_down(name, ConnectionError("ping failed"))
+            elif was_down:
+                try:
+                    backend.clear()
+                except Exception as e:
+                    logger.warning(f"Could not empty recovered cache node {name}: {str(e)}")
+                    continue
+                with self._lock:
+                    self._down.discard(name)
+                logger.info(f"Cache node {name} is back in rotation")
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_check_interval):
+            try:
+                self.check_health()
+            except Exception as e:
+                logger.warning(f"Cache node health check failed: {str(e)}")
+
+    def add_node(self, name: str, backend: CacheBackend):
+        """Add a node; about 1/N of the keys move to it and miss once."""
+        with self._lock:
+            self.nodes[name] = backend
+            self.ring.add_node(name)
+
+    def remove_node(self, name: str):
+        """Remove a node; only the keys it held move to other nodes."""
+        with self._lock:
+            self.ring.remove_node(name)
+            self._down.discard(name)
+            backend = self.nodes.pop(name, None)
+        if backend is not None:
+            backend.close()
+
+    def get_many(self, keys: List[str]) -> List[Optional[Entry]]:
+        results: List[Optional[Entry]] = [None] * len(keys)
+        pending = list(range(len(keys)))
+        # Each pass sends one batch per node; keys of a failed node retry on their next replica
+        while pending:
+            batches: Dict[str, List[int]] = {}
+            with self._lock:
+                for i in pending:
+                    node = self.ring.preference_list(keys[i], count=1, exclude=self._down)
+                    if node:
+                        batches.setdefault(node[0], []).append(i)
+            pending = []
+            for node, indexes in batches.items():
+                try:
+                    entries = self.nodes[node].get_many([keys[i] for i in indexes])
+                except Exception as e:
+                    self._mark_down(node, e)
+                    pending.extend(indexes)
+                    continue
+                for i, entry in zip(indexes, entries):
+                    results[i] = entry
+        return results
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        created: float,
+        expires: float,
+        tags: Optional[Dict[str, int]] = None
+    ):
+        for node in self._replica_nodes(key):
+            try:
+                self.nodes[node].set(key, value, created, expires, tags)
+            except Exception as e:
+                self._mark_down(node, e)
+
+    def delete(self, key: str) -> bool:
+        deleted = False
+        for node in self._replica_nodes(key):
+            try:
+                deleted = self.nodes[node].delete(key) or deleted
+            except Exception as e:
+                self._mark_down(node, e)
+        return deleted
+
+    def _each_healthy(self, action) -> List[Tuple[str, Any]]:
+        """Run an action on every healthy node, collecting the results that succeeded."""
+        results = []
+        for node in self.healthy_nodes():
+            try:
+                results.append((node, action(self.nodes[node])))
+            except Exception as e:
+                self._mark_down(node, e)
+        return results
+
+    def get_tag_versions(self) -> Dict[str, int]:
+        merged: Dict[str, int] = {}
+        for _, versions in self._each_healthy(lambda backend: backend.get_tag_versions()):
+            for tag, version in versions.items():
+                merged[tag] = max(version, merged.get(tag, 0))
+        return merged
+
+    def set_tag_version(self, tag: str, version: int):
+        self._each_healthy(lambda backend: backend.set_tag_version(tag, version))
+
+    def bump_tag_version(self, tag: str) -> int:
+        """Bump a tag on the first healthy node that owns it and copy the version to the rest.
+
+        The owning node serializes concurrent bumps. A node that takes over
+        after the owner failed is first raised to the highest version any
+        node has, so versions never go backwards.
+        """
+        while True:
+            with self._lock:
+                owners = self.ring.preference_list(f"tag:{tag}", count=1, exclude=self._down)
+            if not owners:
+                raise ConnectionError("No cache node is available")
+            owner = self.nodes[owners[0]]
+            try:
+                known = self.get_tag_versions().get(tag, 0)
+                if known:
+                    owner.set_tag_version(tag, known)
+                version = owner.bump_tag_version(tag)
+                break
+            except Exception as e:
+                self._mark_down(owners[0], e)
+        self.set_tag_version(tag, version)
+        return version
+
+    def clear(self):
+        self._each_healthy(lambda backend: backend.clear())
+
+    def __len__(self) -> int:
+        """Get the number of stored entries, counting each replica."""
+        return sum(count for _, count in self._each_healthy(len))
+
+    def ping(self) -> bool:
+        return bool(self.healthy_nodes())
+
+    def size_bytes(self) -> Optional[int]:
+        """Get the total size of the healthy nodes that can be measured."""
+        sizes = [size for _, size in self._each_healthy(lambda backend: backend.size_bytes()) if size is not None]
+        return sum(sizes) if sizes else None
+
+    def close(self):
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=self.health_check_interval)
+        for backend in self.nodes.values():
+            backend.close()
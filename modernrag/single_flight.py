@@ -0,0 +1,74 @@
+"""
+Single Flight Module for Modern RAG Application
+
+This module provides request coalescing: while a computation for a key is
+in flight, further callers asking for the same key wait for that
+computation instead of starting their own. Callers may run on different
+threads and event loops, as Streamlit sessions do, so the shared result is
+a thread-safe future.
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent computations of the same key."""
+
+    def __init__(self):
+        """Initialize an empty set of in-flight computations."""
+        self._inflight: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a computation, or wait for the one already running for the key.
+
+        The first caller for a key runs `compute`. Callers arriving while it
+        runs receive the same result, or the same exception. Nothing is
+        remembered once the computation finishes.
+
+        Args:
+            key: Key identifying the computation
+            compute: Coroutine function producing the result
+
+        Returns:
+            The result of the computation
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await compute()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
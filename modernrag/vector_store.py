@@ -7,15 +7,20 @@ and vector search operations.
 """
 
 import os
+import json
 import getpass
+import hashlib
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional, Union, Tuple
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Tuple, Callable, Awaitable
 from uuid import uuid4
 from functools import lru_cache
 
 # Third-party imports
 from dotenv import load_dotenv
+import numpy as np
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
@@ -24,6 +29,21 @@ from langchain_text_splitters import RecursiveCharacterTextSplitter
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+from modernrag.local_index import LocalVectorIndex, normalize_rows
+from modernrag.dimension_reduction import DimensionReducer, create_reducer, encode_vector, decode_vector
+from modernrag.index_registry import IndexRegistry, IndexInfo
+from modernrag.lexical_index import InvertedIndex
+from modernrag.ranking import reciprocal_rank_fusion, maximal_marginal_relevance, merge_top_k
+from modernrag.chunking import (
+    PARENT_ID_KEY,
+    CHUNK_INDEX_KEY,
+    START_INDEX_KEY,
+    link_chunks,
+    make_chunk_id,
+    plan_windows,
+    merge_chunks
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +54,15 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+RETRIEVAL_MODES = ("vector", "hybrid", "mmr", "small_to_big")
+
+# Metadata key of the full-dimension vector stored with a reduced Pinecone vector
+FULL_VECTOR_KEY = "full_vector"
+
+# Pinecone namespace holding the fitted PCA projection of an index, one record per row
+PROJECTION_NAMESPACE = "__projection__"
+PROJECTION_MANIFEST_ID = "manifest"
+
 
 class VectorStoreConfig(BaseSettings):
     """Configuration settings for vector store operations."""
@@ -46,6 +75,19 @@ class VectorStoreConfig(BaseSettings):
     region: str = Field("us-east-1", env="CLOUD_REGION")
     chunk_size: int = Field(200, env="CHUNK_SIZE")
     chunk_overlap: int = Field(20, env="CHUNK_OVERLAP")
+    vector_backend: str = Field("pinecone", env="VECTOR_BACKEND")  # "pinecone" or "local"
+    hybrid_candidates: int = Field(20, env="HYBRID_CANDIDATES")  # Per-retriever depth before fusion
+    rrf_k: int = Field(60, env="RRF_K")
+    federated_timeout: float = Field(2.0, env="FEDERATED_SEARCH_TIMEOUT")  # Seconds per target
+    retrieval_cache_size: int = Field(1024, env="RETRIEVAL_CACHE_SIZE")  # 0 disables the cache
+    index_registry_ttl: float = Field(300.0, env="INDEX_REGISTRY_TTL")  # Seconds
+    index_refresh_interval: float = Field(60.0, env="INDEX_REFRESH_INTERVAL")  # Seconds
+    warm_indexes: List[str] = Field(default_factory=list, env="WARM_INDEXES")  # JSON list of names
+    reduced_dimensions: Dict[str, int] = Field(default_factory=dict, env="REDUCED_DIMENSIONS")  # JSON map of index to dimension
+    reduction_method: str = Field("truncate", env="REDUCTION_METHOD")  # "truncate" or "pca"
+    rescore_full_dimension: bool = Field(False, env="RESCORE_FULL_DIMENSION")
+    rescore_factor: int = Field(4, env="RESCORE_FACTOR")  # Candidate multiplier before re-scoring
+    projection_fit_samples: int = Field(2048, env="PROJECTION_FIT_SAMPLES")  # Chunks embedded to fit a PCA projection
     
     class Config:
         env_file = ".env"
@@ -79,6 +121,325 @@ class VectorStoreManager:
         self._embeddings = get_embeddings()
         self._index_cache = {}
         self._vector_store_cache = {}
+        self._local_indexes: Dict[str, LocalVectorIndex] = {}
+        self._lexical_indexes: Dict[str, InvertedIndex] = {}
+        self._lexical_loaded: set = set()  # Indexes whose stored chunks this process has indexed lexically
+        self._index_generations: Dict[str, int] = {}
+        self._write_listeners: List[Callable[[str], None]] = []
+        self._generation_source: Optional[Callable[[str], Awaitable[int]]] = None
+        self._reducers: Dict[str, DimensionReducer] = {}
+        self._retrieval_cache: "OrderedDict[Tuple, List[Tuple[Document, float]]]" = OrderedDict()
+        self._retrieval_cache_hits = 0
+        self._retrieval_cache_misses = 0
+        self._retrieval_cache_lock = threading.Lock()
+        self._index_registry = IndexRegistry(
+            self._pinecone_client,
+            ttl=self.config.index_registry_ttl,
+            refresh_interval=self.config.index_refresh_interval
+        )
+    
+    @property
+    def uses_local_backend(self) -> bool:
+        """Whether vectors are kept in the in-process NumPy index instead of Pinecone."""
+        return self.config.vector_backend == "local"
+    
+    def get_local_index(self, index_name: Optional[str] = None) -> LocalVectorIndex:
+        """Get the local index for a name, creating it if needed.
+        
+        Args:
+            index_name: Name of the index to get. Uses default if not provided.
+            
+        Returns:
+            LocalVectorIndex instance.
+        """
+        index_name = index_name or self.config.default_index_name
+        if index_name not in self._local_indexes:
+            self._local_indexes[index_name] = LocalVectorIndex(index_name)
+        return self._local_indexes[index_name]
+    
+    def get_lexical_index(self, index_name: Optional[str] = None) -> InvertedIndex:
+        """Get the local inverted index for a name, creating it if needed.
+        
+        The inverted index is populated by every upsert made through this
+        manager, is rebuilt from the stored chunks the first time hybrid
+        search uses it in a process, and serves the lexical half of hybrid
+        search.
+        
+        Args:
+            index_name: Name of the index to get. Uses default if not provided.
+            
+        Returns:
+            InvertedIndex instance.
+        """
+        index_name = index_name or self.config.default_index_name
+        if index_name not in self._lexical_indexes:
+            self._lexical_indexes[index_name] = InvertedIndex(index_name)
+        return self._lexical_indexes[index_name]
+    
+    def _add_lexical(self, index_name: Optional[str], ids: List[str], documents: List[Document]):
+        """Mirror upserted chunks in the inverted index of an index."""
+        if not self.uses_local_backend:
+            # Pinecone hits carry their record ID, so lexical hits need it too for fusion to match them
+            documents = [
+                doc if getattr(doc, "id", None) == doc_id else doc.model_copy(update={"id": doc_id})
+                for doc_id, doc in zip(ids, documents)
+            ]
+        self.get_lexical_index(index_name).add(ids, documents)
+    
+    async def _load_lexical_index(self, index_name: Optional[str] = None) -> InvertedIndex:
+        """Index the chunks already stored in a Pinecone index, once per process.
+        
+        Chunks written by earlier runs or by other workers only reach the
+        local inverted index this way. Listing the IDs of an index is only
+        supported by serverless indexes; elsewhere the lexical index holds
+        just the chunks upserted by this process.
+        """
+        index_name = index_name or self.config.default_index_name
+        lexical_index = self.get_lexical_index(index_name)
+        if self.uses_local_backend or index_name in self._lexical_loaded:
+            return lexical_index
+        self._lexical_loaded.add(index_name)
+        try:
+            index = await self.get_index(index_name)
+            pages = await asyncio.to_thread(lambda: list(index.list()))
+            ids = [doc_id for page in pages for doc_id in page]
+            for start in range(0, len(ids), 100):
+                documents = await self.fetch_documents(ids[start:start + 100], index_name)
+                lexical_index.add(list(documents), list(documents.values()))
+            logger.info(f"Loaded {len(ids)} stored chunks into the lexical index of {index_name}")
+        except Exception as e:
+            logger.warning(f"Could not load stored chunks into the lexical index of {index_name}: {str(e)}")
+        return lexical_index
+    
+    def get_reducer(self, index_name: Optional[str] = None) -> Optional[DimensionReducer]:
+        """Get the dimension reducer of an index, if it stores reduced vectors.
+        
+        A PCA projection fitted by another process is loaded from the index
+        before the reducer is used to write or search, so that every worker
+        uses the same projection as the stored vectors.
+        
+        Args:
+            index_name: Name of the index. Uses default if not provided.
+            
+        Returns:
+            The reducer, or None if the index stores full-dimension vectors.
+        """
+        index_name = index_name or self.config.default_index_name
+        dimension = self.config.reduced_dimensions.get(index_name)
+        if not dimension:
+            return None
+        if index_name not in self._reducers:
+            self._reducers[index_name] = create_reducer(
+                self.config.reduction_method, dimension, self.config.embedding_model
+            )
+        return self._reducers[index_name]
+    
+    def get_index_dimension(self, index_name: Optional[str] = None) -> int:
+        """Get the dimension of the vectors stored in an index.
+        
+        Args:
+            index_name: Name of the index. Uses default if not provided.
+            
+        Returns:
+            The reduced dimension if one is configured, otherwise the embedding dimension.
+        """
+        index_name = index_name or self.config.default_index_name
+        return self.config.reduced_dimensions.get(index_name) or self.config.dimension
+    
+    async def _save_projection(self, index_name: str, reducer: DimensionReducer):
+        """Store the fitted state of a reducer in the projection namespace of its Pinecone index.
+        
+        Every row is stored as a record with the row in its metadata; the
+        manifest naming the rows is written last, so a reader never sees a
+        partial projection. Local indexes live in this process, and so does
+        their reducer.
+        """
+        state = reducer.state()
+        if self.uses_local_backend or not state:
+            return
+        index = await self.get_index(index_name)
+        # Records need valid values of the index dimension; only their metadata is read back
+        placeholder = [1.0] + [0.0] * (reducer.dimension - 1)
+        shapes = {name: list(np.shape(array)) for name, array in state.items()}
+        records = [
+            {"id": f"{name}-{row}", "values": placeholder, "metadata": {"vector": encode_vector(values)}}
+            for name, array in state.items()
+            for row, values in enumerate(np.atleast_2d(array))
+        ]
+        records.append({
+            "id": PROJECTION_MANIFEST_ID,
+            "values": placeholder,
+            "metadata": {"method": reducer.method, "dimension": reducer.dimension, "shapes": json.dumps(shapes)}
+        })
+        for start in range(0, len(records), 100):
+            await asyncio.to_thread(index.upsert, vectors=records[start:start + 100], namespace=PROJECTION_NAMESPACE)
+        logger.info(f"Stored {reducer.method} projection with index {index_name}")
+    
+    async def _load_projection(self, index_name: Optional[str]):
+        """Load a projection fitted by another process from the index, if the local reducer has none."""
+        index_name = index_name or self.config.default_index_name
+        reducer = self.get_reducer(index_name)
+        if reducer is None or reducer.is_fitted or self.uses_local_backend:
+            return
+        index = await self.get_index(index_name)
+        response = await asyncio.to_thread(index.fetch, ids=[PROJECTION_MANIFEST_ID], namespace=PROJECTION_NAMESPACE)
+        manifest = response.vectors.get(PROJECTION_MANIFEST_ID)
+        if manifest is None:
+            return
+        metadata = manifest.metadata or {}
+        if metadata.get("method") != reducer.method or int(metadata.get("dimension", 0)) != reducer.dimension:
+            logger.warning(f"Ignoring stored projection of index {index_name}: made with different settings")
+            return
+        shapes = json.loads(metadata["shapes"])
+        ids = [
+            f"{name}-{row}"
+            for name, shape in shapes.items()
+            for row in range(shape[0] if len(shape) > 1 else 1)
+        ]
+        rows = {}
+        for start in range(0, len(ids), 100):
+            response = await asyncio.to_thread(index.fetch, ids=ids[start:start + 100], namespace=PROJECTION_NAMESPACE)
+            rows.update({row_id: decode_vector(vector.metadata["vector"]) for row_id, vector in response.vectors.items()})
+        state = {
+            name: np.stack([rows[f"{name}-{row}"] for row in range(shape[0] if len(shape) > 1 else 1)]).reshape(shape)
+            for name, shape in shapes.items()
+        }
+        if reducer.load_state(state):
+            logger.info(f"Loaded {reducer.method} projection for index {index_name}")
+    
+    def _rescores(self, index_name: Optional[str]) -> bool:
+        """Whether searches on an index re-score reduced candidates at full dimension."""
+        return self.config.rescore_full_dimension and self.get_reducer(index_name) is not None
+    
+    async def fit_projection(self, texts: List[str], index_name: Optional[str] = None) -> bool:
+        """Fit the PCA projection of an index on a sample of texts and store it with the index.
+        
+        Up to `projection_fit_samples` texts, spread evenly over the input,
+        are embedded for the fit. Run this before the first upsert to an
+        index with a PCA projection; `split_and_upsert_documents` does so
+        with all of its chunks.
+        
+        Args:
+            texts: Texts representative of the index contents
+            index_name: Name of the index. Uses default if not provided.
+            
+        Returns:
+            True if a projection was fitted, False if the index needs none
+            or already has one.
+            
+        Raises:
+            ValueError: If there are fewer texts than the reduced dimension.
+        """
+        return bool(await self._fit_projection(texts, index_name))
+    
+    async def _fit_projection(self, texts: List[str], index_name: Optional[str]) -> Dict[int, List[float]]:
+        """Fit the PCA projection of an index as in `fit_projection`.
+        
+        Returns:
+            The embeddings of the sampled texts by position in `texts`, so
+            that they need not be embedded again for the upsert; empty if
+            no projection was fitted.
+        """
+        index_name = index_name or self.config.default_index_name
+        await self._load_projection(index_name)
+        reducer = self.get_reducer(index_name)
+        if reducer is None or reducer.is_fitted:
+            return {}
+        if len(texts) < reducer.dimension:
+            raise ValueError(
+                f"Fitting a PCA projection to {reducer.dimension} dimensions for index {index_name} "
+                f"needs at least {reducer.dimension} texts, got {len(texts)}"
+            )
+        sample_size = min(len(texts), max(self.config.projection_fit_samples, reducer.dimension))
+        positions = [int(i) for i in np.linspace(0, len(texts) - 1, sample_size).astype(int)]
+        vectors = await self._embed_texts([texts[i] for i in positions])
+        reducer.fit(vectors)
+        await self._save_projection(index_name, reducer)
+        return dict(zip(positions, vectors))
+    
+    async def _reduce_vectors(self, index_name: Optional[str], vectors: List[List[float]]) -> List[List[float]]:
+        """Project document vectors to the reduced dimension of an index.
+        
+        An unfitted PCA projection is loaded from the index, or else fitted
+        on the vectors being written if there are enough of them; use
+        `fit_projection` to fit it on a larger sample first.
+        """
+        reducer = self.get_reducer(index_name)
+        if reducer is None:
+            return vectors
+        await self._load_projection(index_name)
+        if not reducer.is_fitted:
+            if len(vectors) < reducer.dimension:
+                raise ValueError(
+                    f"The PCA projection of index {index_name or self.config.default_index_name} is not fitted "
+                    f"and {len(vectors)} vectors are too few to fit it; call fit_projection first"
+                )
+            reducer.fit(vectors)
+            await self._save_projection(index_name or self.config.default_index_name, reducer)
+        return reducer.transform(vectors).tolist()
+    
+    async def _reduce_query(self, index_name: Optional[str], query_vector: List[float]) -> List[float]:
+        """Project a query vector to the reduced dimension of an index."""
+        reducer = self.get_reducer(index_name)
+        if reducer is None:
+            return query_vector
+        await self._load_projection(index_name)
+        return reducer.transform([query_vector])[0].tolist()
+    
+    def _search_local(
+        self,
+        index_name: Optional[str],
+        query_vectors: List[List[float]],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]]
+    ) -> List[List[Tuple[Document, float]]]:
+        """Search the local index with full-dimension query vectors."""
+        reducer = self.get_reducer(index_name)
+        index = self.get_local_index(index_name)
+        if reducer is None:
+            return index.search(query_vectors, k=k, score_threshold=score_threshold, filter=filter)
+        return index.search(
+            reducer.transform(query_vectors),
+            k=k,
+            score_threshold=score_threshold,
+            filter=filter,
+            full_query_vectors=query_vectors if self._rescores(index_name) else None,
+            rescore_factor=self.config.rescore_factor
+        )
+    
+    def _rescore_hits(
+        self,
+        query_vector: List[float],
+        hits: List[Tuple[Document, float]],
+        full_vectors: List[Optional[str]],
+        k: int
+    ) -> List[Tuple[Document, float]]:
+        """Re-score Pinecone hits against the full-dimension vectors stored with them.
+        
+        Full-dimension and reduced-dimension scores are not comparable, so
+        if any hit has no stored full vector (e.g. it was written before
+        re-scoring was enabled) the reduced-dimension order is kept.
+        
+        Args:
+            query_vector: Full-dimension query embedding
+            hits: Candidates with their reduced-dimension scores
+            full_vectors: Encoded full vector of each hit, or None
+            k: Number of results to keep
+        """
+        missing = sum(vector is None for vector in full_vectors)
+        if missing:
+            logger.warning(
+                f"Keeping reduced-dimension scores: {missing} of {len(hits)} hits have no full-dimension vector"
+            )
+            return hits[:k]
+        full_query = normalize_rows(np.asarray([query_vector], dtype=np.float32))[0]
+        rescored = [
+            (doc, float(decode_vector(vector) @ full_query))
+            for (doc, _), vector in zip(hits, full_vectors)
+        ]
+        rescored.sort(key=lambda item: item[1], reverse=True)
+        return rescored[:k]
     
     async def create_index(self, index_name: Optional[str] = None) -> str:
         """Create a new Pinecone index asynchronously.
@@ -94,18 +455,24 @@ class VectorStoreManager:
         """
         index_name = index_name or self.config.default_index_name
         
+        if self.uses_local_backend:
+            self.get_local_index(index_name)
+            logger.info(f"Created local index: {index_name}")
+            return index_name
+        
         try:
             # Run the synchronous Pinecone operation in a thread pool
             await asyncio.to_thread(
                 self._pinecone_client.create_index,
                 name=index_name,
-                dimension=self.config.dimension,
+                dimension=self.get_index_dimension(index_name),
                 metric=self.config.metric,
                 spec=ServerlessSpec(
                     cloud=self.config.cloud_provider, 
                     region=self.config.region
                 )
             )
+            self._index_registry.mark(index_name, True, self.get_index_dimension(index_name))
             logger.info(f"Created index: {index_name}")
             return index_name
         except Exception as e:
@@ -126,6 +493,17 @@ class VectorStoreManager:
         """
         index_name = index_name or self.config.default_index_name
         
+        self._lexical_indexes.pop(index_name, None)
+        self._lexical_loaded.discard(index_name)
+        # A Pinecone projection is deleted with the index's namespaces; a local one lives in the reducer
+        self._reducers.pop(index_name, None)
+        self._bump_generation(index_name)
+        
+        if self.uses_local_backend:
+            self._local_indexes.pop(index_name, None)
+            logger.info(f"Deleted local index: {index_name}")
+            return True
+        
         try:
             # Run the synchronous Pinecone operation in a thread pool
             await asyncio.to_thread(
@@ -134,6 +512,7 @@ class VectorStoreManager:
             )
             
             # Clear caches for this index
+            self._index_registry.mark(index_name, False)
             if index_name in self._index_cache:
                 del self._index_cache[index_name]
             if index_name in self._vector_store_cache:
@@ -148,6 +527,9 @@ class VectorStoreManager:
     async def check_index_exists(self, index_name: Optional[str] = None) -> bool:
         """Check if an index exists, create it if it doesn't.
         
+        Existence is served from the index registry while its entry is fresh,
+        so repeated checks do not make a control-plane call.
+        
         Args:
             index_name: Name of the index to check. Uses default if not provided.
             
@@ -156,22 +538,67 @@ class VectorStoreManager:
         """
         index_name = index_name or self.config.default_index_name
         
+        if self.uses_local_backend:
+            self.get_local_index(index_name)
+            return True
+        
         try:
-            # Run the synchronous Pinecone operation in a thread pool
-            has_index = await asyncio.to_thread(
-                self._pinecone_client.has_index,
-                index_name
-            )
+            # The registry only calls Pinecone when its cached entry has expired
+            has_index = await self._index_registry.exists(index_name)
             
             if not has_index:
                 logger.info(f"Index {index_name} does not exist, creating it...")
                 await self.create_index(index_name)
+                self._index_registry.mark(index_name, True, self.get_index_dimension(index_name))
                 
             return True
         except Exception as e:
             logger.error(f"Failed to check/create index {index_name}: {str(e)}")
             raise
     
+    async def prewarm_indexes(self, index_names: Optional[List[str]] = None) -> Dict[str, IndexInfo]:
+        """Load index metadata and handles ahead of the first query.
+        
+        Also starts the registry's background refresh so cached entries are
+        renewed before they expire.
+        
+        Args:
+            index_names: Names of the indexes to prewarm. Uses the configured
+                warm indexes, or the default index, if not provided.
+            
+        Returns:
+            Mapping of index name to its registry entry.
+        """
+        index_names = index_names or self.config.warm_indexes or [self.config.default_index_name]
+        if self.uses_local_backend:
+            for index_name in index_names:
+                self.get_local_index(index_name)
+            return {}
+        
+        entries = await self._index_registry.prewarm(index_names)
+        for index_name, entry in entries.items():
+            if entry.exists and index_name not in self._index_cache:
+                self._index_cache[index_name] = self._pinecone_client.Index(index_name)
+        self._index_registry.start_background_refresh()
+        
+        logger.info(f"Prewarmed {len(entries)}/{len(index_names)} indexes")
+        return entries
+    
+    async def describe_index(self, index_name: Optional[str] = None) -> IndexInfo:
+        """Get cached metadata (existence, dimension and stats) for an index.
+        
+        Args:
+            index_name: Name of the index to describe. Uses default if not provided.
+            
+        Returns:
+            The registry entry, refreshed first if missing or expired.
+        """
+        index_name = index_name or self.config.default_index_name
+        entry = self._index_registry.get(index_name)
+        if entry is None or not self._index_registry.is_fresh(index_name) or (entry.exists and entry.dimension is None):
+            entry = await asyncio.to_thread(self._index_registry.refresh, index_name)
+        return entry
+    
     async def get_index(self, index_name: Optional[str] = None):
         """Get a Pinecone index instance asynchronously.
         
@@ -221,7 +648,8 @@ class VectorStoreManager:
         self, 
         documents: List[Document], 
         index_name: Optional[str] = None,
-        ids: Optional[List[str]] = None
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[List[Optional[List[float]]]] = None
     ) -> bool:
         """Upsert documents to the vector store asynchronously.
         
@@ -229,6 +657,9 @@ class VectorStoreManager:
             documents: List of documents to upsert.
             index_name: Name of the index to use. Uses default if not provided.
             ids: Optional list of IDs for the documents.
+            embeddings: Optional embeddings already computed for some of the
+                documents, None for the rest. Reused by the local backend and
+                by reduced indexes, which embed documents themselves.
             
         Returns:
             True if upsert was successful.
@@ -240,16 +671,38 @@ class VectorStoreManager:
             # Generate UUIDs if not provided
             if ids is None:
                 ids = [str(uuid4()) for _ in range(len(documents))]
+            
+            if self.uses_local_backend:
+                vectors = await self._embed_documents(documents, embeddings)
+                self.get_local_index(index_name).add(
+                    ids,
+                    await self._reduce_vectors(index_name, vectors),
+                    documents,
+                    full_vectors=vectors if self._rescores(index_name) else None
+                )
+                self._add_lexical(index_name, ids, documents)
+                self._bump_generation(index_name)
+                logger.info(f"Upserted {len(documents)} documents to local index {index_name or self.config.default_index_name}")
+                return True
                 
             # Get the vector store
             vector_store = await self.get_vector_store(index_name)
             
+            if self.get_reducer(index_name) is not None:
+                await self._upsert_reduced(vector_store, documents, index_name, ids, embeddings)
+                self._add_lexical(index_name, ids, documents)
+                self._bump_generation(index_name)
+                logger.info(f"Upserted {len(documents)} reduced documents to index {index_name or self.config.default_index_name}")
+                return True
+            
             # Run the synchronous add_documents operation in a thread pool
             await asyncio.to_thread(
                 vector_store.add_documents,
                 documents=documents,
                 ids=ids
             )
+            self._add_lexical(index_name, ids, documents)
+            self._bump_generation(index_name)
             
             logger.info(f"Upserted {len(documents)} documents to index {index_name or self.config.default_index_name}")
             return True
@@ -257,6 +710,28 @@ class VectorStoreManager:
             logger.error(f"Failed to upsert documents: {str(e)}")
             raise
     
+    async def _upsert_reduced(
+        self,
+        vector_store: PineconeVectorStore,
+        documents: List[Document],
+        index_name: Optional[str],
+        ids: List[str],
+        embeddings: Optional[List[Optional[List[float]]]] = None
+    ):
+        """Embed documents, project them to the index dimension and upsert them to Pinecone."""
+        vectors = await self._embed_documents(documents, embeddings)
+        reduced = await self._reduce_vectors(index_name, vectors)
+        text_key = getattr(vector_store, "_text_key", "text")
+        records = [
+            {"id": doc_id, "values": values, "metadata": {**doc.metadata, text_key: doc.page_content}}
+            for doc_id, values, doc in zip(ids, reduced, documents)
+        ]
+        if self._rescores(index_name):
+            # The index holds reduced values, so the full vectors are stored in the metadata for re-scoring
+            for record, full_vector in zip(records, normalize_rows(np.asarray(vectors, dtype=np.float32))):
+                record["metadata"][FULL_VECTOR_KEY] = encode_vector(full_vector)
+        await asyncio.to_thread(vector_store.index.upsert, vectors=records)
+    
     async def split_and_upsert_documents(
         self,
         documents: List[Document],
@@ -267,6 +742,10 @@ class VectorStoreManager:
     ) -> bool:
         """Split documents into chunks and upsert them to the vector store.
         
+        Every chunk records its parent document ID, its position and its start
+        offset in the metadata, and gets the ID "<parent_id>#<position>", so
+        that neighbouring chunks can be fetched by ID at retrieval time.
+        
         Args:
             documents: List of documents to split and upsert.
             index_name: Name of the index to use. Uses default if not provided.
@@ -286,16 +765,28 @@ class VectorStoreManager:
             chunk_overlap=chunk_overlap,
             length_function=len,
             is_separator_regex=False,
+            add_start_index=True,
         )
         
-        # Split documents
-        texts = text_splitter.split_documents(documents)
+        # Split each document separately so chunks can be linked to their parent.
+        # Chunk IDs are assigned up front so that they can be fetched by ID later.
+        texts = []
+        ids = []
+        for document in documents:
+            chunks = text_splitter.split_documents([document])
+            ids.extend(link_chunks(document.id or str(uuid4()), chunks))
+            texts.extend(chunks)
         logger.info(f"Split {len(documents)} documents into {len(texts)} chunks")
         
+        # Fit a PCA projection on the whole corpus rather than the first batch,
+        # and keep the sample's embeddings for the upserts below
+        sample_vectors = await self._fit_projection([chunk.page_content for chunk in texts], index_name)
+        embeddings = [sample_vectors.get(i) for i in range(len(texts))] if sample_vectors else None
+        
         # Process in batches
         if len(texts) <= batch_size:
             # Small enough to process in one batch
-            return await self.upsert_documents(texts, index_name)
+            return await self.upsert_documents(texts, index_name, ids, embeddings)
         else:
             # Process in batches
             success = True
@@ -303,12 +794,15 @@ class VectorStoreManager:
             
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i+batch_size]
+                batch_ids = ids[i:i+batch_size]
                 batch_num = (i // batch_size) + 1
                 
                 logger.info(f"Processing batch {batch_num}/{total_batches} with {len(batch)} chunks")
                 
                 try:
-                    batch_success = await self.upsert_documents(batch, index_name)
+                    batch_success = await self.upsert_documents(
+                        batch, index_name, batch_ids, embeddings[i:i+batch_size] if embeddings else None
+                    )
                     if not batch_success:
                         logger.error(f"Failed to upsert batch {batch_num}/{total_batches}")
                         success = False
@@ -323,20 +817,266 @@ class VectorStoreManager:
         query: str,
         index_name: Optional[str] = None,
         k: int = 4,
-        score_threshold: Optional[float] = None
+        score_threshold: Optional[float] = None,
+        mode: str = "vector",
+        filter: Optional[Dict[str, Any]] = None,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        window: int = 1
     ) -> List[Tuple[Document, float]]:
         """Perform a similarity search in the vector store.
         
+        In "hybrid" mode the vector search and a BM25 search over the local
+        inverted index run concurrently, and the two rankings are fused with
+        reciprocal rank fusion. Scores are then fusion scores, and
+        score_threshold applies to the vector candidates only.
+        
+        In "mmr" mode fetch_k candidates are retrieved together with their
+        vectors, and k of them are selected by maximal marginal relevance so
+        that near-duplicate chunks do not crowd out other results.
+        
+        In "small_to_big" mode the k best chunks are expanded by `window`
+        neighbouring chunks on each side, fetched in one batched lookup, and
+        overlapping or adjacent windows of the same parent are merged. Fewer
+        than k, larger passages may be returned, each scored by its best chunk.
+        
+        A metadata filter is pushed down to Pinecone, or resolved through the
+        local metadata indexes before any scoring on the local backends.
+        
         Args:
             query: The query string to search for.
             index_name: Name of the index to search in. Uses default if not provided.
             k: Number of results to return.
             score_threshold: Minimum similarity score threshold.
+            mode: Retrieval mode, one of "vector", "hybrid", "mmr" or "small_to_big".
+            filter: Pinecone-style metadata filter, e.g. {"source": {"$in": [...]}}.
+            fetch_k: Number of candidates to fetch before MMR selection.
+            lambda_mult: MMR trade-off between relevance (1.0) and diversity (0.0).
+            window: Neighbouring chunks to include on each side in "small_to_big" mode.
             
         Returns:
             List of (document, score) tuples.
         """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        
+        # Plain vector results do not depend on the threshold, so they are cached
+        # without it and filtered after the lookup; other modes use it while ranking
+        search_threshold = None if mode == "vector" else score_threshold
+        cache_key = self._retrieval_cache_key(
+            query, index_name, await self.get_index_generation(index_name),
+            k, mode, filter, search_threshold, fetch_k, lambda_mult, window
+        )
+        results = self._retrieval_cache_get(cache_key)
+        if results is None:
+            results = await self._search_uncached(
+                query, index_name, k, search_threshold, mode, filter, fetch_k, lambda_mult, window
+            )
+            self._retrieval_cache_put(cache_key, results)
+        else:
+            logger.info(f"Retrieval cache hit for query: {query[:50]}...")
+        
+        if mode == "vector" and score_threshold is not None:
+            return [(doc, score) for doc, score in results if score >= score_threshold]
+        return list(results)
+    
+    async def _search_uncached(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        mode: str,
+        filter: Optional[Dict[str, Any]],
+        fetch_k: int,
+        lambda_mult: float,
+        window: int
+    ) -> List[Tuple[Document, float]]:
+        """Dispatch a search to the implementation of a retrieval mode."""
+        if mode == "vector":
+            return await self._vector_search(query, index_name, k, score_threshold, filter)
+        if mode == "mmr":
+            return await self._mmr_search(
+                query, index_name, k, score_threshold, filter, fetch_k, lambda_mult
+            )
+        if mode == "small_to_big":
+            return await self._small_to_big_search(
+                query, index_name, k, score_threshold, filter, window
+            )
+        return await self._hybrid_search(query, index_name, k, score_threshold, filter)
+    
+    async def _hybrid_search(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[Document, float]]:
+        """Run lexical and vector searches concurrently and fuse them with RRF."""
         try:
+            candidate_k = max(k, self.config.hybrid_candidates)
+            lexical_index = await self._load_lexical_index(index_name)
+            if not len(lexical_index):
+                logger.warning(
+                    f"The lexical index of {index_name or self.config.default_index_name} is empty; "
+                    f"hybrid search is returning vector results only"
+                )
+            vector_results, lexical_results = await asyncio.gather(
+                self._vector_search(query, index_name, candidate_k, score_threshold, filter),
+                asyncio.to_thread(lexical_index.search, query, candidate_k, filter)
+            )
+            results = reciprocal_rank_fusion(
+                [vector_results, lexical_results], k=k, rrf_k=self.config.rrf_k
+            )
+            logger.info(
+                f"Fused {len(vector_results)} vector and {len(lexical_results)} lexical results "
+                f"for query: {query[:50]}..."
+            )
+            return results
+        except Exception as e:
+            logger.error(f"Failed to perform hybrid search: {str(e)}")
+            raise
+    
+    async def get_index_generation(self, index_name: Optional[str] = None) -> int:
+        """Get the write generation of an index.
+        
+        The generation increases every time documents are upserted to the
+        index or the index is deleted, so it can be used to tag derived data.
+        It counts this process's writes unless a shared generation source is
+        set, see `set_generation_source`.
+        
+        Args:
+            index_name: Name of the index. Uses default if not provided.
+            
+        Returns:
+            The current generation number.
+        """
+        index_name = index_name or self.config.default_index_name
+        if self._generation_source is not None:
+            return await self._generation_source(index_name)
+        return self._index_generations.get(index_name, 0)
+    
+    def set_generation_source(self, source: Callable[[str], Awaitable[int]]):
+        """Read index generations from a counter shared between processes.
+        
+        The source should be bumped by a write listener in every process, as
+        the query cache's index tag versions are, so that a write made by
+        another worker also invalidates this process's retrieval cache.
+        
+        Args:
+            source: Coroutine function taking an index name and returning its generation
+        """
+        self._generation_source = source
+    
+    def add_write_listener(self, listener: Callable[[str], None]):
+        """Register a callback run with the index name whenever an index is written to.
+        
+        Listeners run after every upsert and index deletion, so caches of
+        data derived from an index can invalidate it.
+        
+        Args:
+            listener: Function taking the name of the index that changed
+        """
+        self._write_listeners.append(listener)
+    
+    def _bump_generation(self, index_name: Optional[str] = None):
+        """Advance the write generation of an index, invalidating derived caches."""
+        index_name = index_name or self.config.default_index_name
+        self._index_generations[index_name] = self._index_generations.get(index_name, 0) + 1
+        for listener in self._write_listeners:
+            try:
+                listener(index_name)
+            except Exception as e:
+                logger.warning(f"Index write listener failed for {index_name}: {str(e)}")
+    
+    def _retrieval_cache_key(
+        self,
+        query: str,
+        index_name: Optional[str],
+        generation: int,
+        k: int,
+        mode: str,
+        filter: Optional[Dict[str, Any]],
+        score_threshold: Optional[float],
+        fetch_k: int,
+        lambda_mult: float,
+        window: int
+    ) -> Tuple:
+        """Build the retrieval cache key for a search at a write generation of the index."""
+        index_name = index_name or self.config.default_index_name
+        query_hash = hashlib.md5(query.encode()).hexdigest()
+        filter_key = json.dumps(filter, sort_keys=True, default=str) if filter else None
+        mode_params = {
+            "vector": (),
+            "hybrid": (score_threshold,),
+            "mmr": (score_threshold, fetch_k, lambda_mult),
+            "small_to_big": (score_threshold, window),
+        }[mode]
+        return (
+            index_name, generation, query_hash, k, filter_key, mode
+        ) + mode_params
+    
+    def _retrieval_cache_get(self, key: Tuple) -> Optional[List[Tuple[Document, float]]]:
+        """Look up cached search results, refreshing their recency on a hit.
+        
+        Callers get copies of the cached documents, so changes they make do
+        not leak into the results of later searches.
+        """
+        if self.config.retrieval_cache_size <= 0:
+            return None
+        with self._retrieval_cache_lock:
+            results = self._retrieval_cache.get(key)
+            if results is None:
+                self._retrieval_cache_misses += 1
+                return None
+            self._retrieval_cache.move_to_end(key)
+            self._retrieval_cache_hits += 1
+        return [(doc.model_copy(deep=True), score) for doc, score in results]
+    
+    def _retrieval_cache_put(self, key: Tuple, results: List[Tuple[Document, float]]):
+        """Store search results, evicting the least recently used entries."""
+        if self.config.retrieval_cache_size <= 0:
+            return
+        results = [(doc.model_copy(deep=True), score) for doc, score in results]
+        with self._retrieval_cache_lock:
+            self._retrieval_cache[key] = results
+            self._retrieval_cache.move_to_end(key)
+            while len(self._retrieval_cache) > self.config.retrieval_cache_size:
+                self._retrieval_cache.popitem(last=False)
+    
+    def retrieval_cache_stats(self) -> Dict[str, int]:
+        """Get retrieval cache counters.
+        
+        Returns:
+            Dictionary with the number of entries, hits and misses.
+        """
+        with self._retrieval_cache_lock:
+            return {
+                "entries": len(self._retrieval_cache),
+                "hits": self._retrieval_cache_hits,
+                "misses": self._retrieval_cache_misses,
+            }
+    
+    async def _vector_search(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Perform a dense vector search against the configured backend."""
+        try:
+            if self.uses_local_backend or self.get_reducer(index_name) is not None:
+                # Reduced indexes are searched by vector so the query can be projected
+                query_vector = await asyncio.to_thread(self._embeddings.embed_query, query)
+                results = await self._search_by_vector(
+                    query_vector, index_name, None, k, score_threshold, filter
+                )
+                logger.info(f"Found {len(results)} results for query: {query[:50]}...")
+                return results
+            
             # Get the vector store
             vector_store = await self.get_vector_store(index_name)
             
@@ -351,13 +1091,15 @@ class VectorStoreManager:
                     vector_store.similarity_search_with_score,
                     query,
                     k=k,
+                    filter=filter,
                     score_threshold=score_threshold
                 )
             else:
                 results = await asyncio.to_thread(
                     vector_store.similarity_search_with_score,
                     query,
-                    k=k
+                    k=k,
+                    filter=filter
                 )
             
             logger.info(f"Found {len(results)} results for query: {query[:50]}...")
@@ -365,6 +1107,344 @@ class VectorStoreManager:
         except Exception as e:
             logger.error(f"Failed to perform similarity search: {str(e)}")
             raise
+    
+    async def _mmr_search(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]],
+        fetch_k: int,
+        lambda_mult: float
+    ) -> List[Tuple[Document, float]]:
+        """Fetch candidates with their vectors and select a diverse top-k with MMR."""
+        try:
+            # MMR compares candidates with each other, so it works in the stored dimension
+            query_vector = await self._reduce_query(
+                index_name, await asyncio.to_thread(self._embeddings.embed_query, query)
+            )
+            fetch_k = max(fetch_k, k)
+            
+            if self.uses_local_backend:
+                candidates, candidate_vectors = self.get_local_index(index_name).search_with_vectors(
+                    query_vector, k=fetch_k, score_threshold=score_threshold, filter=filter
+                )
+            else:
+                vector_store = await self.get_vector_store(index_name)
+                response = await asyncio.to_thread(
+                    vector_store.index.query,
+                    vector=query_vector,
+                    top_k=fetch_k,
+                    include_values=True,
+                    include_metadata=True,
+                    filter=filter
+                )
+                text_key = getattr(vector_store, "_text_key", "text")
+                candidates, candidate_vectors = [], []
+                for match in response["matches"]:
+                    if score_threshold is not None and match["score"] < score_threshold:
+                        continue
+                    metadata = dict(match.get("metadata") or {})
+                    metadata.pop(FULL_VECTOR_KEY, None)
+                    document = Document(
+                        id=match.get("id"),
+                        page_content=metadata.pop(text_key, ""),
+                        metadata=metadata
+                    )
+                    candidates.append((document, match["score"]))
+                    candidate_vectors.append(match["values"])
+            
+            selected = maximal_marginal_relevance(
+                query_vector, candidate_vectors, k=k, lambda_mult=lambda_mult
+            )
+            results = [candidates[i] for i in selected]
+            logger.info(
+                f"Selected {len(results)} of {len(candidates)} candidates with MMR for query: {query[:50]}..."
+            )
+            return results
+        except Exception as e:
+            logger.error(f"Failed to perform MMR search: {str(e)}")
+            raise
+    
+    async def fetch_documents(
+        self,
+        ids: List[str],
+        index_name: Optional[str] = None
+    ) -> Dict[str, Document]:
+        """Fetch stored chunks by ID in a single batched lookup.
+        
+        Args:
+            ids: IDs of the chunks to fetch.
+            index_name: Name of the index to fetch from. Uses default if not provided.
+            
+        Returns:
+            Mapping of ID to document for the IDs that exist.
+        """
+        if not ids:
+            return {}
+        
+        if self.uses_local_backend:
+            documents = self.get_local_index(index_name).get(ids)
+            return {doc_id: doc for doc_id, doc in zip(ids, documents) if doc is not None}
+        
+        vector_store = await self.get_vector_store(index_name)
+        response = await asyncio.to_thread(vector_store.index.fetch, ids=list(ids))
+        text_key = getattr(vector_store, "_text_key", "text")
+        documents = {}
+        for doc_id, vector in response.vectors.items():
+            metadata = dict(vector.metadata or {})
+            metadata.pop(FULL_VECTOR_KEY, None)
+            documents[doc_id] = Document(
+                id=doc_id,
+                page_content=metadata.pop(text_key, ""),
+                metadata=metadata
+            )
+        return documents
+    
+    async def _small_to_big_search(
+        self,
+        query: str,
+        index_name: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]],
+        window: int
+    ) -> List[Tuple[Document, float]]:
+        """Search small chunks, then return merged windows of their neighbours."""
+        try:
+            hits = await self._vector_search(query, index_name, k, score_threshold, filter)
+            windows = plan_windows(hits, window)
+            
+            wanted_ids = [
+                make_chunk_id(parent_id, chunk_index)
+                for parent_id, first, last, _ in windows
+                for chunk_index in range(first, last + 1)
+            ]
+            chunks = await self.fetch_documents(wanted_ids, index_name)
+            
+            results = []
+            for parent_id, first, last, score in windows:
+                window_chunks = [
+                    chunks[chunk_id]
+                    for chunk_id in (make_chunk_id(parent_id, i) for i in range(first, last + 1))
+                    if chunk_id in chunks
+                ]
+                if not window_chunks:
+                    continue
+                metadata = {
+                    key: value for key, value in window_chunks[0].metadata.items()
+                    if key not in (CHUNK_INDEX_KEY, START_INDEX_KEY)
+                }
+                metadata["chunk_range"] = [
+                    window_chunks[0].metadata.get(CHUNK_INDEX_KEY, first),
+                    window_chunks[-1].metadata.get(CHUNK_INDEX_KEY, last)
+                ]
+                results.append((
+                    Document(page_content=merge_chunks(window_chunks), metadata=metadata),
+                    score
+                ))
+            
+            # Hits without parent links (e.g. ingested through upsert_documents) pass through
+            results.extend(
+                (doc, score) for doc, score in hits if PARENT_ID_KEY not in doc.metadata
+            )
+            results.sort(key=lambda item: item[1], reverse=True)
+            
+            logger.info(
+                f"Expanded {len(hits)} chunks into {len(results)} passages for query: {query[:50]}..."
+            )
+            return results
+        except Exception as e:
+            logger.error(f"Failed to perform small-to-big search: {str(e)}")
+            raise
+    
+    async def _search_by_vector(
+        self,
+        query_vector: List[float],
+        index_name: Optional[str],
+        namespace: Optional[str],
+        k: int,
+        score_threshold: Optional[float],
+        filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[Document, float]]:
+        """Search a single index or namespace with a precomputed full-dimension query embedding."""
+        if self.uses_local_backend:
+            # Local indexes have no namespaces, so the whole index is searched
+            return self._search_local(index_name, [query_vector], k, score_threshold, filter)[0]
+        
+        vector_store = await self.get_vector_store(index_name)
+        reduced_query = await self._reduce_query(index_name, query_vector)
+        rescore = self._rescores(index_name)
+        search_kwargs = {"k": k * self.config.rescore_factor if rescore else k, "filter": filter}
+        if namespace is not None:
+            search_kwargs["namespace"] = namespace
+        results = await asyncio.to_thread(
+            vector_store.similarity_search_by_vector_with_score,
+            reduced_query,
+            **search_kwargs
+        )
+        full_vectors = [doc.metadata.pop(FULL_VECTOR_KEY, None) for doc, _ in results]
+        if rescore:
+            results = self._rescore_hits(query_vector, results, full_vectors, k)
+        if score_threshold is not None:
+            results = [(doc, score) for doc, score in results if score >= score_threshold]
+        return results
+    
+    async def federated_search(
+        self,
+        query: str,
+        targets: List[Union[str, Tuple[str, Optional[str]]]],
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> List[Tuple[Document, float]]:
+        """Search several indexes or namespaces concurrently and merge the results.
+        
+        The query is embedded once and every target is searched concurrently.
+        Targets that fail or exceed the timeout are logged and left out, so a
+        slow shard degrades the result instead of blocking it. Documents found
+        in several targets are returned once. The local backend has no
+        namespaces, so its targets are collapsed to one search per index.
+        
+        Args:
+            query: The query string to search for.
+            targets: Index names, or (index_name, namespace) tuples.
+            k: Number of merged results to return.
+            score_threshold: Minimum similarity score threshold.
+            filter: Pinecone-style metadata filter applied to every target.
+            timeout: Seconds to wait for each target. Uses config default if not provided.
+            
+        Returns:
+            The k best (document, score) tuples across all targets.
+        """
+        timeout = timeout if timeout is not None else self.config.federated_timeout
+        normalized = [
+            target if isinstance(target, tuple) else (target, None)
+            for target in targets
+        ]
+        if self.uses_local_backend:
+            if any(namespace is not None for _, namespace in normalized):
+                logger.warning(
+                    "The local backend does not support namespaces; searching each index once"
+                )
+            normalized = list(dict.fromkeys(
+                (index_name or self.config.default_index_name, None) for index_name, _ in normalized
+            ))
+        
+        try:
+            query_vector = await asyncio.to_thread(self._embeddings.embed_query, query)
+        except Exception as e:
+            logger.error(f"Failed to embed federated query: {str(e)}")
+            raise
+        
+        outcomes = await asyncio.gather(*[
+            asyncio.wait_for(
+                self._search_by_vector(
+                    query_vector, index_name, namespace, k, score_threshold, filter
+                ),
+                timeout
+            )
+            for index_name, namespace in normalized
+        ], return_exceptions=True)
+        
+        result_lists = []
+        for (index_name, namespace), outcome in zip(normalized, outcomes):
+            target_label = f"{index_name}/{namespace}" if namespace else index_name
+            if isinstance(outcome, asyncio.TimeoutError):
+                logger.warning(f"Federated search timed out after {timeout}s on {target_label}")
+            elif isinstance(outcome, Exception):
+                logger.warning(f"Federated search failed on {target_label}: {str(outcome)}")
+            else:
+                result_lists.append(outcome)
+        
+        results = merge_top_k(result_lists, k)
+        logger.info(
+            f"Merged results from {len(result_lists)}/{len(normalized)} targets for query: {query[:50]}..."
+        )
+        return results
+    
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed several texts, letting the embedding client batch the requests.
+        
+        Args:
+            texts: Texts to embed.
+            
+        Returns:
+            One embedding vector per text, in input order.
+        """
+        if not texts:
+            return []
+        return await asyncio.to_thread(self._embeddings.embed_documents, list(texts))
+    
+    async def _embed_documents(
+        self,
+        documents: List[Document],
+        embeddings: Optional[List[Optional[List[float]]]] = None
+    ) -> List[List[float]]:
+        """Embed documents, reusing any embeddings already computed for them.
+        
+        Args:
+            documents: Documents to embed.
+            embeddings: Known embeddings by position, None where missing.
+            
+        Returns:
+            One embedding vector per document, in input order.
+        """
+        vectors = list(embeddings) if embeddings is not None else [None] * len(documents)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        computed = await self._embed_texts([documents[i].page_content for i in missing])
+        for i, vector in zip(missing, computed):
+            vectors[i] = vector
+        return vectors
+    
+    async def similarity_search_many(
+        self,
+        queries: List[str],
+        k: int = 4,
+        score_threshold: Optional[float] = None,
+        index_name: Optional[str] = None,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """Perform similarity searches for several queries at once.
+        
+        Queries are embedded concurrently through the same query-embedding path
+        as a single search, so batched and single results match. On the local
+        backend the searches run as a single matrix multiply; on Pinecone the
+        per-query lookups are issued concurrently.
+        
+        Args:
+            queries: The query strings to search for.
+            k: Number of results to return per query.
+            score_threshold: Minimum similarity score threshold.
+            index_name: Name of the index to search in. Uses default if not provided.
+            filter: Pinecone-style metadata filter applied to every query.
+            
+        Returns:
+            One list of (document, score) tuples per query, in input order.
+        """
+        if not queries:
+            return []
+        
+        try:
+            query_vectors = await asyncio.gather(*[
+                asyncio.to_thread(self._embeddings.embed_query, query) for query in queries
+            ])
+            
+            if self.uses_local_backend:
+                results = self._search_local(index_name, query_vectors, k, score_threshold, filter)
+            else:
+                results = await asyncio.gather(*[
+                    self._search_by_vector(query_vector, index_name, None, k, score_threshold, filter)
+                    for query_vector in query_vectors
+                ])
+            
+            logger.info(f"Found results for {len(queries)} queries in one batch")
+            return list(results)
+        except Exception as e:
+            logger.error(f"Failed to perform batched similarity search: {str(e)}")
+            raise
 
 
 # Create a singleton instance
@@ -387,6 +1467,11 @@ async def check_index_exists(index_name: Optional[str] = None) -> bool:
     return await vector_store_manager.check_index_exists(index_name)
 
 
+async def prewarm_indexes(index_names: Optional[List[str]] = None) -> Dict[str, IndexInfo]:
+    """Load index metadata and handles ahead of the first query."""
+    return await vector_store_manager.prewarm_indexes(index_names)
+
+
 async def get_index(index_name: Optional[str] = None):
     """Get a Pinecone index instance."""
     return await vector_store_manager.get_index(index_name)
@@ -423,9 +1508,41 @@ async def similarity_search(
     query: str,
     index_name: Optional[str] = None,
     k: int = 4,
-    score_threshold: Optional[float] = None
+    score_threshold: Optional[float] = None,
+    mode: str = "vector",
+    filter: Optional[Dict[str, Any]] = None,
+    fetch_k: int = 20,
+    lambda_mult: float = 0.5,
+    window: int = 1
 ) -> List[Tuple[Document, float]]:
     """Perform a similarity search in the vector store."""
     return await vector_store_manager.similarity_search(
-        query, index_name, k, score_threshold
+        query, index_name, k, score_threshold, mode, filter, fetch_k, lambda_mult, window
+    )
+
+
+async def federated_search(
+    query: str,
+    targets: List[Union[str, Tuple[str, Optional[str]]]],
+    k: int = 4,
+    score_threshold: Optional[float] = None,
+    filter: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None
+) -> List[Tuple[Document, float]]:
+    """Search several indexes or namespaces concurrently and merge the results."""
+    return await vector_store_manager.federated_search(
+        query, targets, k, score_threshold, filter, timeout
+    )
+
+
+async def similarity_search_many(
+    queries: List[str],
+    k: int = 4,
+    score_threshold: Optional[float] = None,
+    index_name: Optional[str] = None,
+    filter: Optional[Dict[str, Any]] = None
+) -> List[List[Tuple[Document, float]]]:
+    """Perform similarity searches for several queries at once."""
+    return await vector_store_manager.similarity_search_many(
+        queries, k, score_threshold, index_name, filter
     )
@@ -0,0 +1,180 @@
+"""
+Warmup Module for Modern RAG Application
+
+This module keeps the answers to frequent queries in the cache. On startup
+and then on a schedule, the most frequent queries from the query log are run
+through the RAG pipeline in the background: queries with no cached answer
+are computed, and answers that are about to expire, or already stale, are
+recomputed ahead of time. Refreshing shortly before expiry spreads
+recomputation out, instead of letting hot entries that were cached together
+all expire together.
+
+Warm-up runs at low priority: only a few queries run at once, with a pause
+after each, and queries that fail are skipped until the next pass.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+from functools import lru_cache
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+from modernrag.caching import get_result_expires_in
+from modernrag.query_log import get_query_log
+from modernrag.generation import generation_manager
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class WarmupConfig(BaseSettings):
+    """Configuration settings for cache warm-up."""
+    enable_cache_warmup: bool = Field(True, env="ENABLE_CACHE_WARMUP")
+    warmup_top_n: int = Field(50, env="WARMUP_TOP_N")  # Number of frequent queries kept warm
+    warmup_concurrency: int = Field(2, env="WARMUP_CONCURRENCY")  # Queries run at once
+    warmup_interval: float = Field(300.0, env="WARMUP_INTERVAL")  # Seconds between passes
+    warmup_refresh_window: float = Field(600.0, env="WARMUP_REFRESH_WINDOW")  # Refresh answers expiring this soon; keep above the interval
+    warmup_pause: float = Field(0.5, env="WARMUP_PAUSE")  # Seconds to yield after each query
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
+@lru_cache()
+def get_warmup_config() -> WarmupConfig:
+    """Get the warm-up configuration."""
+    return WarmupConfig()
+
+
+class CacheWarmer:
+    """Runs frequent queries in the background to keep their answers cached."""
+
+    def __init__(self):
+        """Initialize the cache warmer."""
+        self.config = get_warmup_config()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_run: Optional[Dict[str, int]] = None
+
+    async def _warm_query(self, query: str, params: Dict, semaphore: asyncio.Semaphore) -> str:
+        """Warm or refresh the cached answer of one query.
+
+        Args:
+            query: The query text
+            params: Pipeline parameters the query is cached under
+            semaphore: Semaphore bounding the number of queries run at once
+
+        Returns:
+            "warmed", "refreshed", "skipped" or "failed"
+        """
+        async with semaphore:
+            if self._stop.is_set():
+                return "skipped"
+            expires_in = await asyncio.to_thread(get_result_expires_in, query, **params)
+            if expires_in is not None and expires_in > self.config.warmup_refresh_window:
+                return "skipped"
+
+            refresh = expires_in is not None
+            # Called on the manager so that warm-up runs are not counted in the query log
+            result = await generation_manager.retrieve_augment_generate(
+                query,
+                index_name=params.get("index_name"),
+                k=params.get("k", 4),
+                score_threshold=params.get("score_threshold"),
+                rerank_top_k=params.get("rerank_top_k", 3),
+                refresh_cache=refresh
+            )
+            await asyncio.sleep(self.config.warmup_pause)
+            if "error" in result:
+                logger.warning(f"Cache warm-up failed for query: {query[:50]}... ({result['error']})")
+                return "failed"
+            return "refreshed" if refresh else "warmed"
+
+    async def warm(self, top_n: Optional[int] = None) -> Dict[str, int]:
+        """Run one warm-up pass over the most frequent queries.
+
+        Args:
+            top_n: Number of frequent queries to warm. Uses the configured value if not provided.
+
+        Returns:
+            Dictionary with the number of queries warmed, refreshed, skipped and failed
+        """
+        top_n = self.config.warmup_top_n if top_n is None else top_n
+        queries = await asyncio.to_thread(get_query_log().top, top_n)
+        semaphore = asyncio.Semaphore(max(1, self.config.warmup_concurrency))
+        start_time = time.perf_counter()
+
+        outcomes = await asyncio.gather(
+            *(self._warm_query(query, params, semaphore) for query, params, _ in queries)
+        )
+        counts = {outcome: outcomes.count(outcome) for outcome in ("warmed", "refreshed", "skipped", "failed")}
+        self.last_run = counts
+        logger.info(
+            f"Cache warm-up over {len(queries)} queries in {time.perf_counter() - start_time:.1f}s: {counts}"
+        )
+        return counts
+
+    def _warm_loop(self):
+        """Run a warm-up pass now and then every interval until stopped."""
+        while not self._stop.is_set():
+            try:
+                asyncio.run(self.warm())
+            except Exception as e:
+                logger.warning(f"Background cache warm-up failed: {str(e)}")
+            if self._stop.wait(self.config.warmup_interval):
+                return
+
+    def start_background_warmup(self):
+        """Start the background warm-up thread if it is enabled and not already running.
+
+        A thread with its own event loop is used, as for cache expiry, so that
+        warm-up keeps running when callers use short-lived event loops.
+        """
+        if not self.config.enable_cache_warmup:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._warm_loop, name="query-cache-warmup", daemon=True)
+        self._thread.start()
+        logger.info(f"Started cache warm-up of the top {self.config.warmup_top_n} queries every {self.config.warmup_interval}s")
+
+    def stop_background_warmup(self, timeout: Optional[float] = None):
+        """Stop the background warm-up thread after its current queries finish.
+
+        Args:
+            timeout: Seconds to wait for the thread to stop
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+
+# Create a singleton instance
+cache_warmer = CacheWarmer()
+
+
+async def warm_cache(top_n: Optional[int] = None) -> Dict[str, int]:
+    """Warm or refresh the cached answers of the most frequent queries."""
+    return await cache_warmer.warm(top_n)
+
+
+def start_background_warmup():
+    """Start warming the cached answers of frequent queries in the background."""
+    cache_warmer.start_background_warmup()
+
+
+def stop_background_warmup():
+    """Stop the background cache warm-up."""
+    cache_warmer.stop_background_warmup()
@@ -16,6 +16,7 @@ setup(
         "langchain-text-splitters>=0.1.0",
         "pinecone-client>=3.0.0",
         "PyMuPDF>=1.26.4",
+        "numpy>=1.24.0",
         "python-dotenv>=1.0.0",
         "pydantic>=2.0.0",
         "pydantic-settings>=2.0.0",
@@ -48,3 +48,53 @@ def sample_documents():
             metadata={"source": "test-source-3", "page": 3}
         )
     ]
+
+
+class FakeEmbeddings:
+    """Deterministic bag-of-words embeddings for tests that must not call OpenAI."""
+
+    def __init__(self, dimension=64):
+        self.dimension = dimension
+        self.calls = []
+
+    def _embed(self, text):
+        vector = [0.0] * self.dimension
+        for token in text.lower().split():
+            vector[sum(ord(c) for c in token.strip(".,?!")) % self.dimension] += 1.0
+        return vector
+
+    def embed_documents(self, texts):
+        self.calls.append(("embed_documents", list(texts)))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append(("embed_query", text))
+        return self._embed(text)
+
+
+@pytest.fixture
+def fake_embeddings():
+    """Create deterministic fake embeddings for testing."""
+    return FakeEmbeddings()
+
+
+@pytest.fixture
+def local_manager(mock_env_vars, fake_embeddings):
+    """Create a VectorStoreManager that uses the local NumPy backend."""
+    from unittest.mock import patch
+    from modernrag.vector_store import VectorStoreManager
+
+    with patch("modernrag.vector_store.Pinecone"), \
+         patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+        manager = VectorStoreManager()
+    manager.config = manager.config.model_copy(update={"vector_backend": "local"})
+    return manager
+
+
+@pytest.fixture
+def resp_server():
+    """Start an in-process Redis protocol server on a free port."""
+    from modernrag.resp_server import LocalRespServer
+    server = LocalRespServer().start()
+    yield server
+    server.stop()
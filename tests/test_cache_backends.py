@@ -0,0 +1,184 @@
+"""
+Unit tests for the cache_backends module.
+"""
+
+import os
+import sys
+import time
+import uuid
+import subprocess
+import pytest
+from langchain.docstore.document import Document
+
+from modernrag.cache_backends import (
+    RespClient,
+    RespError,
+    RedisCacheBackend,
+    SharedMemoryCacheBackend,
+    parse_redis_url
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def shared_memory_name():
+    """Pick a segment name and remove the segment after the test."""
+    name = f"modernrag-test-{uuid.uuid4().hex[:8]}"
+    yield name
+    try:
+        backend = SharedMemoryCacheBackend(name)
+        backend.close()
+        backend.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class TestRedisCacheBackend:
+    """Tests for the Redis protocol client and backend."""
+
+    def test_parse_redis_url(self):
+        """Test that host, port, database and password are read from the URL."""
+        assert parse_redis_url("redis://:secret@cache.local:6380/2") == ("cache.local", 6380, 2, "secret")
+        assert parse_redis_url("redis://localhost") == ("localhost", 6379, 0, None)
+        with pytest.raises(ValueError):
+            parse_redis_url("http://localhost")
+
+    def test_round_trip_tags_and_delete(self, resp_server):
+        """Test that entries, tag versions and deletions go through the server."""
+        backend = RedisCacheBackend(resp_server.url)
+        now = time.time()
+        value = {"response": "answer", "retrieved_docs": [(Document(page_content="text"), 0.9)]}
+        backend.set("key", value, now, now + 60, {"index:docs": 2})
+        backend.set_tag_version("index:docs", 2)
+
+        assert backend.get("key") == (value, now, {"index:docs": 2})
+        assert backend.get_meta("key") == (now, {"index:docs": 2})
+        assert backend.get_tag_versions() == {"index:docs": 2}
+        assert len(backend) == 1
+        assert backend.delete("key") is True
+        assert backend.get("key") is None
+        backend.close()
+
+    def test_tag_bumps_are_atomic_and_never_lowered(self, resp_server):
+        """Test that bumps from two clients get distinct versions and lower versions are ignored."""
+        first = RedisCacheBackend(resp_server.url)
+        second = RedisCacheBackend(resp_server.url)
+
+        versions = [backend.bump_tag_version("index:docs") for _ in range(3) for backend in (first, second)]
+        second.set_tag_version("index:docs", 2)
+
+        assert versions == [1, 2, 3, 4, 5, 6]
+        assert first.get_tag_versions() == {"index:docs": 6}
+        first.close()
+        second.close()
+
+    def test_get_many_is_one_pipelined_round_trip(self, resp_server):
+        """Test that a multi-get returns entries in order, with None for misses, in one write."""
+        backend = RedisCacheBackend(resp_server.url)
+        now = time.time()
+        for i in range(5):
+            backend.set(f"key {i}", i, now, now + 60)
+        backend.get("warm up the connection")
+
+        sent = []
+        backend.client._socket = _RecordingSocket(backend.client._socket, sent)
+        results = backend.get_many(["key 3", "missing", "key 0", "key 4"])
+
+        assert [entry and entry[0] for entry in results] == [3, None, 0, 4]
+        assert len(sent) == 1
+
+    def test_entries_expire_and_prefixes_are_isolated(self, resp_server):
+        """Test that server-side TTLs expire entries and clear only touches its own prefix."""
+        first = RedisCacheBackend(resp_server.url, prefix="first:")
+        second = RedisCacheBackend(resp_server.url, prefix="second:")
+        now = time.time()
+        first.set("short", "value", now, now + 0.05)
+        first.set("long", "value", now, now + 60)
+        second.set("long", "value", now, now + 60)
+
+        time.sleep(0.1)
+        assert first.get("short") is None
+        first.clear()
+
+        assert len(first) == 0
+        assert second.get("long") == ("value", now, {})
+
+    def test_client_reconnects_and_raises_error_replies(self, resp_server):
+        """Test that a dropped connection is reopened and server errors are raised."""
+        client = RespClient(resp_server.url)
+        assert client.execute("PING") == b"PONG"
+        client._socket.close()
+
+        assert client.execute("PING") == b"PONG"
+        with pytest.raises(RespError):
+            client.execute("NOSUCHCOMMAND")
+        assert client.execute("SET", "key", "value") == b"OK"
+
+
+class _RecordingSocket:
+    """Socket wrapper that records each sendall call."""
+
+    def __init__(self, sock, sent):
+        self._sock = sock
+        self._sent = sent
+
+    def sendall(self, data):
+        self._sent.append(data)
+        return self._sock.sendall(data)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class TestSharedMemoryCacheBackend:
+    """Tests for the shared memory backend."""
+
+    def test_round_trip_across_attachments(self, shared_memory_name):
+        """Test that a second attachment to the segment sees entries and tag versions."""
+        first = SharedMemoryCacheBackend(shared_memory_name, slots=64, slot_size=4096)
+        second = SharedMemoryCacheBackend(shared_memory_name)
+        now = time.time()
+        first.set("key", {"response": "answer"}, now, now + 60, {"index:docs": 1})
+        first.set_tag_version("index:docs", 1)
+
+        assert second.slots == 64 and second.slot_size == 4096
+        assert second.get("key") == ({"response": "answer"}, now, {"index:docs": 1})
+        assert second.get_many(["missing", "key"])[0] is None
+        assert second.get_tag_versions() == {"index:docs": 1}
+        assert second.bump_tag_version("index:docs") == 2
+        assert first.bump_tag_version("index:docs") == 3
+        first.set_tag_version("index:docs", 1)
+        assert second.get_tag_versions() == {"index:docs": 3}
+        assert second.delete("key") is True
+        assert first.get("key") is None
+        first.close()
+        second.close()
+
+    def test_expiry_oversized_entries_and_clear(self, shared_memory_name):
+        """Test that expired and oversized entries are not served and clear empties the table."""
+        backend = SharedMemoryCacheBackend(shared_memory_name, slots=64, slot_size=1024)
+        now = time.time()
+        backend.set("expired", "value", now - 10, now - 1)
+        backend.set("too large", os.urandom(4096).hex(), now, now + 60)
+        backend.set("kept", "value", now, now + 60)
+
+        assert backend.get("expired") is None
+        assert backend.get("too large") is None
+        assert len(backend) == 1
+        backend.clear()
+        assert len(backend) == 0
+        backend.close()
+
+    def test_entries_are_shared_with_another_process(self, shared_memory_name):
+        """Test that an entry written by another process can be read here."""
+        script = (
+            "import time; from modernrag.cache_backends import SharedMemoryCacheBackend; "
+            f"b = SharedMemoryCacheBackend({shared_memory_name!r}, slots=64, slot_size=4096); "
+            "b.set('key', {'response': 'from child'}, time.time(), time.time() + 60); b.close()"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, check=True, timeout=60)
+
+        backend = SharedMemoryCacheBackend(shared_memory_name)
+        assert backend.get("key")[0] == {"response": "from child"}
+        backend.close()
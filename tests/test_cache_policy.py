@@ -0,0 +1,173 @@
+"""
+Unit tests for the cache_policy module.
+"""
+
+import time
+import pytest
+
+from langchain.docstore.document import Document
+
+from modernrag.cache_policy import FrequencySketch, TimerWheel, TinyLFUCache, estimate_size
+
+
+class TestFrequencySketch:
+    """Tests for the FrequencySketch class."""
+
+    def test_counts_saturate_and_age(self):
+        """Test that counters cap at 15 and are halved on aging."""
+        sketch = FrequencySketch(16)
+        for _ in range(20):
+            sketch.increment("hot")
+        sketch.increment("cold")
+
+        assert sketch.frequency("hot") == 15
+        assert sketch.frequency("cold") >= 1
+
+        sketch._age()
+        assert sketch.frequency("hot") == 7
+
+
+class TestTimerWheel:
+    """Tests for the TimerWheel class."""
+
+    def test_advance_returns_only_elapsed_keys(self):
+        """Test that only keys in elapsed slots are returned."""
+        wheel = TimerWheel(resolution=1.0, slots=8)
+        now = time.time()
+        wheel.schedule("soon", now + 1)
+        wheel.schedule("later", now + 5)
+        wheel.schedule("next_round", now + 20)
+
+        assert wheel.advance(now + 3) == ["soon"]
+        assert sorted(wheel.advance(now + 30)) == ["later", "next_round"]
+        assert len(wheel) == 0
+
+    def test_cancel_removes_key(self):
+        """Test that cancelled keys never expire."""
+        wheel = TimerWheel(resolution=1.0, slots=8)
+        now = time.time()
+        wheel.schedule("key", now + 1)
+        wheel.cancel("key")
+
+        assert wheel.advance(now + 3) == []
+
+
+class TestEstimateSize:
+    """Tests for the estimate_size function."""
+
+    def test_grows_with_document_content(self):
+        """Test that results with longer documents are estimated larger."""
+        small = {"response": "a", "retrieved_docs": [(Document(page_content="x" * 100), 0.9)]}
+        large = {"response": "a", "retrieved_docs": [(Document(page_content="x" * 100_000), 0.9)]}
+
+        assert estimate_size(large) - estimate_size(small) >= 99_000
+
+    def test_counts_shared_objects_once(self):
+        """Test that an object referenced twice is only counted once."""
+        text = "y" * 10_000
+
+        assert estimate_size([text, text]) < 2 * len(text)
+
+
+class TestTinyLFUCache:
+    """Tests for the TinyLFUCache class."""
+
+    def test_frequent_entries_survive_a_scan(self):
+        """Test that a burst of one-off keys does not flush popular entries."""
+        cache = TinyLFUCache(100)
+        for i in range(100):
+            cache.set(f"hot-{i}", i)
+        for _ in range(3):
+            for i in range(100):
+                cache.get(f"hot-{i}")
+
+        for i in range(1000):
+            cache.set(f"scan-{i}", i)
+
+        survivors = sum(1 for i in range(100) if f"hot-{i}" in cache)
+        assert len(cache) == 100
+        assert survivors >= 95
+        assert cache.evictions == 1000
+
+    def test_lru_mode_evicts_least_recently_used(self):
+        """Test that a full-size window behaves as an LRU."""
+        cache = TinyLFUCache(2, window_fraction=1.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_expired_entries_are_removed(self):
+        """Test that entries are dropped on lookup and by the timer wheel."""
+        cache = TinyLFUCache(10)
+        now = time.time()
+        cache.set("short", 1, expires_at=now + 1)
+        cache.set("long", 2, expires_at=now + 100)
+
+        assert cache.get("short", now=now + 0.5) == 1
+        assert cache.expire(now + 5) == 1
+        assert "short" not in cache
+        assert cache.get("long", now=now + 5) == 2
+        assert cache.expirations == 1
+
+    def test_handles_large_caches(self):
+        """Test that inserts stay fast with 100k entries."""
+        cache = TinyLFUCache(100_000)
+        start = time.perf_counter()
+        for i in range(120_000):
+            cache.set(i, i, expires_at=None)
+        elapsed = time.perf_counter() - start
+
+        assert len(cache) == 100_000
+        assert elapsed < 5.0
+
+    def test_byte_budget_bounds_resident_bytes(self):
+        """Test that the byte budget is honoured however many entries fit."""
+        cache = TinyLFUCache(1000, max_bytes=10_000, weigher=len)
+        for i in range(100):
+            cache.set(i, "z" * 700)
+
+        assert cache.resident_bytes <= 10_000
+        assert cache.resident_bytes == 700 * len(cache)
+        assert cache.evictions == 100 - len(cache)
+
+    def test_popular_entry_evicts_several_smaller_ones(self):
+        """Test that an admitted entry makes room by evicting old entries."""
+        cache = TinyLFUCache(100, window_fraction=0.1, max_bytes=1000, weigher=len)
+        for i in range(9):
+            cache.set(i, "s" * 100)
+        for _ in range(5):
+            cache.get("big")
+        cache.set("big", "b" * 400)
+        cache.set("pusher", "p")
+
+        assert cache.peek("big") is not None
+        assert cache.resident_bytes <= 1000
+
+    def test_oversized_entry_is_rejected(self):
+        """Test that an entry larger than the whole budget is not stored."""
+        cache = TinyLFUCache(10, max_bytes=100, weigher=len)
+        cache.set("small", "a")
+        cache.set("huge", "h" * 1000)
+
+        assert cache.peek("huge") is None
+        assert cache.peek("small") == "a"
+        assert cache.resident_bytes == 1
+
+    def test_removal_releases_bytes(self):
+        """Test that pop, expiry and clear release the entry sizes."""
+        cache = TinyLFUCache(10, max_bytes=1000, weigher=len)
+        now = time.time()
+        cache.set("a", "a" * 10)
+        cache.set("b", "b" * 20, expires_at=now + 1)
+        cache.pop("a")
+        cache.expire(now + 5)
+
+        assert cache.resident_bytes == 0
+        cache.set("c", "c" * 30)
+        cache.clear()
+        assert cache.resident_bytes == 0
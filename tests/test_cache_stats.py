@@ -0,0 +1,59 @@
+"""
+Unit tests for the cache_stats module.
+"""
+
+import threading
+
+from modernrag.cache_stats import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for the LatencyHistogram class."""
+
+    def test_empty_snapshot(self):
+        """Test that an empty histogram reports zeros."""
+        snapshot = LatencyHistogram().snapshot()
+
+        assert snapshot["count"] == 0
+        assert snapshot["p99_ms"] == 0.0
+        assert snapshot["buckets"] == {}
+
+    def test_percentiles_use_bucket_upper_bounds(self):
+        """Test that percentiles report the upper bound of the bucket they fall in."""
+        histogram = LatencyHistogram(bounds=(0.001, 0.01, 0.1))
+        for _ in range(90):
+            histogram.record(0.0005)
+        for _ in range(10):
+            histogram.record(0.05)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["p50_ms"] == 1.0
+        assert snapshot["p95_ms"] == 100.0
+        assert snapshot["max_ms"] == 50.0
+        assert snapshot["buckets"] == {"le_1ms": 90, "le_100ms": 10}
+
+    def test_overflow_reports_slowest_sample(self):
+        """Test that samples above the last bound land in the overflow bucket."""
+        histogram = LatencyHistogram(bounds=(0.001,))
+        histogram.record(2.0)
+
+        snapshot = histogram.snapshot()
+        assert snapshot["buckets"] == {"overflow": 1}
+        assert snapshot["p99_ms"] == 2000.0
+
+    def test_concurrent_records_and_reset(self):
+        """Test that samples recorded from several threads are all counted."""
+        histogram = LatencyHistogram()
+        threads = [
+            threading.Thread(target=lambda: [histogram.record(0.002) for _ in range(1000)])
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histogram.snapshot()["count"] == 4000
+        histogram.reset()
+        assert histogram.snapshot()["count"] == 0
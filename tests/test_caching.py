@@ -0,0 +1,539 @@
+"""
+Unit tests for the caching module.
+"""
+
+import time
+import socket
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from langchain.docstore.document import Document
+
+from modernrag.caching import CacheConfig, QueryCache, StageCache
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    """Create QueryCache instances with a temporary cache directory."""
+    def factory(**overrides):
+        settings = {"cache_dir": str(tmp_path / "cache"), "enable_semantic_cache": False, **overrides}
+        with patch("modernrag.caching.get_cache_config", return_value=CacheConfig(**settings)):
+            return QueryCache()
+    return factory
+
+
+class TestQueryCache:
+    """Tests for the QueryCache class."""
+
+    @pytest.mark.asyncio
+    async def test_memory_round_trip(self, make_cache):
+        """Test that a cached result is returned for the same query and parameters."""
+        cache = make_cache(enable_disk_cache=False)
+        await cache.set("what is rag", {"response": "answer"}, k=4)
+
+        assert await cache.get("what is rag", k=4) == {"response": "answer"}
+        assert await cache.get("what is rag", k=5) is None
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded(self, make_cache):
+        """Test that the memory tier never grows past max_cache_size."""
+        cache = make_cache(enable_disk_cache=False, max_cache_size=10)
+        for i in range(50):
+            await cache.set(f"query {i}", i)
+
+        assert len(cache._memory_cache) == 10
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_miss(self, make_cache):
+        """Test that entries older than the TTL are not served."""
+        cache = make_cache(enable_disk_cache=False, cache_ttl=10)
+        await cache.set("query", "value")
+
+        with patch("modernrag.caching.time.time", return_value=time.time() + 60):
+            assert await cache.get("query") is None
+
+    def test_unknown_eviction_policy_raises(self, make_cache):
+        """Test that an unknown eviction policy is rejected."""
+        with pytest.raises(ValueError):
+            make_cache(cache_eviction_policy="random")
+
+
+class TestSemanticTier:
+    """Tests for paraphrase lookups through the semantic tier."""
+
+    @pytest.mark.asyncio
+    async def test_paraphrase_is_served_from_cache(self, make_cache, fake_embeddings):
+        """Test that a differently cased and punctuated query hits the cached answer."""
+        cache = make_cache(enable_disk_cache=False, enable_semantic_cache=True)
+        cache._embeddings = fake_embeddings
+        await cache.set("What is RAG?", {"response": "answer"}, index_name="docs", k=4)
+
+        assert await cache.get("what is rag", index_name="docs", k=4) == {"response": "answer"}
+        assert await cache.get("what is rag", index_name="docs", k=8) is None
+        assert await cache.get("how do embeddings work", index_name="docs", k=4) is None
+        assert cache.semantic_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_false_hit_removes_match(self, make_cache, fake_embeddings):
+        """Test that a reported false hit stops the paraphrase from matching."""
+        cache = make_cache(enable_disk_cache=False, enable_semantic_cache=True)
+        cache._embeddings = fake_embeddings
+        await cache.set("What is RAG?", "answer", index_name="docs")
+        await cache.get("what is rag", index_name="docs")
+
+        assert cache.report_false_hit("what is rag", index_name="docs")
+        assert await cache.get("what is rag", index_name="docs") is None
+        assert await cache.get("What is RAG?", index_name="docs") == "answer"
+        assert cache.semantic_stats()["false_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_index(self, make_cache, fake_embeddings):
+        """Test that invalidating an index only drops its semantic entries."""
+        cache = make_cache(enable_disk_cache=False, enable_semantic_cache=True)
+        cache._embeddings = fake_embeddings
+        await cache.set("What is RAG?", "docs answer", index_name="docs")
+        await cache.set("What is RAG?", "wiki answer", index_name="wiki")
+
+        assert cache.invalidate_semantic_index("docs") == 1
+        assert await cache.get("what is rag", index_name="docs") is None
+        assert await cache.get("what is rag", index_name="wiki") == "wiki answer"
+
+
+class TestRequestCoalescing:
+    """Tests for coalescing concurrent misses through get_or_compute."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self, make_cache):
+        """Test that identical concurrent queries run the computation once and cache it."""
+        cache = make_cache(enable_disk_cache=False)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"response": "answer"}
+
+        results = await asyncio.gather(*[
+            cache.get_or_compute("what is rag", compute, k=4) for _ in range(5)
+        ])
+
+        assert all(result["response"] == "answer" and result["cached"] is False for result in results)
+        assert len(calls) == 1
+        assert cache.coalesced_requests() == 4
+        assert await cache.get("what is rag", k=4) == {"response": "answer"}
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, make_cache):
+        """Test that an exception reaches the caller and leaves the cache empty."""
+        cache = make_cache(enable_disk_cache=False)
+
+        async def fail():
+            raise RuntimeError("provider down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("what is rag", fail)
+
+        assert await cache.get("what is rag") is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_recomputes_cached_result(self, make_cache):
+        """Test that refresh=True skips the cached result and replaces it."""
+        cache = make_cache(enable_disk_cache=False)
+        await cache.set("what is rag", "old answer")
+
+        async def compute():
+            return "new answer"
+
+        assert await cache.get_or_compute("what is rag", compute) == "old answer"
+        assert await cache.get_or_compute("what is rag", compute, refresh=True) == "new answer"
+        assert await cache.get("what is rag") == "new answer"
+
+    @pytest.mark.asyncio
+    async def test_expires_in_reports_remaining_ttl(self, make_cache):
+        """Test that expires_in reads the remaining TTL from either tier without loading values."""
+        cache = make_cache(cache_ttl=100)
+        await cache.set("what is rag", "answer", index_name="docs")
+
+        assert 99 < cache.expires_in("what is rag", index_name="docs") <= 100
+        cache._memory_cache.clear()
+        assert 99 < cache.expires_in("what is rag", index_name="docs") <= 100
+        assert cache.expires_in("what is rag", index_name="wiki") is None
+        cache.invalidate_index("docs")
+        assert cache.expires_in("what is rag", index_name="docs") is None
+
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_honours_byte_budget(self, make_cache):
+        """Test that large results are bounded by max_cache_bytes, not the entry count."""
+        cache = make_cache(enable_disk_cache=False, max_cache_bytes=200_000)
+        for i in range(20):
+            await cache.set(f"query {i}", {"response": "r" * 50_000})
+
+        stats = cache.memory_stats()
+        assert 0 < stats["resident_bytes"] <= 200_000
+        assert stats["entries"] < 20
+        assert stats["evictions"] == 20 - stats["entries"]
+
+
+class TestStaleResults:
+    """Tests for serving stale results between and past the soft and hard TTLs."""
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_while_refreshing(self, make_cache):
+        """Test that a result past the soft TTL is returned labelled and refreshed in the background."""
+        cache = make_cache(cache_ttl=0, cache_hard_ttl=60)
+        await cache.set("what is rag", {"response": "old answer"})
+        refreshed = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        async def compute():
+            loop.call_soon_threadsafe(refreshed.set)
+            return {"response": "new answer"}
+
+        result = await cache.get_or_compute("what is rag", compute)
+
+        assert result["response"] == "old answer"
+        assert result["stale"] is True and result["stale_reason"] == "revalidating"
+        assert result["stale_seconds"] >= 0
+        await asyncio.wait_for(refreshed.wait(), timeout=5)
+        deadline = time.time() + 5
+        while cache.refreshes_in_flight() and time.time() < deadline:
+            await asyncio.sleep(0.01)
+        assert (await cache._load_entry(cache._generate_key("what is rag"), "what is rag"))[0] == {"response": "new answer"}
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_served_on_error_past_hard_ttl(self, make_cache):
+        """Test that a result past the hard TTL is recomputed and only served if that fails."""
+        cache = make_cache(cache_ttl=0, cache_hard_ttl=0, cache_stale_if_error_ttl=60)
+        await cache.set("what is rag", {"response": "old answer"})
+
+        async def fail():
+            raise RuntimeError("provider down")
+
+        async def compute():
+            return {"response": "new answer"}
+
+        result = await cache.get_or_compute("what is rag", fail)
+        assert result["response"] == "old answer" and result["stale_reason"] == "error"
+        result = await cache.get_or_compute("what is rag", compute)
+        assert result["response"] == "new answer" and result["cached"] is False
+        assert cache.refreshes_in_flight() == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_past_retention(self, make_cache):
+        """Test that errors reach the caller once the stale result is no longer kept."""
+        cache = make_cache(cache_ttl=10, cache_hard_ttl=20, cache_stale_if_error_ttl=30)
+        await cache.set("what is rag", {"response": "old answer"})
+
+        async def fail():
+            raise RuntimeError("provider down")
+
+        with patch("modernrag.caching.time.time", return_value=time.time() + 60):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_compute("what is rag", fail)
+            assert cache.expires_in("what is rag") is None
+        assert cache.expires_in("what is rag") > 0
+
+
+class TestCacheStats:
+    """Tests for cache hit reporting and statistics."""
+
+    @pytest.mark.asyncio
+    async def test_hits_are_labelled_with_their_tier(self, make_cache):
+        """Test that cached results are marked cached with the tier that served them."""
+        cache = make_cache()
+
+        async def compute():
+            return {"response": "answer"}
+
+        computed = await cache.get_or_compute("what is rag", compute)
+        assert computed == {"response": "answer", "cached": False, "cache_tier": None, "cache_age": 0.0}
+
+        memory_hit = await cache.get_or_compute("what is rag", compute)
+        assert memory_hit["cached"] is True and memory_hit["cache_tier"] == "memory"
+        assert memory_hit["cache_age"] >= 0
+        assert "stale" not in memory_hit
+
+        with cache._memory_lock:
+            cache._memory_cache.clear()
+        shared_hit = await cache.get_or_compute("what is rag", compute)
+        assert shared_hit["cache_tier"] == "shared"
+        assert await cache.get("what is rag") == {"response": "answer"}
+
+    @pytest.mark.asyncio
+    async def test_stats_count_hits_misses_and_latency(self, make_cache):
+        """Test that stats report requests, hit rate, tier hits, latency and sizes."""
+        cache = make_cache()
+        await cache.set("what is rag", {"response": "answer"})
+
+        await cache.get("what is rag")
+        await cache.get("how do embeddings work")
+        await cache.get_many(["what is rag", "what is bm25"])
+
+        stats = cache.stats()
+        assert stats["requests"] == 4 and stats["hits"] == 2 and stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+        assert stats["tiers"]["memory"] == {"hits": 2, "misses": 2}
+        assert stats["tiers"]["shared"]["hits"] == 0 and stats["tiers"]["shared"]["misses"] == 2
+        assert stats["tiers"]["shared"]["backend"] == "sqlite"
+        assert stats["latency"]["lookup"]["count"] == 2
+        assert stats["latency"]["load"]["count"] >= 1
+        assert stats["resident_bytes"] > 0 and stats["disk_bytes"] > 0
+
+        cache.reset_stats()
+        assert cache.stats()["requests"] == 0
+        assert cache.stats()["latency"]["lookup"]["count"] == 0
+
+    @pytest.mark.asyncio
+    async def test_stats_count_stale_serves_and_expirations(self, make_cache):
+        """Test that stale serves and shared tier expirations are counted."""
+        cache = make_cache(cache_ttl=0, cache_hard_ttl=0, cache_stale_if_error_ttl=60)
+        await cache.set("what is rag", {"response": "old answer"})
+
+        async def fail():
+            raise RuntimeError("provider down")
+
+        await cache.get_or_compute("what is rag", fail)
+        assert cache.stats()["stale_on_error"] == 1
+
+        expired = make_cache(cache_ttl=0, cache_hard_ttl=0, cache_stale_if_error_ttl=0)
+        await expired.set("what is rag", {"response": "answer"})
+        time.sleep(0.01)
+        expired.sweep_expired()
+        assert expired.stats()["expirations"]["shared"] == 1
+
+
+class TestTagInvalidation:
+    """Tests for invalidating cached results when their index changes."""
+
+    @pytest.mark.asyncio
+    async def test_index_write_invalidates_only_dependents(self, make_cache):
+        """Test that invalidating an index drops its entries and keeps those of other indexes."""
+        cache = make_cache(enable_disk_cache=False)
+        await cache.set("what is rag", "docs answer", index_name="docs")
+        await cache.set("what is rag", "wiki answer", index_name="wiki")
+
+        cache.invalidate_index("docs")
+
+        assert await cache.get("what is rag", index_name="docs") is None
+        assert await cache.get("what is rag", index_name="wiki") == "wiki answer"
+        await cache.set("what is rag", "new docs answer", index_name="docs")
+        assert await cache.get("what is rag", index_name="docs") == "new docs answer"
+
+    @pytest.mark.asyncio
+    async def test_invalidation_persists_on_disk(self, make_cache):
+        """Test that a new instance does not serve disk entries invalidated by an earlier one."""
+        first = make_cache()
+        await first.set("what is rag", "answer", index_name="docs")
+        first.invalidate_index("docs")
+
+        second = make_cache()
+        assert await second.get("what is rag", index_name="docs") is None
+        assert len(second._backend) == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_invalidations_get_distinct_versions(self, make_cache):
+        """Test that two processes invalidating the same index never store the same version."""
+        first = make_cache(tag_sync_interval=3600)
+        second = make_cache(tag_sync_interval=3600)
+
+        assert first.invalidate_index("docs") == 1
+        await first.set("what is rag", "answer between writes", index_name="docs")
+        # The second process has not synced, but its bump still lands above the first one
+        assert second.invalidate_index("docs") == 2
+
+        first._sync_tag_versions()
+        assert await first.get("what is rag", index_name="docs") is None
+
+    @pytest.mark.asyncio
+    async def test_write_during_compute_invalidates_result(self, make_cache):
+        """Test that a result computed while its index changed is not served afterwards."""
+        cache = make_cache(enable_disk_cache=False)
+
+        async def compute():
+            cache.invalidate_index("docs")
+            return "answer from old documents"
+
+        assert await cache.get_or_compute("what is rag", compute, index_name="docs") == "answer from old documents"
+        assert await cache.get("what is rag", index_name="docs") is None
+
+
+class TestStageCache:
+    """Tests for the per-stage cache."""
+
+    def test_key_depends_on_chunks_order_model_and_prompt(self):
+        """Test that stage keys change with any input of the stage but not with query formatting."""
+        with patch("modernrag.caching.get_cache_config", return_value=CacheConfig()):
+            cache = StageCache()
+        docs = [Document(page_content="first"), Document(page_content="second")]
+        key = cache.make_key("rerank", "What is RAG?", docs, "gpt-4o", 1)
+
+        assert cache.make_key("rerank", "what is rag", docs, "gpt-4o", 1) == key
+        assert cache.make_key("rerank", "What is RAG?", docs[::-1], "gpt-4o", 1) != key
+        assert cache.make_key("rerank", "What is RAG?", docs, "gpt-4o-mini", 1) != key
+        assert cache.make_key("rerank", "What is RAG?", docs, "gpt-4o", 2) != key
+        assert cache.make_key("augment", "What is RAG?", docs, "gpt-4o", 1) != key
+        assert cache.make_key("rerank", "What is RAG?", [Document(page_content="first!"), docs[1]], "gpt-4o", 1) != key
+
+    def test_key_depends_on_cited_metadata(self):
+        """Test that chunks with the same text but another source or page get their own keys."""
+        with patch("modernrag.caching.get_cache_config", return_value=CacheConfig()):
+            cache = StageCache()
+
+        def key(**metadata):
+            return cache.make_key("augment", "q", [Document(page_content="same", metadata=metadata)], "gpt-4o", 1)
+
+        assert key(source="a.pdf", page=1) != key(source="b.pdf", page=1)
+        assert key(source="a.pdf", page=1) != key(source="a.pdf", page=2)
+        assert key(source="a.pdf", page=1, author="x") == key(source="a.pdf", page=1, author="y")
+
+    def test_entries_expire_and_stats_are_per_stage(self):
+        """Test TTL expiry and per-stage hit rates."""
+        with patch("modernrag.caching.get_cache_config", return_value=CacheConfig(cache_ttl=10)):
+            cache = StageCache()
+        cache.set("augment", "key", "context")
+
+        assert cache.get("augment", "key") == "context"
+        with patch("modernrag.caching.time.time", return_value=time.time() + 60):
+            assert cache.get("augment", "key") is None
+        assert cache.get("rerank", "missing") is None
+        assert cache.stats() == {
+            "augment": {"hits": 1, "misses": 1, "hit_rate": 0.5},
+            "rerank": {"hits": 0, "misses": 1, "hit_rate": 0.0},
+        }
+
+    def test_concurrent_access_keeps_cache_consistent(self):
+        """Test that gets and sets from several threads neither raise nor overfill the cache."""
+        with patch("modernrag.caching.get_cache_config", return_value=CacheConfig(stage_cache_size=64)):
+            cache = StageCache()
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(2000):
+                    key = f"key-{(i * 7 + offset) % 300}"
+                    if cache.get("rerank", key) is None:
+                        cache.set("rerank", key, i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(cache._cache) <= 64
+        stats = cache.stats()["rerank"]
+        assert stats["hits"] + stats["misses"] == 16000
+
+
+class TestSharedBackends:
+    """Tests for sharing the second tier between QueryCache instances."""
+
+    @pytest.mark.asyncio
+    async def test_results_and_invalidations_are_shared_over_redis(self, make_cache, resp_server):
+        """Test that one process's results and index invalidations reach another."""
+        settings = {"cache_backend": "redis", "cache_redis_url": resp_server.url, "tag_sync_interval": 0.0}
+        first = make_cache(**settings)
+        second = make_cache(**settings)
+        await first.set("what is rag", {"response": "answer"}, index_name="docs")
+
+        assert await second.get("what is rag", index_name="docs") == {"response": "answer"}
+        first.invalidate_index("docs")
+        assert await second.get("what is rag", index_name="docs") is None
+        await second.set("what is rag", {"response": "new answer"}, index_name="docs")
+        assert second.current_tags(index_name="docs") == {"index:docs": 1}
+        assert await first.get("what is rag", index_name="docs") == {"response": "new answer"}
+
+    @pytest.mark.asyncio
+    async def test_index_version_follows_other_processes(self, make_cache, resp_server):
+        """Test that an index invalidated in one process advances its version in another."""
+        settings = {"cache_backend": "redis", "cache_redis_url": resp_server.url, "tag_sync_interval": 0.0}
+        first = make_cache(**settings)
+        second = make_cache(**settings)
+
+        first.invalidate_index("docs")
+
+        assert await first.index_version("docs") == 1
+        assert await second.index_version("docs") == 1
+        assert await second.index_version("other") == 0
+
+    @pytest.mark.asyncio
+    async def test_get_many_reads_misses_in_one_batch(self, make_cache, resp_server):
+        """Test that a batch lookup serves memory hits and fetches the rest with one backend call."""
+        cache = make_cache(cache_backend="redis", cache_redis_url=resp_server.url)
+        for i in range(4):
+            await cache.set(f"query {i}", f"answer {i}", k=4)
+        cache._memory_cache.clear()
+        await cache.get("query 0", k=4)
+
+        with patch.object(cache._backend, "get_many", wraps=cache._backend.get_many) as get_many:
+            results = await cache.get_many(["query 0", "query 1", "missing", "query 3"], k=4)
+
+        assert results == ["answer 0", "answer 1", None, "answer 3"]
+        get_many.assert_called_once()
+        assert len(get_many.call_args[0][0]) == 3
+
+    @pytest.mark.asyncio
+    async def test_unreachable_backend_is_a_miss(self, make_cache):
+        """Test that a cache whose shared tier is down can still be created and used."""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        cache = make_cache(cache_backend="redis", cache_redis_url=f"redis://127.0.0.1:{port}/0")
+
+        assert cache.current_tags(index_name="docs") == {"index:docs": 0}
+        assert cache.expires_in("what is rag", index_name="docs") is None
+        assert await cache.get("what is rag", index_name="docs") is None
+
+    def test_unknown_backend_raises(self, make_cache):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            make_cache(cache_backend="memcached")
+
+
+class TestDiskTier:
+    """Tests for the SQLite disk tier of the query cache."""
+
+    @pytest.mark.asyncio
+    async def test_results_persist_across_instances(self, make_cache):
+        """Test that a new cache instance reads results written by an earlier one."""
+        first = make_cache()
+        await first.set("what is rag", {"response": "answer"}, k=4)
+
+        second = make_cache()
+        assert await second.get("what is rag", k=4) == {"response": "answer"}
+
+    @pytest.mark.asyncio
+    async def test_clear_expired_removes_old_entries(self, make_cache):
+        """Test that clear_expired deletes entries past the TTL and stale retention."""
+        cache = make_cache(cache_ttl=10, cache_hard_ttl=20, cache_stale_if_error_ttl=30, enable_memory_cache=False)
+        await cache.set("query", "value")
+
+        with patch("modernrag.disk_cache.time.time", return_value=time.time() + 60):
+            await cache.clear_expired()
+
+        assert len(cache._backend) == 0
+
+    def test_background_expiry_removes_old_entries(self, make_cache):
+        """Test that the background thread deletes expired disk entries in batches."""
+        cache = make_cache(enable_memory_cache=False, expiry_sweep_interval=0.01, expiry_sweep_batch=2)
+        now = time.time()
+        for i in range(5):
+            cache._backend.set(f"key {i}", i, now - 120, now - 60)
+        cache._backend.set("fresh", "value", now, now + 3600)
+
+        cache.start_background_expiry()
+        try:
+            deadline = time.time() + 5
+            while len(cache._backend) > 1 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            cache.stop_background_expiry()
+
+        assert len(cache._backend) == 1
+        assert cache._backend.get("fresh") == ("value", now, {})
@@ -0,0 +1,62 @@
+"""
+Unit tests for the chunking module.
+"""
+
+from langchain.docstore.document import Document
+
+from modernrag.chunking import link_chunks, plan_windows, merge_chunks
+
+
+def _chunk(parent_id, index, text="", start=None):
+    metadata = {"parent_id": parent_id, "chunk_index": index}
+    if start is not None:
+        metadata["start_index"] = start
+    return Document(page_content=text, metadata=metadata)
+
+
+class TestChunkLinks:
+    """Tests for chunk-to-parent links."""
+
+    def test_link_chunks_assigns_positional_ids(self):
+        """Test that chunks get parent metadata and deterministic IDs."""
+        chunks = [Document(page_content="a"), Document(page_content="b")]
+        ids = link_chunks("doc-1", chunks)
+
+        assert ids == ["doc-1#0", "doc-1#1"]
+        assert chunks[1].metadata == {"parent_id": "doc-1", "chunk_index": 1}
+        assert chunks[1].id == "doc-1#1"
+
+
+class TestPlanWindows:
+    """Tests for window expansion and merging."""
+
+    def test_adjacent_hits_merge_into_one_window(self):
+        """Test that overlapping windows of the same parent are merged."""
+        hits = [(_chunk("p", 5), 0.9), (_chunk("p", 2), 0.7), (_chunk("q", 0), 0.8)]
+        windows = plan_windows(hits, window=1)
+
+        assert windows == [("p", 1, 6, 0.9), ("q", 0, 1, 0.8)]
+
+    def test_distant_hits_stay_separate(self):
+        """Test that windows with a gap between them are kept apart."""
+        hits = [(_chunk("p", 0), 0.5), (_chunk("p", 9), 0.6)]
+        assert plan_windows(hits, window=1) == [("p", 8, 10, 0.6), ("p", 0, 1, 0.5)]
+
+
+class TestMergeChunks:
+    """Tests for stitching chunks back together."""
+
+    def test_overlap_is_removed_using_start_offsets(self):
+        """Test that the overlapping prefix of each chunk is dropped."""
+        text = "The quick brown fox jumps over the lazy dog"
+        chunks = [
+            _chunk("p", 0, text[0:19], start=0),
+            _chunk("p", 1, text[16:35], start=16),
+            _chunk("p", 2, text[31:], start=31),
+        ]
+        assert merge_chunks(chunks) == text
+
+    def test_gaps_are_joined_with_newline(self):
+        """Test that non-contiguous chunks are separated."""
+        chunks = [_chunk("p", 0, "first", start=0), _chunk("p", 2, "third", start=50)]
+        assert merge_chunks(chunks) == "first\nthird"
@@ -0,0 +1,79 @@
+"""
+Unit tests for the dimension_reduction module.
+"""
+
+import numpy as np
+import pytest
+
+from modernrag.dimension_reduction import (
+    DimensionReducer,
+    TruncationReducer,
+    PCAReducer,
+    create_reducer,
+    encode_vector,
+    decode_vector
+)
+
+
+class TestTruncationReducer:
+    """Tests for the TruncationReducer class."""
+
+    def test_keeps_leading_dimensions_normalized(self):
+        """Test that vectors are cut to the leading dimensions and renormalized."""
+        reduced = TruncationReducer(2).transform([[3.0, 4.0, 10.0]])
+        assert np.allclose(reduced, [[0.6, 0.8]])
+
+    def test_rejects_short_vectors(self):
+        """Test that vectors shorter than the target dimension are rejected."""
+        with pytest.raises(ValueError):
+            TruncationReducer(4).transform([[1.0, 0.0]])
+
+
+class TestPCAReducer:
+    """Tests for the PCAReducer class."""
+
+    def test_fit_preserves_dominant_direction(self):
+        """Test that vectors along the main axis of variance stay apart after projection."""
+        rng = np.random.default_rng(0)
+        samples = np.outer(rng.normal(size=50), [1.0, 1.0, 0.0, 0.0]) + rng.normal(scale=0.01, size=(50, 4))
+        reducer = PCAReducer(1).fit(samples)
+
+        reduced = reducer.transform([[1.0, 1.0, 0.0, 0.0], [-1.0, -1.0, 0.0, 0.0]])
+
+        assert reduced.shape == (2, 1)
+        assert reduced[0, 0] == pytest.approx(-reduced[1, 0])
+
+    def test_fit_requires_enough_samples(self):
+        """Test that fitting with fewer samples than dimensions fails."""
+        with pytest.raises(ValueError):
+            PCAReducer(3).fit([[1.0, 0.0, 0.0, 0.0]])
+
+    def test_state_round_trip(self):
+        """Test that a projection restored from its state gives the same results."""
+        samples = np.random.default_rng(1).normal(size=(10, 6))
+        reducer = PCAReducer(3).fit(samples)
+
+        loaded = PCAReducer(3)
+        assert loaded.load_state(reducer.state())
+        assert np.allclose(loaded.transform(samples), reducer.transform(samples))
+        assert not PCAReducer(2).load_state(reducer.state())
+        assert PCAReducer(3).state() == {}
+
+
+def test_vector_encoding_round_trip():
+    """Test that vectors survive encoding to a metadata string."""
+    vector = np.random.default_rng(2).normal(size=7).astype(np.float32)
+    assert np.array_equal(decode_vector(encode_vector(vector)), vector)
+
+
+def test_create_reducer_rejects_unknown_method():
+    """Test that an unknown reduction method raises."""
+    assert isinstance(create_reducer("truncate", 8), TruncationReducer)
+    with pytest.raises(ValueError):
+        create_reducer("random", 8)
+
+
+def test_base_reducer_is_abstract():
+    """Test that the base class cannot be used without a transform."""
+    with pytest.raises(TypeError):
+        DimensionReducer(8)
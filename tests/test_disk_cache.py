@@ -0,0 +1,152 @@
+"""
+Unit tests for the disk_cache module.
+"""
+
+import time
+import sqlite3
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from langchain.docstore.document import Document
+
+from modernrag.disk_cache import SQLiteDiskCache
+
+
+class TestSQLiteDiskCache:
+    """Tests for the SQLiteDiskCache class."""
+
+    def test_round_trip_and_reopen(self, tmp_path):
+        """Test that entries survive closing and reopening the database."""
+        path = tmp_path / "cache.sqlite3"
+        now = time.time()
+        cache = SQLiteDiskCache(path)
+        value = {"response": "answer", "retrieved_docs": [(Document(page_content="text"), 0.9)]}
+        cache.set("key", value, now, now + 60)
+        cache.close()
+
+        reopened = SQLiteDiskCache(path)
+        loaded, created, tags = reopened.get("key")
+
+        assert loaded == value
+        assert created == now
+        assert len(reopened) == 1
+        assert list(tmp_path.iterdir())[0].name.startswith("cache.sqlite3")
+
+    def test_tag_bumps_are_atomic_across_connections(self, tmp_path):
+        """Test that concurrent bumps from two processes' connections get distinct versions."""
+        first = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        second = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            versions = list(pool.map(
+                lambda i: (first if i % 2 else second).bump_tag_version("index:docs"), range(40)
+            ))
+
+        assert sorted(versions) == list(range(1, 41))
+        first.set_tag_version("index:docs", 5)
+        assert second.get_tag_versions() == {"index:docs": 40}
+
+    def test_get_many_keeps_key_order(self, tmp_path):
+        """Test that a multi-get returns entries in the order asked, with None for misses."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        cache.set("a", 1, 1.0, 2.0)
+        cache.set("b", 2, 1.0, 2.0, {"index:docs": 3})
+
+        assert cache.get_many(["b", "missing", "a"]) == [(2, 1.0, {"index:docs": 3}), None, (1, 1.0, {})]
+        assert cache.get_many([]) == []
+
+    def test_set_replaces_existing_entry(self, tmp_path):
+        """Test that writing an existing key replaces it."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        cache.set("key", "old", 1.0, 2.0)
+        cache.set("key", "new", 3.0, 4.0)
+
+        assert cache.get("key") == ("new", 3.0, {})
+        assert len(cache) == 1
+
+    def test_delete_expired_uses_expiry_time(self, tmp_path):
+        """Test that only entries past their expiry are deleted."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        cache.set("old", "a", 0.0, 10.0)
+        cache.set("fresh", "b", 0.0, 100.0)
+
+        assert cache.delete_expired(now=50.0) == 1
+        cache.compact()
+        assert cache.get("old") is None
+        assert cache.get("fresh") == ("b", 0.0, {})
+
+    def test_delete_expired_skips_rewritten_entries(self, tmp_path):
+        """Test that an entry rewritten with a later expiry is not deleted."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        cache.set("key", "old", 0.0, 10.0)
+        cache.set("key", "new", 20.0, 100.0)
+
+        assert cache.delete_expired(now=50.0) == 0
+        assert cache.get("key") == ("new", 20.0, {})
+
+    def test_failed_sweep_rolls_back_and_is_retried(self, tmp_path):
+        """Test that a sweep failing on a locked database leaves the connection usable and retries later."""
+        path = tmp_path / "cache.sqlite3"
+        cache = SQLiteDiskCache(path)
+        cache.set("old", "a", 0.0, 10.0)
+        cache._connection.execute("PRAGMA busy_timeout=0")
+        other = sqlite3.connect(str(path), isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+
+        with pytest.raises(sqlite3.OperationalError):
+            cache.delete_expired(now=50.0)
+        assert not cache._connection.in_transaction
+
+        other.execute("ROLLBACK")
+        other.close()
+        cache.set("fresh", "b", 0.0, 100.0)
+        assert cache.delete_expired(now=50.0) == 1
+        assert cache.get("old") is None
+
+    def test_delete_expired_honours_limit(self, tmp_path):
+        """Test that incremental sweeps delete at most the limit, oldest first."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        for i in range(5):
+            cache.set(f"key {i}", i, 0.0, float(i))
+
+        assert cache.delete_expired(now=50.0, limit=2) == 2
+        assert cache.get("key 0") is None
+        assert cache.get("key 2") == (2, 0.0, {})
+        assert cache.delete_expired(now=50.0, limit=10) == 3
+        assert len(cache) == 0
+
+    def test_entries_expire_after_reopen_and_across_connections(self, tmp_path):
+        """Test that entries written before reopening or by another process still expire."""
+        path = tmp_path / "cache.sqlite3"
+        cache = SQLiteDiskCache(path)
+        cache.set("old", "a", 0.0, 10.0)
+        cache.set("fresh", "b", 0.0, 100.0)
+        cache.close()
+
+        reopened = SQLiteDiskCache(path)
+        other = SQLiteDiskCache(path)
+        other.set("other old", "c", 0.0, 20.0)
+        assert reopened.delete_expired(now=50.0) == 2
+        assert len(reopened) == 1
+        assert other.get("other old") is None
+
+    def test_clear_and_delete(self, tmp_path):
+        """Test deleting single entries and clearing the cache."""
+        cache = SQLiteDiskCache(tmp_path / "cache.sqlite3")
+        cache.set("a", 1, 0.0, 10.0)
+        cache.set("b", 2, 0.0, 10.0)
+
+        assert cache.delete("a")
+        assert not cache.delete("a")
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_legacy_pickle_files_are_removed_once(self, tmp_path):
+        """Test that pickles of the old disk cache are deleted when the database is created."""
+        (tmp_path / "abc123.pickle").write_bytes(b"old entry")
+        SQLiteDiskCache(tmp_path / "cache.sqlite3").close()
+        assert not list(tmp_path.glob("*.pickle"))
+
+        # Files written after the migration are not touched on reopen
+        (tmp_path / "later.pickle").write_bytes(b"unrelated")
+        SQLiteDiskCache(tmp_path / "cache.sqlite3").close()
+        assert (tmp_path / "later.pickle").exists()
@@ -178,3 +178,70 @@ async def test_retrieve_augment_generate(sample_documents, mock_llm_response):
         mock_augmentation_manager.rerank_documents.assert_called_once()
         mock_augmentation_manager.augment_documents.assert_called_once()
         mock_generate.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stage_cache_skips_repeated_llm_calls(sample_documents, mock_llm_response):
+    """Test that rerank and augment outputs are reused for the same query and chunks."""
+    from modernrag.caching import StageCache
+
+    with patch('modernrag.generation.get_llm') as mock_get_llm:
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = mock_llm_response
+        mock_get_llm.return_value = mock_llm
+        augmentation_manager = AugmentationManager()
+        augmentation_manager.stage_cache = StageCache()
+
+        mock_llm_response.content = "2,1,3"
+        first = await augmentation_manager.rerank_documents("What is RAG?", sample_documents, top_k=2)
+        # Another top_k and a differently punctuated query reuse the cached ranking
+        second = await augmentation_manager.rerank_documents("what is rag", sample_documents, top_k=1)
+
+        mock_llm_response.content = "Synthesized information."
+        await augmentation_manager.augment_documents("What is RAG?", first)
+        context = await augmentation_manager.augment_documents("What is RAG?", first)
+        await augmentation_manager.augment_documents("What is RAG?", first[::-1])
+
+        assert second == first[:1]
+        assert context == "Synthesized information."
+        assert mock_llm.invoke.call_count == 3
+        stats = augmentation_manager.stage_cache.stats()
+        assert stats["rerank"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+        assert stats["augment"]["hits"] == 1
+        assert stats["augment"]["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stage_cache_ignores_failed_stages(sample_documents):
+    """Test that fallback outputs after an LLM error are not cached."""
+    from modernrag.caching import StageCache
+
+    with patch('modernrag.generation.get_llm') as mock_get_llm:
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = RuntimeError("rate limited")
+        mock_get_llm.return_value = mock_llm
+        augmentation_manager = AugmentationManager()
+        augmentation_manager.stage_cache = StageCache()
+
+        await augmentation_manager.rerank_documents("query", sample_documents, top_k=2)
+        await augmentation_manager.rerank_documents("query", sample_documents, top_k=2)
+
+        assert mock_llm.invoke.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retrieve_augment_generate_records_cached_queries():
+    """Test that successful cached queries are logged for warm-up and failures are not."""
+    answer = {"query": "test query", "response": "answer", "route": "rag"}
+    failure = {"query": "test query", "error": "provider down", "response": "sorry"}
+    with patch('modernrag.generation.generation_manager.retrieve_augment_generate', new_callable=AsyncMock) as mock_rag, \
+         patch('modernrag.generation.record_query', new_callable=AsyncMock) as mock_record:
+        mock_rag.return_value = answer
+        assert await retrieve_augment_generate("test query", index_name="test-index", k=3) == answer
+        await retrieve_augment_generate("test query", use_cache=False)
+        mock_rag.return_value = failure
+        await retrieve_augment_generate("test query")
+
+    mock_record.assert_awaited_once_with(
+        "test query", index_name="test-index", k=3, score_threshold=0.4, rerank_top_k=3
+    )
@@ -0,0 +1,76 @@
+"""
+Unit tests for the index_registry module.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from modernrag.index_registry import IndexRegistry
+
+
+@pytest.fixture
+def mock_client():
+    """Create a mock Pinecone client."""
+    client = MagicMock()
+    client.has_index.return_value = True
+    client.describe_index.return_value = MagicMock(dimension=1536)
+    client.Index.return_value.describe_index_stats.return_value = {"total_vector_count": 42}
+    return client
+
+
+class TestIndexRegistry:
+    """Tests for the IndexRegistry class."""
+
+    @pytest.mark.asyncio
+    async def test_existence_is_cached_within_ttl(self, mock_client):
+        """Test that repeated checks make a single control-plane call."""
+        registry = IndexRegistry(mock_client, ttl=60)
+
+        assert await registry.exists("test-index") is True
+        assert await registry.exists("test-index") is True
+
+        mock_client.has_index.assert_called_once_with("test-index")
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_rechecked(self, mock_client):
+        """Test that an entry older than the TTL triggers a new check."""
+        registry = IndexRegistry(mock_client, ttl=0)
+
+        await registry.exists("test-index")
+        registry.get("test-index").checked_at -= 1
+        await registry.exists("test-index")
+
+        assert mock_client.has_index.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_checks_are_deduplicated(self, mock_client):
+        """Test that simultaneous checks for one index share a single call."""
+        release = threading.Event()
+
+        def slow_has_index(name):
+            release.wait(timeout=1)
+            return True
+
+        mock_client.has_index.side_effect = slow_has_index
+        registry = IndexRegistry(mock_client, ttl=60)
+
+        tasks = [asyncio.create_task(registry.exists("test-index")) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [True] * 5
+        mock_client.has_index.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_prewarm_records_dimension_and_stats(self, mock_client):
+        """Test that prewarming loads full metadata for each index."""
+        mock_client.has_index.side_effect = lambda name: name != "missing"
+        registry = IndexRegistry(mock_client)
+
+        entries = await registry.prewarm(["test-index", "missing"])
+
+        assert entries["test-index"].dimension == 1536
+        assert entries["test-index"].stats == {"total_vector_count": 42}
+        assert entries["missing"].exists is False
@@ -0,0 +1,72 @@
+"""
+Unit tests for the lexical_index module.
+"""
+
+from langchain.docstore.document import Document
+
+from modernrag.lexical_index import (
+    InvertedIndex,
+    tokenize,
+    encode_varint,
+    decode_postings
+)
+
+
+class TestPostingEncoding:
+    """Tests for posting list compression."""
+
+    def test_round_trip(self):
+        """Test that delta-encoded postings decode to the original pairs."""
+        buffer = bytearray()
+        last = 0
+        for doc_number, freq in [(0, 1), (5, 3), (300, 1), (70000, 200)]:
+            encode_varint(doc_number - last, buffer)
+            encode_varint(freq, buffer)
+            last = doc_number
+
+        assert list(decode_postings(bytes(buffer))) == [(0, 1), (5, 3), (300, 1), (70000, 200)]
+
+    def test_tokenize_keeps_identifiers(self):
+        """Test that dotted and dashed identifiers stay whole."""
+        assert tokenize("Use gpt-4o with SDK v1.2.3!") == ["use", "gpt-4o", "with", "sdk", "v1.2.3"]
+
+
+class TestInvertedIndex:
+    """Tests for the InvertedIndex class."""
+
+    def test_rare_identifier_ranks_first(self):
+        """Test that BM25 favours the document containing a rare exact term."""
+        index = InvertedIndex("test-index")
+        docs = [
+            Document(page_content="error handling in the retrieval pipeline"),
+            Document(page_content="the ERR_4021 error is raised by the pipeline"),
+            Document(page_content="the pipeline retries the request on error"),
+        ]
+        index.add(["a", "b", "c"], docs)
+
+        results = index.search("what does ERR_4021 mean", k=2)
+
+        assert results[0][0] is docs[1]
+        assert len(results) == 1
+
+    def test_replacing_a_document_drops_old_terms(self):
+        """Test that re-adding an ID removes the previous version from results."""
+        index = InvertedIndex("test-index")
+        index.add(["a"], [Document(page_content="alpha beta")])
+        index.add(["a"], [Document(page_content="gamma delta")])
+
+        assert index.search("alpha") == []
+        assert index.search("gamma")[0][0].page_content == "gamma delta"
+        assert len(index) == 1
+
+    def test_filter_restricts_candidates(self):
+        """Test that a metadata filter excludes non-matching documents before scoring."""
+        index = InvertedIndex("test-index")
+        index.add(["a", "b"], [
+            Document(page_content="pinecone filters", metadata={"source": "a.pdf"}),
+            Document(page_content="pinecone filters", metadata={"source": "b.pdf"}),
+        ])
+
+        results = index.search("pinecone", k=2, filter={"source": "b.pdf"})
+
+        assert [doc.metadata["source"] for doc, _ in results] == ["b.pdf"]
@@ -0,0 +1,114 @@
+"""
+Unit tests for the llm_cache module.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from modernrag.caching import CacheConfig
+from modernrag.llm_cache import CachingLLM, LLMResponseCache
+
+
+@pytest.fixture
+def make_response_cache(tmp_path):
+    """Create LLMResponseCache instances with a temporary cache directory."""
+    def factory(**overrides):
+        settings = {"cache_dir": str(tmp_path / "cache"), **overrides}
+        with patch("modernrag.llm_cache.get_cache_config", return_value=CacheConfig(**settings)):
+            return LLMResponseCache()
+    return factory
+
+
+def make_llm(temperature=0.0, model_name="gpt-4o"):
+    """Create a fake chat model that reports token usage."""
+    llm = MagicMock()
+    llm.temperature = temperature
+    llm.model_name = model_name
+    llm.max_tokens = 256
+    llm.invoke.side_effect = lambda messages, **kwargs: AIMessage(
+        content=f"answer to {messages[-1].content}",
+        usage_metadata={"input_tokens": 30, "output_tokens": 12, "total_tokens": 42}
+    )
+    return llm
+
+
+MESSAGES = [SystemMessage(content="Be brief."), HumanMessage(content="What is RAG?")]
+
+
+class TestCachingLLM:
+    """Tests for the CachingLLM wrapper."""
+
+    def test_repeated_deterministic_call_is_served_from_cache(self, make_response_cache):
+        """Test that an identical call at temperature 0 skips the model and counts tokens saved."""
+        llm = make_llm()
+        cached = CachingLLM(llm, make_response_cache())
+
+        first = cached.invoke(MESSAGES)
+        second = cached.invoke(list(MESSAGES))
+
+        assert second.content == first.content == "answer to What is RAG?"
+        assert llm.invoke.call_count == 1
+        assert cached.cache.stats() == {
+            "hits": 1, "misses": 1, "hit_rate": 0.5, "bypassed": 0, "tokens_saved": 42
+        }
+
+    def test_key_covers_model_parameters_and_messages(self, make_response_cache):
+        """Test that calls differing in model or messages do not share entries."""
+        cache = make_response_cache()
+        llm = make_llm()
+        key = CachingLLM(llm, cache).make_key(MESSAGES)
+
+        assert CachingLLM(make_llm(model_name="gpt-4o-mini"), cache).make_key(MESSAGES) != key
+        assert CachingLLM(llm, cache).make_key(MESSAGES[1:]) != key
+        llm.max_tokens = 512
+        assert CachingLLM(llm, cache).make_key(MESSAGES) != key
+
+    def test_sampled_calls_bypass_cache(self, make_response_cache):
+        """Test that calls above the deterministic temperature always reach the model."""
+        llm = make_llm(temperature=0.7)
+        cached = CachingLLM(llm, make_response_cache())
+
+        cached.invoke(MESSAGES)
+        cached.invoke(MESSAGES)
+
+        assert llm.invoke.call_count == 2
+        assert cached.cache.stats()["bypassed"] == 2
+
+    def test_responses_persist_on_disk(self, make_response_cache):
+        """Test that a new cache instance serves responses stored by an earlier one."""
+        CachingLLM(make_llm(), make_response_cache()).invoke(MESSAGES)
+        llm = make_llm()
+
+        response = CachingLLM(llm, make_response_cache()).invoke(MESSAGES)
+
+        assert response.content == "answer to What is RAG?"
+        assert not llm.invoke.called
+
+    def test_responses_are_shared_over_the_configured_backend(self, make_response_cache, resp_server):
+        """Test that a Redis backend shares responses between hosts without mixing them with query results."""
+        settings = {"cache_backend": "redis", "cache_redis_url": resp_server.url}
+        CachingLLM(make_llm(), make_response_cache(**settings)).invoke(MESSAGES)
+        llm = make_llm()
+        cache = make_response_cache(**settings, enable_memory_cache=False)
+
+        response = CachingLLM(llm, cache).invoke(MESSAGES)
+
+        assert response.content == "answer to What is RAG?"
+        assert not llm.invoke.called
+        assert cache._backend.prefix == "modernrag:llm:"
+        assert all(key.startswith(b"modernrag:llm:") for key in resp_server.store.strings)
+
+    def test_memory_tier_has_its_own_budget(self, make_response_cache):
+        """Test that cached responses do not draw on the query cache's memory budget."""
+        cache = make_response_cache(llm_cache_size=10, llm_cache_bytes=4096)
+
+        assert cache._memory_cache.max_entries == 10
+        assert cache._memory_cache.max_bytes == 4096
+
+    def test_forwards_other_attributes(self, make_response_cache):
+        """Test that the wrapper exposes the wrapped model's attributes."""
+        cached = CachingLLM(make_llm(), make_response_cache())
+
+        assert cached.model_name == "gpt-4o"
+        assert cached.temperature == 0.0
@@ -0,0 +1,77 @@
+"""
+Unit tests for the local_index module.
+"""
+
+import numpy as np
+import pytest
+from langchain.docstore.document import Document
+
+from modernrag.local_index import LocalVectorIndex, top_k_indices
+
+
+class TestTopKIndices:
+    """Tests for the top_k_indices helper."""
+
+    def test_rows_sorted_by_descending_score(self):
+        """Test that each row returns its best columns in order."""
+        scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.8, 0.2, 0.3, 0.1]])
+        result = top_k_indices(scores, 2)
+        assert result.tolist() == [[1, 3], [0, 2]]
+
+    def test_k_larger_than_columns(self):
+        """Test that k is clamped to the number of columns."""
+        scores = np.array([[0.2, 0.4]])
+        assert top_k_indices(scores, 5).tolist() == [[1, 0]]
+
+
+class TestLocalVectorIndex:
+    """Tests for the LocalVectorIndex class."""
+
+    def test_search_many_returns_results_in_input_order(self, sample_documents):
+        """Test that a batched search scores each query independently."""
+        index = LocalVectorIndex("test-index")
+        index.add(
+            ["a", "b", "c"],
+            [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+            sample_documents
+        )
+
+        results = index.search([[0.0, 0.0, 1.0], [1.0, 0.1, 0.0]], k=1)
+
+        assert results[0][0][0] is sample_documents[2]
+        assert results[1][0][0] is sample_documents[0]
+        assert results[0][0][1] == pytest.approx(1.0)
+
+    def test_upsert_replaces_existing_id_and_grows(self):
+        """Test that re-adding an ID replaces it and capacity grows as needed."""
+        index = LocalVectorIndex("test-index", initial_capacity=1)
+        index.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], [Document(page_content="a"), Document(page_content="b")])
+        index.add(["a"], [[0.0, 1.0]], [Document(page_content="a2")])
+
+        assert len(index) == 2
+        assert index.get(["a", "missing"])[0].page_content == "a2"
+        assert index.get(["missing"]) == [None]
+
+    def test_score_threshold(self, sample_documents):
+        """Test that results below the threshold are dropped."""
+        index = LocalVectorIndex("test-index")
+        index.add(["a", "b"], [[1.0, 0.0], [0.0, 1.0]], sample_documents[:2])
+
+        results = index.search([[1.0, 0.0]], k=2, score_threshold=0.5)
+
+        assert [doc for doc, _ in results[0]] == [sample_documents[0]]
+
+    def test_rescore_needs_every_full_vector(self):
+        """Test that candidates are re-scored at full dimension only if all of them can be."""
+        index = LocalVectorIndex("test-index")
+        documents = [Document(page_content=text) for text in ("a", "b", "c")]
+        index.add(["a", "b"], [[1.0, 0.0], [0.8, 0.6]], documents[:2], full_vectors=[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+
+        rescored = index.search([[1.0, 0.0]], k=2, full_query_vectors=[[0.0, 1.0, 0.0]], rescore_factor=2)
+        assert [doc.page_content for doc, _ in rescored[0]] == ["b", "a"]
+        assert rescored[0][0][1] == pytest.approx(1.0)
+
+        index.add(["c"], [[0.0, 1.0]], documents[2:])
+        mixed = index.search([[1.0, 0.0]], k=2, full_query_vectors=[[0.0, 1.0, 0.0]], rescore_factor=2)
+        assert [doc.page_content for doc, _ in mixed[0]] == ["a", "b"]
+        assert mixed[0][0][1] == pytest.approx(1.0)
@@ -0,0 +1,61 @@
+"""
+Unit tests for the metadata_index module.
+"""
+
+import pytest
+
+from modernrag.metadata_index import MetadataIndex
+
+
+@pytest.fixture
+def metadata_index():
+    """Create a metadata index over a handful of rows."""
+    index = MetadataIndex()
+    index.set(0, {"source": "a.pdf", "page": 1, "tags": ["intro"]})
+    index.set(1, {"source": "b.pdf", "page": 5})
+    index.set(2, {"source": "a.pdf", "page": 9, "tags": ["intro", "rag"]})
+    index.set(3, {"source": "c.pdf"})
+    return index
+
+
+class TestMetadataIndex:
+    """Tests for the MetadataIndex class."""
+
+    def test_equality_and_membership(self, metadata_index):
+        """Test equality, $in and list-valued fields."""
+        assert metadata_index.rows({"source": "a.pdf"}).tolist() == [0, 2]
+        assert metadata_index.rows({"source": {"$in": ["b.pdf", "c.pdf"]}}).tolist() == [1, 3]
+        assert metadata_index.rows({"tags": "rag"}).tolist() == [2]
+        assert metadata_index.rows({"source": {"$nin": ["a.pdf"]}}).tolist() == [1, 3]
+
+    def test_ranges_use_sorted_index(self, metadata_index):
+        """Test range operators and their combination with other clauses."""
+        assert metadata_index.rows({"page": {"$gte": 5}}).tolist() == [1, 2]
+        assert metadata_index.rows({"page": {"$gt": 1, "$lt": 9}}).tolist() == [1]
+        assert metadata_index.rows({"$or": [{"page": {"$lte": 1}}, {"source": "c.pdf"}]}).tolist() == [0, 3]
+        assert metadata_index.rows({"page": {"$exists": False}}).tolist() == [3]
+
+    def test_reindexing_a_row_replaces_values(self, metadata_index):
+        """Test that setting a row again drops its previous values."""
+        metadata_index.set(0, {"source": "z.pdf"})
+        metadata_index.remove(1)
+
+        assert metadata_index.rows({"source": "a.pdf"}).tolist() == [2]
+        assert metadata_index.rows({"source": "z.pdf"}).tolist() == [0]
+        assert metadata_index.rows({"source": {"$ne": "a.pdf"}}).tolist() == [0, 3]
+
+    def test_unknown_operator_raises(self, metadata_index):
+        """Test that unsupported operators are rejected."""
+        with pytest.raises(ValueError):
+            metadata_index.rows({"page": {"$regex": "x"}})
+
+    def test_unique_fields_keep_one_posting_per_row(self):
+        """Test that per-chunk unique fields hold one posting per row."""
+        index = MetadataIndex()
+        for row in range(2000):
+            index.set(row, {"source": f"{row % 4}.pdf", "chunk_id": f"chunk-{row}", "page": row})
+
+        assert sum(len(rows) for rows in index._postings["chunk_id"].values()) == 2000
+        assert index.rows({"chunk_id": "chunk-1234"}).tolist() == [1234]
+        assert index.rows({"source": "1.pdf", "page": {"$lt": 10}}).tolist() == [1, 5, 9]
+        assert index.mask({"page": {"$gte": 1998}}, size=2001).nonzero()[0].tolist() == [1998, 1999]
@@ -0,0 +1,79 @@
+"""
+Unit tests for the query_log module.
+"""
+
+import pytest
+
+from modernrag.query_log import QueryLog
+
+
+@pytest.fixture
+def query_log(tmp_path):
+    """Create a query log in a temporary directory."""
+    log = QueryLog(tmp_path / "query_log.sqlite3", half_life=100.0)
+    yield log
+    log.close()
+
+
+class TestQueryLog:
+    """Tests for the QueryLog class."""
+
+    def test_top_orders_by_frequency(self, query_log):
+        """Test that the most frequent queries come first with their parameters."""
+        now = query_log._epoch
+        for _ in range(3):
+            query_log.record("what is rag", {"k": 4}, now=now)
+        for _ in range(2):
+            query_log.record("what is bm25", {"k": 4}, now=now)
+        query_log.record("what is rag", {"k": 8}, now=now)
+
+        top = query_log.top(2, now=now)
+
+        assert [(query, params) for query, params, _ in top] == [("what is rag", {"k": 4}), ("what is bm25", {"k": 4})]
+        assert top[0][2] == pytest.approx(3.0)
+
+    def test_non_json_params_are_recorded(self, query_log):
+        """Test that parameters JSON cannot encode natively are stored as they were keyed."""
+        now = query_log._epoch
+        query_log.record("query", {"filter": {"source": {"doc.pdf"}}}, now=now)
+        query_log.record("query", {"filter": {"source": {"doc.pdf"}}}, now=now)
+
+        top = query_log.top(1, now=now)
+
+        assert top == [("query", {"filter": {"source": "{'doc.pdf'}"}}, pytest.approx(2.0))]
+
+    def test_counts_decay_with_half_life(self, query_log):
+        """Test that an old burst of requests is outranked by fewer recent ones."""
+        now = query_log._epoch
+        for _ in range(4):
+            query_log.record("old favourite", {}, now=now)
+        for _ in range(2):
+            query_log.record("new favourite", {}, now=now + 200)
+
+        top = query_log.top(2, now=now + 200)
+
+        assert [query for query, _, _ in top] == ["new favourite", "old favourite"]
+        assert top[1][2] == pytest.approx(1.0)
+
+    def test_rebase_keeps_weights_finite(self, query_log):
+        """Test that recording long after the epoch rescales weights instead of overflowing."""
+        now = query_log._epoch
+        query_log.record("query", {}, now=now)
+        later = now + 100.0 * 1000
+        query_log.record("query", {}, now=later)
+
+        assert query_log._epoch == later
+        assert query_log.top(1, now=later)[0][2] == pytest.approx(1.0)
+
+    def test_counts_persist_and_are_pruned(self, tmp_path):
+        """Test that counts survive reopening and only max_entries queries are kept."""
+        path = tmp_path / "query_log.sqlite3"
+        log = QueryLog(path, max_entries=10)
+        for i in range(1000):
+            log.record(f"query {i % 20}", {})
+        log.close()
+
+        reopened = QueryLog(path, max_entries=10)
+        assert len(reopened) == 10
+        assert reopened.top(1)[0][2] == pytest.approx(50.0, rel=0.01)
+        reopened.close()
@@ -0,0 +1,66 @@
+"""
+Unit tests for the ranking module.
+"""
+
+from langchain.docstore.document import Document
+
+from modernrag.ranking import (
+    document_key,
+    reciprocal_rank_fusion,
+    maximal_marginal_relevance,
+    merge_top_k
+)
+
+
+class TestReciprocalRankFusion:
+    """Tests for reciprocal rank fusion."""
+
+    def test_documents_in_both_lists_rank_first(self):
+        """Test that agreement between rankings outweighs a single top rank."""
+        a = Document(page_content="a", id="a")
+        b = Document(page_content="b", id="b")
+        c = Document(page_content="c", id="c")
+
+        fused = reciprocal_rank_fusion([[(a, 0.9), (b, 0.8)], [(c, 12.0), (b, 7.0)]], k=3)
+
+        assert [doc.id for doc, _ in fused] == ["b", "a", "c"]
+
+    def test_document_key_falls_back_to_content(self):
+        """Test that documents without IDs are identified by content and source."""
+        first = Document(page_content="same", metadata={"source": "s"})
+        second = Document(page_content="same", metadata={"source": "s"})
+        assert document_key(first) == document_key(second)
+
+
+class TestMergeTopK:
+    """Tests for heap-based merging of sorted result lists."""
+
+    def test_interleaves_by_score(self):
+        """Test that merged results are globally ordered and truncated."""
+        a, b, c, d = (Document(page_content=text) for text in "abcd")
+        merged = merge_top_k([[(a, 0.9), (c, 0.5)], [(b, 0.7), (d, 0.1)], []], k=3)
+        assert [score for _, score in merged] == [0.9, 0.7, 0.5]
+
+    def test_duplicates_keep_best_score(self):
+        """Test that a document found in several lists is returned once."""
+        a, b, c = (Document(page_content=text, id=text) for text in "abc")
+        merged = merge_top_k([[(a, 0.9), (b, 0.6)], [(a, 0.8), (c, 0.5)]], k=3)
+        assert [(doc.id, score) for doc, score in merged] == [("a", 0.9), ("b", 0.6), ("c", 0.5)]
+
+
+class TestMaximalMarginalRelevance:
+    """Tests for vectorized MMR selection."""
+
+    def test_lambda_one_is_pure_relevance(self):
+        """Test that lambda_mult=1 reduces to ranking by similarity."""
+        candidates = [[0.0, 1.0], [1.0, 0.0], [0.9, 0.1]]
+        assert maximal_marginal_relevance([1.0, 0.0], candidates, k=3, lambda_mult=1.0) == [1, 2, 0]
+
+    def test_diversity_penalises_duplicates(self):
+        """Test that a duplicate of the first pick loses to a distinct candidate."""
+        candidates = [[1.0, 0.0], [1.0, 0.0], [0.5, 0.5]]
+        assert maximal_marginal_relevance([1.0, 0.0], candidates, k=2, lambda_mult=0.3) == [0, 2]
+
+    def test_empty_candidates(self):
+        """Test that no candidates yields no selection."""
+        assert maximal_marginal_relevance([1.0, 0.0], [], k=2) == []
@@ -0,0 +1,137 @@
+"""
+Unit tests for the routing module.
+"""
+
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from modernrag.routing import QueryRouter, ROUTE_RAG, ROUTE_GENERATE, ROUTE_CANNED
+
+
+class TestQueryRouter:
+    """Tests for the QueryRouter class."""
+
+    @pytest.mark.asyncio
+    async def test_lexical_routes(self):
+        """Test that known phrases and questions are routed without embeddings."""
+        router = QueryRouter()
+
+        greeting = await router.route("Hello!")
+        chitchat = await router.route("ok")
+        question = await router.route("What is retrieval-augmented generation?")
+
+        assert greeting.route == ROUTE_CANNED
+        assert greeting.intent == "greeting"
+        assert greeting.response
+        assert chitchat.route == ROUTE_GENERATE
+        assert question.route == ROUTE_RAG
+
+    @pytest.mark.asyncio
+    async def test_empty_query_goes_to_rag(self):
+        """Test that a query with nothing to classify takes the full pipeline."""
+        router = QueryRouter()
+
+        decision = await router.route("  ?! ")
+
+        assert decision.route == ROUTE_RAG
+        assert decision.reason == "empty"
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_query_uses_embeddings(self, fake_embeddings):
+        """Test that short unmatched queries are compared against example phrases."""
+        router = QueryRouter(fake_embeddings)
+
+        paraphrase = await router.route("thanks a lot mate")
+        topic = await router.route("vector databases")
+
+        assert paraphrase.route == ROUTE_CANNED
+        assert paraphrase.reason == "embedding"
+        assert topic.route == ROUTE_RAG
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_falls_back_to_rag(self):
+        """Test that a failing embedding call does not block the query."""
+        embeddings = MagicMock()
+        embeddings.embed_documents.side_effect = RuntimeError("offline")
+        router = QueryRouter(embeddings)
+
+        decision = await router.route("vector databases")
+
+        assert decision.route == ROUTE_RAG
+        assert decision.reason == "fallback"
+
+    def test_latency_saved_is_measured_against_rag(self):
+        """Test that skipped pipelines are credited with the mean RAG latency."""
+        router = QueryRouter()
+        router.record(ROUTE_CANNED, 0.01)
+        router.record(ROUTE_RAG, 2.0)
+        router.record(ROUTE_RAG, 4.0)
+        router.record(ROUTE_GENERATE, 1.0)
+
+        stats = router.stats()
+
+        assert stats["counts"] == {ROUTE_RAG: 2, ROUTE_GENERATE: 1, ROUTE_CANNED: 1}
+        assert stats["mean_rag_latency"] == pytest.approx(3.0)
+        assert stats["latency_saved"] == pytest.approx(2.0)
+
+    def test_concurrent_records_are_all_counted(self):
+        """Test that counters are not lost when queries are recorded from several threads."""
+        class SlowDict(dict):
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                time.sleep(0)
+                return value
+
+        router = QueryRouter()
+        router._counts = SlowDict(router._counts)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: router.record(ROUTE_CANNED, 0.01), range(400)))
+
+        assert router.stats()["counts"][ROUTE_CANNED] == 400
+
+
+@pytest.mark.asyncio
+async def test_canned_route_skips_pipeline():
+    """Test that a greeting is answered without retrieval or LLM calls."""
+    from modernrag.generation import GenerationManager
+
+    with patch('modernrag.generation.similarity_search', new_callable=AsyncMock) as mock_search:
+        manager = GenerationManager()
+        manager.router = QueryRouter()
+        manager.generate_response = AsyncMock()
+
+        result = await manager.retrieve_augment_generate("hi there", use_cache=False)
+
+        assert result["route"] == ROUTE_CANNED
+        assert result["retrieved_docs"] == []
+        mock_search.assert_not_called()
+        manager.generate_response.assert_not_called()
+        assert manager.router_stats()["counts"][ROUTE_CANNED] == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_repeat_skips_router(tmp_path):
+    """Test that a cached answer is served without routing the query again."""
+    from modernrag.caching import CacheConfig, QueryCache
+    from modernrag.generation import GenerationManager
+
+    config = CacheConfig(cache_dir=str(tmp_path / "cache"), enable_semantic_cache=False)
+    with patch("modernrag.caching.get_cache_config", return_value=config):
+        cache = QueryCache()
+
+    with patch("modernrag.caching.query_cache", cache), \
+         patch('modernrag.generation.similarity_search', new_callable=AsyncMock, return_value=[]):
+        manager = GenerationManager()
+        manager.router = QueryRouter()
+        manager.router.route = AsyncMock(wraps=manager.router.route)
+
+        first = await manager.retrieve_augment_generate("How does reranking work?", index_name="docs")
+        second = await manager.retrieve_augment_generate("How does reranking work?", index_name="docs")
+
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["route"] == ROUTE_RAG
+        manager.router.route.assert_awaited_once()
@@ -0,0 +1,82 @@
+"""
+Unit tests for the semantic_cache module.
+"""
+
+import sys
+import threading
+
+import pytest
+
+from modernrag.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Tests for the SemanticCache class."""
+
+    def test_lookup_respects_threshold_and_partition(self):
+        """Test that only close vectors in the same partition match."""
+        cache = SemanticCache(max_entries=4, threshold=0.9)
+        cache.add("key-a", "query a", [1.0, 0.0], "params-1")
+
+        match = cache.lookup([0.99, 0.05], "params-1")
+
+        assert match.cache_key == "key-a"
+        assert match.similarity > 0.9
+        assert cache.lookup([0.99, 0.05], "params-2") is None
+        assert cache.lookup([0.0, 1.0], "params-1") is None
+
+    def test_least_recently_used_entry_is_replaced(self):
+        """Test that a full cache reuses the slot of the least recently used query."""
+        cache = SemanticCache(max_entries=2, threshold=0.9)
+        cache.add("key-a", "a", [1.0, 0.0, 0.0], "p")
+        cache.add("key-b", "b", [0.0, 1.0, 0.0], "p")
+        cache.lookup([1.0, 0.0, 0.0], "p")
+        cache.add("key-c", "c", [0.0, 0.0, 1.0], "p")
+
+        assert len(cache) == 2
+        assert cache.lookup([0.0, 1.0, 0.0], "p") is None
+        assert cache.lookup([1.0, 0.0, 0.0], "p").cache_key == "key-a"
+
+    def test_invalidate_index_and_dimension_check(self):
+        """Test per-index invalidation and rejection of mismatched vectors."""
+        cache = SemanticCache(max_entries=4, threshold=0.9)
+        cache.add("key-a", "a", [1.0, 0.0], "p", index_name="docs")
+        cache.add("key-b", "b", [0.0, 1.0], "p", index_name="wiki")
+
+        assert cache.invalidate_index("docs") == 1
+        assert len(cache) == 1
+        with pytest.raises(ValueError):
+            cache.add("key-c", "c", [1.0, 0.0, 0.0], "p")
+
+    def test_concurrent_adds_lookups_and_removes(self):
+        """Test that slot bookkeeping stays consistent under concurrent use."""
+        cache = SemanticCache(max_entries=16, threshold=0.99)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(1000):
+                    key = f"key-{(i + offset) % 64}"
+                    vector = [float((i + offset) % 64 == d) for d in range(64)]
+                    cache.add(key, key, vector, "p")
+                    cache.lookup(vector, "p")
+                    if i % 5 == 0:
+                        cache.remove(key)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n * 8,)) for n in range(8)]
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads often enough to expose races
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        assert len(cache) <= 16
+        assert len(cache._slot_by_key) + len(cache._free) == 16
+        assert all(cache._entries[slot].cache_key == key for key, slot in cache._slot_by_key.items())
@@ -0,0 +1,109 @@
+"""
+Unit tests for the serialization module.
+"""
+
+import pickle
+import pytest
+import numpy as np
+from langchain.docstore.document import Document
+
+from modernrag.serialization import ResultSerializer, FORMAT_VERSION, MAGIC, zstandard
+
+
+@pytest.fixture
+def pipeline_result():
+    """Create a result dictionary shaped like the pipeline's output."""
+    return {
+        "query": "What is RAG?",
+        "retrieved_docs": [
+            (Document(page_content=f"Chunk {i} about retrieval. " * 20,
+                      metadata={"source": "handbook.pdf", "page": i, "tags": ["rag", "intro"]}), 0.9 - i / 10)
+            for i in range(5)
+        ],
+        "augmented_context": "context",
+        "response": "RAG grounds answers in documents.",
+        "cached": False,
+        "route": "rag",
+        "timestamp": 1700000000.123456
+    }
+
+
+class TestResultSerializer:
+    """Tests for the ResultSerializer class."""
+
+    @pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+    def test_pipeline_result_round_trip(self, pipeline_result, compression):
+        """Test that a pipeline result decodes to an equal result with every codec."""
+        serializer = ResultSerializer(compression=compression)
+
+        decoded = serializer.loads(serializer.dumps(pipeline_result))
+
+        assert decoded == pipeline_result
+        assert list(decoded) == list(pipeline_result)
+        assert isinstance(decoded["retrieved_docs"][0], tuple)
+
+    def test_repeated_sources_stored_once(self, pipeline_result):
+        """Test that metadata values shared by several documents are written once."""
+        encoded = ResultSerializer(compression="none").dumps(pipeline_result)
+
+        assert encoded.count(b"handbook.pdf") == 1
+
+    def test_compression_shrinks_results(self, pipeline_result):
+        """Test that compressed results are smaller than pickle."""
+        encoded = ResultSerializer(compression="zlib").dumps(pipeline_result)
+
+        assert len(encoded) < len(pickle.dumps(pipeline_result)) / 2
+
+    def test_other_values_round_trip(self):
+        """Test the tagged encoding used for values outside the result schema."""
+        serializer = ResultSerializer(compression="none")
+        value = {
+            "ints": [0, -1, 127, 128, -(2 ** 40)],
+            "nested": ({"a": (1, 2.5)}, None, True, False, b"raw"),
+            "doc": Document(page_content="text", metadata={"source": "s"}),
+            "text": "long " * 50,
+        }
+
+        assert serializer.loads(serializer.dumps(value)) == value
+        assert serializer.loads(serializer.dumps(np.float32(0.5))) == 0.5
+
+    def test_result_with_unusual_fields_falls_back(self, pipeline_result):
+        """Test that results outside the schema keep their exact shape."""
+        serializer = ResultSerializer(compression="none")
+        pipeline_result["extra"] = ("a", 1)
+        pipeline_result["retrieved_docs"][0][0].metadata["span"] = (1, 2)
+
+        assert serializer.loads(serializer.dumps(pipeline_result)) == pipeline_result
+
+    def test_any_codec_is_readable(self, pipeline_result):
+        """Test that entries written with one codec are read by a serializer configured for another."""
+        written = ResultSerializer(compression="zlib").dumps(pipeline_result)
+
+        assert ResultSerializer(compression="none").loads(written) == pipeline_result
+
+    def test_rejects_foreign_and_future_data(self, pipeline_result):
+        """Test that pickles and entries of an unknown version are refused."""
+        serializer = ResultSerializer()
+        future = MAGIC + bytes((FORMAT_VERSION + 1, 0)) + b"\x00"
+
+        with pytest.raises(ValueError):
+            serializer.loads(pickle.dumps(pipeline_result))
+        with pytest.raises(ValueError):
+            serializer.loads(future)
+
+    def test_rejects_unsupported_types(self):
+        """Test that values without an encoding raise TypeError."""
+        with pytest.raises(TypeError):
+            ResultSerializer().dumps({"value": object()})
+
+    def test_unknown_compression(self):
+        """Test that an unknown codec name is rejected."""
+        with pytest.raises(ValueError):
+            ResultSerializer(compression="lz5")
+
+    @pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+    def test_zstd_codec_used_when_available(self, pipeline_result):
+        """Test that zstd is used for large entries when installed."""
+        encoded = ResultSerializer(compression="zstd").dumps(pipeline_result)
+
+        assert encoded[len(MAGIC) + 1] == 2
@@ -0,0 +1,163 @@
+"""
+Unit tests for the sharded_cache module.
+"""
+
+import os
+import sys
+import time
+import socket
+import subprocess
+import pytest
+
+from modernrag.cache_backends import RedisCacheBackend
+from modernrag.sharded_cache import HashRing, ShardedCacheBackend
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_node(port: int) -> subprocess.Popen:
+    """Start a cache node process and wait until it answers."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "modernrag.resp_server", "--port", str(port)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{port}/0", timeout=0.5)
+    deadline = time.time() + 30
+    while not backend.ping():
+        if time.time() > deadline or process.poll() is not None:
+            process.kill()
+            raise RuntimeError(f"Cache node on port {port} did not start")
+        time.sleep(0.05)
+    backend.close()
+    return process
+
+
+@pytest.fixture
+def cache_nodes():
+    """Run three cache nodes as separate local processes."""
+    ports = [_free_port() for _ in range(3)]
+    processes = {port: _start_node(port) for port in ports}
+    yield processes
+    for process in processes.values():
+        process.kill()
+        process.wait()
+
+
+def make_sharded(ports, **kwargs) -> ShardedCacheBackend:
+    nodes = {f"node-{port}": RedisCacheBackend(f"redis://127.0.0.1:{port}/0", timeout=0.5) for port in ports}
+    return ShardedCacheBackend(nodes, health_check_interval=0, **kwargs)
+
+
+class TestHashRing:
+    """Tests for the HashRing class."""
+
+    KEYS = [f"key {i}" for i in range(10000)]
+
+    def test_keys_are_spread_evenly(self):
+        """Test that virtual nodes give every node a similar share of keys."""
+        ring = HashRing(["a", "b", "c", "d"])
+        counts = {}
+        for key in self.KEYS:
+            node = ring.node_for(key)
+            counts[node] = counts.get(node, 0) + 1
+
+        assert set(counts) == {"a", "b", "c", "d"}
+        assert all(0.18 < count / len(self.KEYS) < 0.32 for count in counts.values())
+
+    def test_adding_a_node_moves_about_one_nth_of_keys(self):
+        """Test that a new node takes about 1/N of the keys, and only from existing owners."""
+        ring = HashRing(["a", "b", "c"])
+        before = {key: ring.node_for(key) for key in self.KEYS}
+        ring.add_node("d")
+        after = {key: ring.node_for(key) for key in self.KEYS}
+
+        moved = [key for key in self.KEYS if before[key] != after[key]]
+        assert all(after[key] == "d" for key in moved)
+        assert 0.18 < len(moved) / len(self.KEYS) < 0.32
+
+    def test_removing_a_node_moves_only_its_keys(self):
+        """Test that removing a node reassigns its keys and leaves the rest in place."""
+        ring = HashRing(["a", "b", "c", "d"])
+        before = {key: ring.node_for(key) for key in self.KEYS}
+        ring.remove_node("b")
+
+        for key in self.KEYS:
+            if before[key] != "b":
+                assert ring.node_for(key) == before[key]
+            else:
+                assert ring.node_for(key) != "b"
+
+    def test_preference_list_is_distinct_and_skips_excluded(self):
+        """Test that replicas land on distinct nodes and excluded nodes fall through."""
+        ring = HashRing(["a", "b", "c"])
+        nodes = ring.preference_list("key", count=2)
+
+        assert len(set(nodes)) == 2
+        assert ring.preference_list("key", count=2, exclude=[nodes[0]])[0] == nodes[1]
+        assert sorted(ring.preference_list("key")) == ["a", "b", "c"]
+        assert HashRing().node_for("key") is None
+
+
+class TestShardedCacheBackend:
+    """Tests for the ShardedCacheBackend class against local node processes."""
+
+    def test_entries_are_sharded_and_replicated(self, cache_nodes):
+        """Test that entries spread over all nodes and each is written to two of them."""
+        backend = make_sharded(cache_nodes, replicas=2)
+        now = time.time()
+        keys = [f"key {i}" for i in range(60)]
+        for i, key in enumerate(keys):
+            backend.set(key, {"response": i}, now, now + 60)
+
+        assert [entry[0]["response"] for entry in backend.get_many(keys)] == list(range(60))
+        per_node = [len(node) for node in backend.nodes.values()]
+        assert all(count > 0 for count in per_node)
+        assert sum(per_node) == 2 * len(keys)
+        backend.close()
+
+    def test_reads_fail_over_to_replicas_and_recovered_nodes_rejoin_empty(self, cache_nodes):
+        """Test that a dead node's keys are served by replicas and it is emptied when it returns."""
+        backend = make_sharded(cache_nodes, replicas=2)
+        now = time.time()
+        keys = [f"key {i}" for i in range(30)]
+        for key in keys:
+            backend.set(key, key, now, now + 60)
+        backend.set_tag_version("index:docs", 3)
+
+        port = next(iter(cache_nodes))
+        cache_nodes[port].kill()
+        cache_nodes[port].wait()
+
+        assert [entry[0] for entry in backend.get_many(keys)] == keys
+        assert f"node-{port}" not in backend.healthy_nodes()
+        assert backend.get_tag_versions() == {"index:docs": 3}
+        assert backend.bump_tag_version("index:docs") == 4
+
+        cache_nodes[port] = _start_node(port)
+        backend.check_health()
+        assert f"node-{port}" in backend.healthy_nodes()
+        assert len(backend.nodes[f"node-{port}"]) == 0
+        backend.close()
+
+    def test_query_cache_uses_sharded_backend(self, cache_nodes, tmp_path):
+        """Test that QueryCache builds a sharded backend from the configured node URLs."""
+        from unittest.mock import patch
+        from modernrag.caching import CacheConfig, QueryCache
+
+        urls = ",".join(f"redis://127.0.0.1:{port}/0" for port in cache_nodes)
+        config = CacheConfig(
+            cache_dir=str(tmp_path), enable_semantic_cache=False, cache_backend="sharded",
+            cache_shard_urls=urls, cache_replication_factor=2, cache_health_check_interval=0
+        )
+        with patch("modernrag.caching.get_cache_config", return_value=config):
+            cache = QueryCache()
+
+        assert isinstance(cache._backend, ShardedCacheBackend)
+        assert len(cache._backend.nodes) == 3 and cache._backend.replicas == 2
+        cache._backend.close()
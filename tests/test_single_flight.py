@@ -0,0 +1,71 @@
+"""
+Unit tests for the single_flight module.
+"""
+
+import asyncio
+import threading
+import pytest
+
+from modernrag.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for the SingleFlight class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_computation(self):
+        """Test that callers arriving during a computation reuse its result."""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("key", compute) for _ in range(5)])
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.coalesced == 4
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_waiter(self):
+        """Test that a failure is raised to all callers and not remembered."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.05)
+            raise RuntimeError("provider down")
+
+        outcomes = await asyncio.gather(*[flight.do("key", fail) for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+        async def succeed():
+            return "recovered"
+
+        assert await flight.do("key", succeed) == "recovered"
+
+    def test_callers_on_other_event_loops(self):
+        """Test that callers in other threads' event loops wait for the same result."""
+        flight = SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            started.set()
+            await asyncio.sleep(0.1)
+            return "shared"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(asyncio.run(flight.do("key", compute))))
+        owner.start()
+        started.wait()
+        results.append(asyncio.run(flight.do("key", compute)))
+        owner.join()
+
+        assert results == ["shared", "shared"]
+        assert len(calls) == 1
@@ -2,21 +2,29 @@
 Unit tests for the vector_store module.
 """
 
+import time
 import pytest
 import asyncio
+import threading
+import numpy as np
+from collections import OrderedDict
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from pinecone import Pinecone, ServerlessSpec
 from langchain.docstore.document import Document
 
 from modernrag.vector_store import (
+    FULL_VECTOR_KEY,
+    PROJECTION_NAMESPACE,
     VectorStoreConfig,
     get_config,
     get_embeddings,
     VectorStoreManager,
     check_index_exists,
     get_vector_store,
-    similarity_search
+    similarity_search,
+    similarity_search_many
 )
 
 
@@ -102,6 +110,623 @@ class TestVectorStoreManager:
                 mock_create_index.assert_called_once_with("test-index")
 
 
+class TestSimilaritySearchMany:
+    """Tests for batched multi-query similarity search."""
+
+    @pytest.mark.asyncio
+    async def test_local_backend_matches_single_search(self, local_manager, fake_embeddings, sample_documents):
+        """Test that queries are embedded as queries and rank as single searches do."""
+        await local_manager.upsert_documents(sample_documents, "test-index")
+        fake_embeddings.calls.clear()
+
+        results = await local_manager.similarity_search_many(
+            ["RAG combines retrieval with generation", "numerical representations of text"],
+            k=1,
+            index_name="test-index"
+        )
+
+        assert sorted(fake_embeddings.calls) == [
+            ("embed_query", "RAG combines retrieval with generation"),
+            ("embed_query", "numerical representations of text"),
+        ]
+        assert results[0][0][0] is sample_documents[2]
+        assert results[1][0][0] is sample_documents[1]
+        single = await local_manager.similarity_search(
+            "numerical representations of text", index_name="test-index", k=1
+        )
+        assert [(doc.page_content, score) for doc, score in single] == [
+            (doc.page_content, score) for doc, score in results[1]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_pinecone_backend_applies_threshold(self, mock_env_vars, fake_embeddings, sample_documents):
+        """Test that Pinecone lookups are issued per query and thresholded in order."""
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+            manager = VectorStoreManager()
+
+        mock_vector_store = MagicMock()
+        mock_vector_store.similarity_search_by_vector_with_score.side_effect = [
+            [(sample_documents[0], 0.9), (sample_documents[1], 0.2)],
+            [(sample_documents[2], 0.8)],
+        ]
+        with patch.object(manager, "get_vector_store", AsyncMock(return_value=mock_vector_store)):
+            results = await manager.similarity_search_many(["q1", "q2"], k=2, score_threshold=0.5)
+
+        assert results == [[(sample_documents[0], 0.9)], [(sample_documents[2], 0.8)]]
+        assert mock_vector_store.similarity_search_by_vector_with_score.call_count == 2
+
+
+class TestHybridSearch:
+    """Tests for hybrid lexical and vector retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_split_and_upsert_builds_lexical_index(self, local_manager, sample_documents):
+        """Test that ingestion populates the inverted index with the vector IDs."""
+        await local_manager.split_and_upsert_documents(sample_documents, "test-index")
+
+        lexical_results = local_manager.get_lexical_index("test-index").search("embeddings", k=1)
+        vector_doc = local_manager.get_local_index("test-index").get([lexical_results[0][0].id])[0]
+
+        assert vector_doc.page_content == "Embeddings are numerical representations of text."
+
+    @pytest.mark.asyncio
+    async def test_hybrid_mode_fuses_rankings(self, local_manager, sample_documents):
+        """Test that hybrid mode returns fused results limited to k."""
+        await local_manager.split_and_upsert_documents(sample_documents, "test-index")
+
+        results = await local_manager.similarity_search(
+            "vector databases", index_name="test-index", k=2, mode="hybrid"
+        )
+
+        assert len(results) == 2
+        assert "vector databases" in results[0][0].page_content
+
+    @pytest.mark.asyncio
+    async def test_every_upsert_feeds_lexical_index(self, local_manager, sample_documents):
+        """Test that documents upserted without splitting are searchable lexically."""
+        await local_manager.upsert_documents(sample_documents, "test-index", ["a", "b", "c"])
+
+        assert len(local_manager.get_lexical_index("test-index")) == 3
+
+    @pytest.mark.asyncio
+    async def test_lexical_index_is_loaded_from_stored_chunks(self, mock_env_vars, fake_embeddings, sample_documents):
+        """Test that a new process indexes the chunks already in Pinecone before hybrid search."""
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+            manager = VectorStoreManager()
+        index = MagicMock()
+        index.list.return_value = iter([["a", "b"], ["c"]])
+        index.fetch.side_effect = lambda ids: SimpleNamespace(vectors={
+            doc_id: SimpleNamespace(metadata={**doc.metadata, "text": doc.page_content})
+            for doc_id, doc in zip(["a", "b", "c"], sample_documents) if doc_id in ids
+        })
+        vector_store = MagicMock(index=index, _text_key="text")
+        vector_store.similarity_search_with_score.return_value = []
+        manager._index_cache["test-index"] = index
+        manager._vector_store_cache["test-index"] = vector_store
+
+        results = await manager.similarity_search("embeddings", index_name="test-index", k=1, mode="hybrid")
+        await manager.similarity_search("vector databases", index_name="test-index", k=1, mode="hybrid")
+
+        assert results[0][0].id == "b"
+        assert len(manager.get_lexical_index("test-index")) == 3
+        index.list.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_warns_on_empty_lexical_index(self, local_manager, caplog):
+        """Test that hybrid search over an empty lexical index is reported."""
+        with caplog.at_level("WARNING", logger="modernrag.vector_store"):
+            await local_manager.similarity_search("query", index_name="test-index", mode="hybrid")
+
+        assert "lexical index of test-index is empty" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode_raises(self, local_manager):
+        """Test that an unknown retrieval mode is rejected."""
+        with pytest.raises(ValueError):
+            await local_manager.similarity_search("query", mode="bogus")
+
+
+class TestMetadataFilter:
+    """Tests for metadata filter pushdown."""
+
+    @pytest.mark.asyncio
+    async def test_local_filter_prunes_candidates(self, local_manager, sample_documents):
+        """Test that only documents matching the filter are scored on the local backend."""
+        await local_manager.upsert_documents(sample_documents, "test-index")
+
+        results = await local_manager.similarity_search(
+            "test document about vector databases",
+            index_name="test-index",
+            k=3,
+            filter={"source": {"$in": ["test-source-2", "test-source-3"]}, "page": {"$gte": 3}}
+        )
+
+        assert [doc.metadata["source"] for doc, _ in results] == ["test-source-3"]
+
+    @pytest.mark.asyncio
+    async def test_filter_is_pushed_down_to_pinecone(self, mock_env_vars, fake_embeddings):
+        """Test that the filter is forwarded to the Pinecone query."""
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+            manager = VectorStoreManager()
+
+        mock_vector_store = MagicMock()
+        mock_vector_store.similarity_search_with_score.return_value = []
+        with patch.object(manager, "get_vector_store", AsyncMock(return_value=mock_vector_store)):
+            await manager.similarity_search("query", k=2, filter={"source": "a.pdf"})
+
+        assert mock_vector_store.similarity_search_with_score.call_args[1]["filter"] == {"source": "a.pdf"}
+
+
+class TestMMRSearch:
+    """Tests for maximal marginal relevance retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_mmr_skips_near_duplicates(self, local_manager, sample_documents):
+        """Test that MMR prefers a different document over a duplicate chunk."""
+        duplicate = Document(page_content=sample_documents[0].page_content, metadata={"source": "dup"})
+        await local_manager.upsert_documents(sample_documents + [duplicate], "test-index")
+
+        vector_results = await local_manager.similarity_search(
+            "test document about vector databases", index_name="test-index", k=2
+        )
+        mmr_results = await local_manager.similarity_search(
+            "test document about vector databases", index_name="test-index", k=2,
+            mode="mmr", fetch_k=4, lambda_mult=0.3
+        )
+
+        assert vector_results[1][0].page_content == sample_documents[0].page_content
+        assert mmr_results[1][0].page_content != sample_documents[0].page_content
+
+    @pytest.mark.asyncio
+    async def test_mmr_requests_vectors_from_pinecone(self, mock_env_vars):
+        """Test that the Pinecone query includes vectors and returns documents with scores."""
+        mock_embeddings = MagicMock()
+        mock_embeddings.embed_query.return_value = [1.0, 0.0]
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=mock_embeddings):
+            manager = VectorStoreManager()
+
+        mock_vector_store = MagicMock()
+        mock_vector_store._text_key = "text"
+        mock_vector_store.index.query.return_value = {"matches": [
+            {"id": "a", "score": 0.9, "values": [1.0, 0.0], "metadata": {"text": "a", "source": "s"}},
+            {"id": "b", "score": 0.8, "values": [1.0, 0.01], "metadata": {"text": "b", "source": "s"}},
+            {"id": "c", "score": 0.7, "values": [0.0, 1.0], "metadata": {"text": "c", "source": "s"}},
+        ]}
+        with patch.object(manager, "get_vector_store", AsyncMock(return_value=mock_vector_store)):
+            results = await manager.similarity_search("query", k=2, mode="mmr", fetch_k=3, lambda_mult=0.3)
+
+        assert mock_vector_store.index.query.call_args[1]["include_values"] is True
+        assert [(doc.id, score) for doc, score in results] == [("a", 0.9), ("c", 0.7)]
+
+
+class TestFederatedSearch:
+    """Tests for scatter-gather search across indexes and namespaces."""
+
+    @pytest.mark.asyncio
+    async def test_merges_targets_and_embeds_once(self, local_manager, fake_embeddings, sample_documents):
+        """Test that results from several indexes are merged into one top-k."""
+        await local_manager.upsert_documents(sample_documents[:2], "index-a")
+        await local_manager.upsert_documents(sample_documents[2:], "index-b")
+        fake_embeddings.calls.clear()
+
+        results = await local_manager.federated_search(
+            "RAG combines retrieval with generation", ["index-a", "index-b"], k=2
+        )
+
+        assert len(fake_embeddings.calls) == 1
+        assert results[0][0] is sample_documents[2]
+        assert results[0][1] >= results[1][1]
+
+    @pytest.mark.asyncio
+    async def test_slow_and_failing_targets_degrade_gracefully(self, local_manager, sample_documents):
+        """Test that timed out and failing targets are skipped."""
+        async def fake_search(query_vector, index_name, namespace, k, score_threshold, filter):
+            if index_name == "slow":
+                await asyncio.sleep(1)
+            if index_name == "broken":
+                raise RuntimeError("shard unavailable")
+            return [(sample_documents[0], 0.9)]
+
+        with patch.object(local_manager, "_search_by_vector", side_effect=fake_search) as mock_search:
+            results = await local_manager.federated_search(
+                "query",
+                ["fast", "slow", "broken"],
+                k=4,
+                timeout=0.05
+            )
+
+        assert results == [(sample_documents[0], 0.9)]
+        assert mock_search.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_local_namespaces_collapse_to_one_search(self, local_manager, sample_documents):
+        """Test that namespace targets on the local backend do not return duplicates."""
+        await local_manager.upsert_documents(sample_documents, "idx")
+
+        with patch.object(
+            local_manager, "_search_by_vector", wraps=local_manager._search_by_vector
+        ) as mock_search:
+            results = await local_manager.federated_search(
+                "RAG combines retrieval with generation",
+                [("idx", "tenant-a"), ("idx", "tenant-b")],
+                k=3
+            )
+
+        assert mock_search.call_count == 1
+        assert len({doc.page_content for doc, _ in results}) == len(results) == 3
+
+
+class TestSmallToBigSearch:
+    """Tests for small-to-big retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_hits_expand_to_merged_parent_windows(self, local_manager):
+        """Test that a chunk hit is returned with its neighbours stitched together."""
+        sentences = [f"Sentence number {word} talks about topic {word}." for word in
+                     ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot"]]
+        document = Document(page_content=" ".join(sentences), metadata={"source": "doc"}, id="doc-1")
+        await local_manager.split_and_upsert_documents(
+            [document], "test-index", chunk_size=50, chunk_overlap=10
+        )
+        local_index = local_manager.get_local_index("test-index")
+
+        with patch.object(local_index, "get", wraps=local_index.get) as mock_get:
+            results = await local_manager.similarity_search(
+                "topic charlie", index_name="test-index", k=1, mode="small_to_big", window=1
+            )
+
+        mock_get.assert_called_once()
+        passage, _ = results[0]
+        assert "charlie" in passage.page_content
+        assert passage.page_content in document.page_content
+        assert len(passage.page_content) > 50
+        assert passage.metadata["parent_id"] == "doc-1"
+        assert "chunk_index" not in passage.metadata
+
+
+class TestRetrievalCache:
+    """Tests for the retrieval result cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_skips_vector_store(self, local_manager, fake_embeddings, sample_documents):
+        """Test that a repeated search is served from the cache with the threshold applied after."""
+        await local_manager.upsert_documents(sample_documents, "test-index")
+        fake_embeddings.calls.clear()
+
+        first = await local_manager.similarity_search("vector databases", index_name="test-index", k=3)
+        second = await local_manager.similarity_search(
+            "vector databases", index_name="test-index", k=3, score_threshold=first[0][1]
+        )
+
+        assert len(fake_embeddings.calls) == 1
+        assert second == first[:1]
+        assert local_manager.retrieval_cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upsert_invalidates_cached_results(self, local_manager, fake_embeddings, sample_documents):
+        """Test that writing to an index bumps its generation and forces a fresh search."""
+        await local_manager.upsert_documents(sample_documents[:1], "test-index")
+        generation = await local_manager.get_index_generation("test-index")
+        await local_manager.similarity_search("embeddings", index_name="test-index", k=3)
+
+        await local_manager.upsert_documents(sample_documents[1:], "test-index")
+        results = await local_manager.similarity_search("embeddings", index_name="test-index", k=3)
+
+        assert await local_manager.get_index_generation("test-index") == generation + 1
+        assert len(results) == 3
+        assert local_manager.retrieval_cache_stats()["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shared_generation_follows_writes_from_other_processes(self, local_manager, sample_documents):
+        """Test that a write counted by a shared generation source invalidates cached results."""
+        shared = {"test-index": 0}
+
+        async def source(index_name):
+            return shared.get(index_name, 0)
+
+        local_manager.set_generation_source(source)
+        await local_manager.upsert_documents(sample_documents, "test-index")
+        await local_manager.similarity_search("embeddings", index_name="test-index", k=3)
+        await local_manager.similarity_search("embeddings", index_name="test-index", k=3)
+        assert local_manager.retrieval_cache_stats()["hits"] == 1
+
+        # Another worker wrote to the index and bumped the shared version
+        shared["test-index"] += 1
+        await local_manager.similarity_search("embeddings", index_name="test-index", k=3)
+
+        assert local_manager.retrieval_cache_stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+    @pytest.mark.asyncio
+    async def test_cached_results_are_copies(self, local_manager, sample_documents):
+        """Test that changing a returned document does not change later cached results."""
+        await local_manager.upsert_documents(sample_documents, "test-index")
+
+        first = await local_manager.similarity_search("embeddings", index_name="test-index", k=1)
+        first[0][0].metadata["source"] = "changed"
+        second = await local_manager.similarity_search("embeddings", index_name="test-index", k=1)
+        second[0][0].page_content = "changed"
+        third = await local_manager.similarity_search("embeddings", index_name="test-index", k=1)
+
+        assert local_manager.retrieval_cache_stats()["hits"] == 2
+        assert third[0][0].metadata["source"] == "test-source-2"
+        assert third[0][0].page_content == sample_documents[1].page_content
+
+    @pytest.mark.asyncio
+    async def test_writes_notify_listeners(self, local_manager, sample_documents):
+        """Test that upserts and index deletion call the write listeners with the index name."""
+        written = []
+        local_manager.add_write_listener(written.append)
+
+        await local_manager.upsert_documents(sample_documents, "test-index")
+        await local_manager.delete_index("test-index")
+
+        assert written == ["test-index", "test-index"]
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, local_manager, sample_documents):
+        """Test that the least recently used entries are evicted."""
+        local_manager.config = local_manager.config.model_copy(update={"retrieval_cache_size": 2})
+        await local_manager.upsert_documents(sample_documents, "test-index")
+
+        for query in ["one", "two", "three"]:
+            await local_manager.similarity_search(query, index_name="test-index")
+
+        assert local_manager.retrieval_cache_stats()["entries"] == 2
+
+    def test_concurrent_gets_and_evictions(self, local_manager):
+        """Test that lookups racing with evicting stores neither fail nor lose counts."""
+        class YieldingOrderedDict(OrderedDict):
+            def get(self, key, default=None):
+                # Give other threads a chance to evict between lookup and reordering
+                value = super().get(key, default)
+                time.sleep(0)
+                return value
+
+        local_manager.config = local_manager.config.model_copy(update={"retrieval_cache_size": 2})
+        local_manager._retrieval_cache = YieldingOrderedDict()
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(500):
+                    key = ("test-index", (i + offset) % 3)
+                    if local_manager._retrieval_cache_get(key) is None:
+                        local_manager._retrieval_cache_put(key, [])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = local_manager.retrieval_cache_stats()
+        assert errors == []
+        assert stats["entries"] == 2
+        assert stats["hits"] + stats["misses"] == 2000
+
+
+class TestDimensionReduction:
+    """Tests for per-index embedding dimension reduction."""
+
+    @pytest.mark.asyncio
+    async def test_local_index_stores_reduced_vectors(self, local_manager, sample_documents):
+        """Test that a reduced index stores truncated vectors and can still be searched."""
+        local_manager.config = local_manager.config.model_copy(
+            update={"reduced_dimensions": {"test-index": 16}}
+        )
+        await local_manager.upsert_documents(sample_documents, "test-index", ["a", "b", "c"])
+
+        results = await local_manager.similarity_search(
+            "vector databases", index_name="test-index", k=1
+        )
+
+        assert local_manager.get_local_index("test-index").dimension == 16
+        assert local_manager.get_index_dimension("test-index") == 16
+        assert len(results) == 1
+
+    @pytest.mark.asyncio
+    async def test_rescore_uses_full_dimension_scores(self, local_manager, sample_documents):
+        """Test that re-scoring returns full-dimension cosine similarities."""
+        local_manager.config = local_manager.config.model_copy(update={
+            "reduced_dimensions": {"test-index": 8},
+            "rescore_full_dimension": True
+        })
+        await local_manager.upsert_documents(sample_documents, "test-index", ["a", "b", "c"])
+
+        results = await local_manager.similarity_search(
+            sample_documents[0].page_content, index_name="test-index", k=1
+        )
+
+        assert results[0][0] == sample_documents[0]
+        assert results[0][1] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_pca_projection_is_fitted_and_deleted_with_the_index(self, local_manager, sample_documents):
+        """Test that a PCA projection is fitted on the first upsert and dropped with its index."""
+        local_manager.config = local_manager.config.model_copy(update={
+            "reduced_dimensions": {"test-index": 2},
+            "reduction_method": "pca"
+        })
+        await local_manager.upsert_documents(sample_documents, "test-index")
+
+        assert local_manager.get_reducer("test-index").is_fitted
+        assert local_manager.get_local_index("test-index").dimension == 2
+
+        await local_manager.delete_index("test-index")
+        assert not local_manager.get_reducer("test-index").is_fitted
+
+    @pytest.mark.asyncio
+    async def test_pca_is_fitted_on_all_chunks_before_batching(self, local_manager, fake_embeddings):
+        """Test that a PCA dimension above the batch size is fitted up front instead of per batch."""
+        local_manager.config = local_manager.config.model_copy(update={
+            "reduced_dimensions": {"test-index": 8},
+            "reduction_method": "pca",
+            "projection_fit_samples": 8
+        })
+        documents = [
+            Document(page_content=f"document {i} about topic{i} and subject{i * 7}", metadata={"source": f"{i}.txt"})
+            for i in range(12)
+        ]
+
+        assert await local_manager.split_and_upsert_documents(documents, "test-index", batch_size=4)
+        assert local_manager.get_reducer("test-index").is_fitted
+        assert len(local_manager.get_local_index("test-index")) == 12
+        # The fit sample's embeddings are reused, so every chunk is embedded once
+        embedded = [text for name, texts in fake_embeddings.calls if name == "embed_documents" for text in texts]
+        assert sorted(embedded) == sorted(doc.page_content for doc in documents)
+
+        assert not await local_manager.fit_projection(["unreduced index"], "other-index")
+        local_manager.config = local_manager.config.model_copy(update={
+            "reduced_dimensions": {"test-index": 8, "other-index": 8}
+        })
+        with pytest.raises(ValueError):
+            await local_manager.fit_projection(["too few"], "other-index")
+
+    @pytest.mark.asyncio
+    async def test_pinecone_receives_projected_vectors(self, mock_env_vars, fake_embeddings, sample_documents):
+        """Test that reduced indexes are upserted and queried with projected vectors."""
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+            manager = VectorStoreManager()
+        manager.config = manager.config.model_copy(update={"reduced_dimensions": {"test-index": 16}})
+
+        mock_vector_store = MagicMock()
+        mock_vector_store._text_key = "text"
+        mock_vector_store.similarity_search_by_vector_with_score.return_value = []
+        manager._vector_store_cache["test-index"] = mock_vector_store
+
+        await manager.upsert_documents(sample_documents[:1], "test-index", ["a"])
+        await manager.similarity_search("vector databases", index_name="test-index")
+
+        upserted = mock_vector_store.index.upsert.call_args.kwargs["vectors"][0]
+        assert len(upserted["values"]) == 16
+        assert upserted["metadata"]["text"] == sample_documents[0].page_content
+        query_vector = mock_vector_store.similarity_search_by_vector_with_score.call_args.args[0]
+        assert len(query_vector) == 16
+
+
+    @pytest.mark.asyncio
+    async def test_pinecone_rescores_with_stored_full_vectors(self, mock_env_vars, fake_embeddings, sample_documents):
+        """Test that full vectors are stored in Pinecone metadata and used only if every hit has one."""
+        with patch("modernrag.vector_store.Pinecone"), \
+             patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+            manager = VectorStoreManager()
+        manager.config = manager.config.model_copy(update={
+            "reduced_dimensions": {"test-index": 8},
+            "rescore_full_dimension": True
+        })
+        mock_vector_store = MagicMock()
+        mock_vector_store._text_key = "text"
+        manager._vector_store_cache["test-index"] = mock_vector_store
+
+        await manager.upsert_documents(sample_documents[:2], "test-index", ["a", "b"])
+        stored = {
+            record["id"]: record["metadata"][FULL_VECTOR_KEY]
+            for record in mock_vector_store.index.upsert.call_args.kwargs["vectors"]
+        }
+
+        def hits():
+            return [
+                (Document(id=doc_id, page_content=doc.page_content, metadata={FULL_VECTOR_KEY: stored[doc_id]}), 0.5)
+                for doc_id, doc in zip(["a", "b"], sample_documents)
+            ]
+
+        # The second document ties on its reduced score but matches the query exactly
+        mock_vector_store.similarity_search_by_vector_with_score.return_value = hits()
+        results = await manager.similarity_search(sample_documents[1].page_content, index_name="test-index", k=1)
+        assert results[0][0].id == "b"
+        assert results[0][1] == pytest.approx(1.0)
+        assert FULL_VECTOR_KEY not in results[0][0].metadata
+
+        partial = hits()
+        del partial[1][0].metadata[FULL_VECTOR_KEY]
+        mock_vector_store.similarity_search_by_vector_with_score.return_value = partial
+        results = await manager.similarity_search(sample_documents[1].page_content + " again", index_name="test-index", k=1)
+        assert [(doc.id, score) for doc, score in results] == [("a", 0.5)]
+
+
+    @pytest.mark.asyncio
+    async def test_pca_projection_is_shared_through_the_index(self, mock_env_vars, fake_embeddings):
+        """Test that a projection fitted by one worker is loaded from Pinecone by another."""
+        records = {}
+
+        def upsert(vectors, namespace=None):
+            records.update({(namespace, record["id"]): record for record in vectors})
+
+        def fetch(ids, namespace=None):
+            return SimpleNamespace(vectors={
+                record_id: SimpleNamespace(metadata=records[(namespace, record_id)]["metadata"])
+                for record_id in ids if (namespace, record_id) in records
+            })
+
+        def make_manager():
+            with patch("modernrag.vector_store.Pinecone"), \
+                 patch("modernrag.vector_store.get_embeddings", return_value=fake_embeddings):
+                manager = VectorStoreManager()
+            manager.config = manager.config.model_copy(update={
+                "reduced_dimensions": {"test-index": 4},
+                "reduction_method": "pca"
+            })
+            vector_store = MagicMock()
+            vector_store._text_key = "text"
+            vector_store.index.upsert.side_effect = upsert
+            vector_store.similarity_search_by_vector_with_score.return_value = []
+            manager._index_cache["test-index"] = MagicMock(upsert=upsert, fetch=fetch)
+            manager._vector_store_cache["test-index"] = vector_store
+            return manager, vector_store
+
+        first, _ = make_manager()
+        texts = [f"chunk {i} about topic{i} and subject{i * 3}" for i in range(10)]
+        assert await first.fit_projection(texts, "test-index")
+        assert (PROJECTION_NAMESPACE, "manifest") in records
+
+        second, vector_store = make_manager()
+        await second.similarity_search("topic3 subject9", index_name="test-index")
+
+        query_vector = vector_store.similarity_search_by_vector_with_score.call_args.args[0]
+        expected = first.get_reducer("test-index").transform([fake_embeddings.embed_query("topic3 subject9")])[0]
+        assert np.allclose(query_vector, expected)
+        assert not await second.fit_projection(texts, "test-index")
+
+
+class TestIndexRegistryIntegration:
+    """Tests for index registry use in VectorStoreManager."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_checks_skip_pinecone(self, mock_env_vars):
+        """Test that check_index_exists only calls has_index once while fresh."""
+        with patch("modernrag.vector_store.Pinecone") as mock_pinecone:
+            mock_pinecone.return_value.has_index.return_value = True
+            manager = VectorStoreManager()
+
+            for _ in range(3):
+                assert await manager.check_index_exists("test-index") is True
+            await manager.get_index("test-index")
+
+            mock_pinecone.return_value.has_index.assert_called_once_with("test-index")
+
+    @pytest.mark.asyncio
+    async def test_prewarm_caches_handles(self, mock_env_vars):
+        """Test that prewarming opens index handles and starts the refresh thread."""
+        with patch("modernrag.vector_store.Pinecone") as mock_pinecone:
+            mock_pinecone.return_value.has_index.return_value = True
+            mock_pinecone.return_value.Index.return_value.describe_index_stats.return_value = {}
+            manager = VectorStoreManager()
+
+            with patch.object(manager._index_registry, "start_background_refresh") as mock_start:
+                entries = await manager.prewarm_indexes(["warm-index"])
+
+            assert entries["warm-index"].exists is True
+            assert "warm-index" in manager._index_cache
+            mock_start.assert_called_once()
+
+
 class TestAsyncAPI:
     """Tests for the async API functions."""
 
@@ -143,5 +768,17 @@ class TestAsyncAPI:
             
             assert result == mock_results
             mock_manager.similarity_search.assert_called_once_with(
-                "test query", "test-index", 2, 0.5
+                "test query", "test-index", 2, 0.5, "vector", None, 20, 0.5, 1
+            )
+
+    @pytest.mark.asyncio
+    async def test_similarity_search_many(self, mock_env_vars):
+        """Test similarity_search_many function."""
+        with patch("modernrag.vector_store.vector_store_manager") as mock_manager:
+            mock_manager.similarity_search_many = AsyncMock(return_value=[[], []])
+            result = await similarity_search_many(["q1", "q2"], k=3, index_name="test-index")
+
+            assert result == [[], []]
+            mock_manager.similarity_search_many.assert_called_once_with(
+                ["q1", "q2"], 3, None, "test-index", None
             )
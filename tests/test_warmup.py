@@ -0,0 +1,102 @@
+"""
+Unit tests for the warmup module.
+"""
+
+import time
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+
+from modernrag.query_log import QueryLog
+from modernrag.warmup import CacheWarmer, WarmupConfig
+
+
+@pytest.fixture
+def make_warmer(tmp_path):
+    """Create a CacheWarmer reading a temporary query log."""
+    log = QueryLog(tmp_path / "query_log.sqlite3")
+    def factory(**overrides):
+        settings = {"warmup_pause": 0.0, "warmup_refresh_window": 60.0, **overrides}
+        with patch("modernrag.warmup.get_warmup_config", return_value=WarmupConfig(**settings)):
+            warmer = CacheWarmer()
+        return warmer, log
+    with patch("modernrag.warmup.get_query_log", return_value=log):
+        yield factory
+    log.close()
+
+
+def fake_pipeline(running, peak, fail=()):
+    """Create a pipeline stand-in that tracks how many runs overlap."""
+    calls = []
+
+    async def run(query, **kwargs):
+        calls.append((query, kwargs))
+        running.append(1)
+        peak[0] = max(peak[0], len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+        if query in fail:
+            return {"query": query, "error": "provider down"}
+        return {"query": query, "response": "answer"}
+
+    run.calls = calls
+    return run
+
+
+class TestCacheWarmer:
+    """Tests for the CacheWarmer class."""
+
+    @pytest.mark.asyncio
+    async def test_warms_missing_and_refreshes_expiring_entries(self, make_warmer):
+        """Test that only missing or soon-to-expire answers are recomputed."""
+        warmer, log = make_warmer()
+        params = {"index_name": "docs", "k": 4, "score_threshold": 0.4, "rerank_top_k": 3}
+        for query in ("missing", "expiring", "fresh"):
+            log.record(query, params)
+        expires = {"missing": None, "expiring": 30.0, "fresh": 3000.0}
+        pipeline = fake_pipeline([], [0])
+
+        with patch("modernrag.warmup.get_result_expires_in", side_effect=lambda query, **kwargs: expires[query]), \
+             patch("modernrag.warmup.generation_manager", MagicMock(retrieve_augment_generate=pipeline)):
+            counts = await warmer.warm()
+
+        assert counts == {"warmed": 1, "refreshed": 1, "skipped": 1, "failed": 0}
+        runs = {query: kwargs for query, kwargs in pipeline.calls}
+        assert set(runs) == {"missing", "expiring"}
+        assert runs["missing"]["refresh_cache"] is False
+        assert runs["expiring"] == {**params, "refresh_cache": True}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_and_failures_counted(self, make_warmer):
+        """Test that at most warmup_concurrency queries run at once and errors are counted."""
+        warmer, log = make_warmer(warmup_concurrency=2)
+        for i in range(8):
+            log.record(f"query {i}", {})
+        peak = [0]
+        pipeline = fake_pipeline([], peak, fail={"query 3"})
+
+        with patch("modernrag.warmup.get_result_expires_in", return_value=None), \
+             patch("modernrag.warmup.generation_manager", MagicMock(retrieve_augment_generate=pipeline)):
+            counts = await warmer.warm(top_n=5)
+
+        assert len(pipeline.calls) == 5
+        assert peak[0] == 2
+        assert counts["warmed"] + counts["failed"] == 5
+
+    def test_background_warmup_runs_and_stops(self, make_warmer):
+        """Test that the background thread runs a pass on start and stops cleanly."""
+        warmer, log = make_warmer()
+        log.record("what is rag", {})
+        pipeline = fake_pipeline([], [0])
+
+        with patch("modernrag.warmup.get_result_expires_in", return_value=None), \
+             patch("modernrag.warmup.generation_manager", MagicMock(retrieve_augment_generate=pipeline)):
+            warmer.start_background_warmup()
+            for _ in range(200):
+                if warmer.last_run is not None:
+                    break
+                time.sleep(0.01)
+            warmer.stop_background_warmup(timeout=5)
+
+        assert warmer.last_run == {"warmed": 1, "refreshed": 0, "skipped": 0, "failed": 0}
+        assert warmer._thread is None